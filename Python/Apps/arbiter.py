@@ -1,201 +1,288 @@
-# 
-# Copyright (C) 2016~2022 The Gimli Project
-# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
-#
-# Gimli is free software: you can redistribute it and/or modify
-# it under the terms of the GNU General Public License as published by
-# the Free Software Foundation, either version 3 of the License, or
-# (at your option) any later version.
-#
-# Gimli is distributed in the hope that it will be useful,
-# but WITHOUT ANY WARRANTY; without even the implied warranty of
-# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
-# GNU General Public License for more details.
-#
-# You should have received a copy of the GNU General Public License
-# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
-#
-
-""" arbiter.py - "We sense a soul in search of answers"
-
-    The Arbiter is the "core" loop. it will manage multiple ZMQ services:
-
-    CameraCnC  : DB Multi Client access to camera settings
-    SysState   : DB Camera List changes, Camera settings <- Lots to do here
-
-    SysAnnounce: PS Flag the state has changed, Subs Req what they're interested in
-    Centroids  : PS Stream of Centroids from the MoCap System
-    Images     : PS Images from the MoCap Cameras
-    Orphans    : PS Any Centroids arriving after their Packet Ships
-    Timecode   : PS Just HH:MM:SS:FF:ss U1:U2:U3:U4:U5:U6:U7:U8 for anyone that's interested
-    TakeCnC    : RR Transport control, a Client sets the Take name, starts recording etc
-    Transport  : PS Current & upcoming Take Name, Rec Status, target folder & name
-
-    And receive Data from the Cameras, and _do the right thing_ with it!
-
-    Problem is I don't know where to start...
-"""
-
-# Workaround not being in PATH
-import os, sys
-_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) )
-CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
-DATA_PATH = os.path.join( _git_root_, "rpiCap", "exampleData" )
-sys.path.append( CODE_PATH )
-
-# Logging
-import logging
-logging.basicConfig()
-log = logging.getLogger( __name__ )
-log.setLevel( logging.DEBUG )
-
-#detailed_log = logging.Formatter( "%(asctime)s.%(msecs)04d [%(levelname)-8s][%(name)-16s] %(message)s {%(filename)s@%(lineno)s}", "%y%m%d %H:%M:%S" )
-#terse_log = logging.Formatter( "%(asctime)s.%(msecs)04d [%(levelname)-8s] %(message)s", "%y%m%d %H:%M:%S" )
-
-import numpy as np
-np.set_printoptions( precision=3, suppress=True )
-
-import struct
-import threading
-import zmq
-
-import Comms
-from Comms.piComunicate import AssembleDetFrame, SimpleComms
-
-
-class Arbiter( object ):
-    """
-    The Arbiter is well named, as it abstracts away implementation level details of the MoCap cameras under it's
-    administration from various 'Agents' that attach to it to receive pertinent data.
-
-    The Arbiter will ultimatly manage the system topology, knowing which family or model of mocap cameras are attached.
-    Managing one or more sync units to control them, and finally formatting centroid data produced by the cameras into
-    "Data Frames" - representing one frame of camera detections.  The raw centroid data emited by the cameras is
-    transformed by the Arbiter into "NDC" representation.
-
-    TODO: This needs a lot of work as it's core to the system, but presently parked waiting on the UI
-
-    """
-
-    def __init__( self, local_ip=None ):
-        # System State
-        self.system = Comms.SysManager()
-
-        # Setup System Communications
-        self.local_ip = local_ip or "127.0.0.1"
-        self.com_mgr = SimpleComms( self.system, self.local_ip )
-
-        # Packet Handlers
-        self.det_mgr = AssembleDetFrame( self.com_mgr.q_dets, self.system )
-        #self.img_mgr = AssembleImages( self.com_mgr.q_imgs, self.system )
-
-        # Client Comunications (ZMQ)
-        self.acks = 0
-        self._zctx = zmq.Context()
-
-        self.cnc_in = self._zctx.socket( zmq.ROUTER )
-        self.cnc_in.bind( "tcp://*:{}".format( Comms.ABT_PORT_SYSCNC ) )
-
-        self.state_pub = self._zctx.socket( zmq.PUB )
-        self.state_pub.bind( "tcp://*:{}".format( Comms.ABT_PORT_SYSSTATE ) )
-
-        self.data_pub = self._zctx.socket( zmq.PUB )
-        self.data_pub.bind( "tcp://*:{}".format( Comms.ABT_PORT_DATA ) )
-
-        self.poller = zmq.Poller()
-        self.poller.register( self.cnc_in, zmq.POLLIN )
-
-        # Enable Running
-        self.running = threading.Event()
-        self.running.set()
-
-        # Load last system state?
-
-    def handleCNC( self, dgm ):
-        # currently just cameras
-        verb = dgm[ 2 ]
-        noun = dgm[ 3 ]
-
-        # setting like msg?
-        setting = False
-        tgt_idx = 4
-        if( verb == b"set" or verb == b"try" ):
-            setting = True
-            tgt_idx = 5
-
-        # Multi-target flood message
-        tgt_out = len( dgm ) - 1
-        tgts = dgm[ tgt_idx: tgt_out ]
-        for tgt in tgts:
-            ip = self.system.getCamIP( int( tgt.decode("utf-8") ) )
-            if( ip is None ):
-                print("Unknown Cam id")
-                continue
-            msg = ""
-            if( setting ):
-                msg = "{}:set {} {}".format( ip, noun, dgm[ 4 ] )
-                self.com_mgr.q_cmds.put( msg )
-            else: #get exe
-                msg = "{}:{} {}".format( ip, verb, noun )
-                self.com_mgr.q_cmds.put( msg )
-            log.info( "hCNC> " + msg )
-
-    def execute( self ):
-        # Start Services
-        self.det_mgr.start()
-        self.com_mgr.start()
-
-        # Say hello to the cameras
-        #self.com_mgr.q_cmds.put("192.168.0.32:get hello")
-
-        while( self.running.isSet() ):
-            # look for commands from clients
-            coms = dict( self.poller.poll( 0 ) )
-            if (coms.get( self.cnc_in ) == zmq.POLLIN):
-                dgm = self.cnc_in.recv_multipart()
-                # Should we could test the validity of the request?
-                # Acnowlage recipt, and give a "Message Number"
-                self.acks += 1
-                ack = struct.pack( "I", self.acks )
-                self.cnc_in.send_multipart( [ dgm[ 0 ], b'', ack ] )
-                self.handleCNC( dgm )
-
-                # Emit a pub saying msg 'ack' has been done.
-                self.data_pub.send_multipart( [ Comms.ABT_TOPIC_STATE_B, b"", b"DID", ack ] )
-
-            # Check for Dets or Images to send out
-            # TODO: In the future, merge frames from different families of cameras
-            if( not self.det_mgr.q_out.empty() ):
-                data = self.det_mgr.q_out.get()
-                self.publishDets( data ) # Make this a callback in the det man?
-
-            # Look for misc & Orphans from cameraComms
-            while( not self.com_mgr.q_misc.empty() ):
-                _, data = self.com_mgr.q_misc.get( block=False, timeout=0.001 )
-                print( data )
-                dtype, timecode, msg = data
-                self.data_pub.send_multipart( [ Comms.ABT_TOPIC_STATE_B, b"", msg ] )
-
-    def publishDets( self, data ):
-        time, strides, dets = data
-        self.data_pub.send_multipart( [ Comms.ABT_TOPIC_ROIDS_B, b"",
-                                        bytes( str( time ), "utf-8" ),
-                                        strides.tobytes(),
-                                        dets.tobytes() ] )
-        log.info( "sent dets" )
-
-    def cleanClose( self ):
-        print( self.system )
-        # Close managers
-        self.com_mgr.running.clear()
-        self.det_mgr.running.clear()
-
-        # Close sockets for graceful shutdown
-        self.cnc_in.close()
-        self.state_pub.close()
-        self.data_pub.close()
-        self._zctx.term()
-
-if( __name__ == "__main__" ):
-    app = Arbiter( "192.168.0.20" )
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" arbiter.py - "We sense a soul in search of answers"
+
+    The Arbiter is the "core" loop. it will manage multiple ZMQ services:
+
+    CameraCnC  : DB Multi Client access to camera settings
+    SysState   : DB Camera List changes, Camera settings <- Lots to do here
+
+    SysAnnounce: PS Flag the state has changed, Subs Req what they're interested in
+    Centroids  : PS Stream of Centroids from the MoCap System
+    Images     : PS Images from the MoCap Cameras
+    Orphans    : PS Any Centroids arriving after their Packet Ships
+    Timecode   : PS Just HH:MM:SS:FF:ss U1:U2:U3:U4:U5:U6:U7:U8 for anyone that's interested
+    TakeCnC    : RR Transport control, a Client sets the Take name, starts recording etc
+    Transport  : PS Current & upcoming Take Name, Rec Status, target folder & name
+
+    And receive Data from the Cameras, and _do the right thing_ with it!
+
+    Problem is I don't know where to start...
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+DATA_PATH = os.path.join( _git_root_, "rpiCap", "exampleData" )
+sys.path.append( CODE_PATH )
+
+# Logging
+import logging
+logging.basicConfig()
+log = logging.getLogger( __name__ )
+log.setLevel( logging.DEBUG )
+
+#detailed_log = logging.Formatter( "%(asctime)s.%(msecs)04d [%(levelname)-8s][%(name)-16s] %(message)s {%(filename)s@%(lineno)s}", "%y%m%d %H:%M:%S" )
+#terse_log = logging.Formatter( "%(asctime)s.%(msecs)04d [%(levelname)-8s] %(message)s", "%y%m%d %H:%M:%S" )
+
+import numpy as np
+np.set_printoptions( precision=3, suppress=True )
+
+import json
+import struct
+import threading
+import zmq
+
+import Comms
+from Comms import piCam
+from Comms.piComunicate import AssembleDetFrame, CameraCommand, SimpleComms
+
+
+class Arbiter( object ):
+    """
+    The Arbiter is well named, as it abstracts away implementation level details of the MoCap cameras under it's
+    administration from various 'Agents' that attach to it to receive pertinent data.
+
+    The Arbiter will ultimatly manage the system topology, knowing which family or model of mocap cameras are attached.
+    Managing one or more sync units to control them, and finally formatting centroid data produced by the cameras into
+    "Data Frames" - representing one frame of camera detections.  The raw centroid data emited by the cameras is
+    transformed by the Arbiter into "NDC" representation.
+
+    TODO: This needs a lot of work as it's core to the system, but presently parked waiting on the UI
+
+    The main loop sleeps in one zmq Poller, which watches the C&C socket and the det man and comms' SelectableQueues,
+    so it's idle until there's something to do.
+    """
+    POLL_TIMEOUT = 250 # ms, only so a cleared running flag gets noticed
+
+    def __init__( self, local_ip=None, health_period=None, frame_version=None, mcast=False, sys_file=None ):
+        # System State, for now all cameras are piCams
+        self.system = Comms.SysManager( default_type=piCam.CAMERA_TYPE )
+
+        # Load last system state, before anything sizes itself on the number of cameras
+        self.sys_file = sys_file
+        if( self.sys_file and os.path.exists( self.sys_file ) ):
+            self.system.loadJSON( self.sys_file )
+
+        # Setup System Communications
+        self.local_ip = local_ip or "127.0.0.1"
+        self.com_mgr = SimpleComms( self.system, self.local_ip )
+        self.mcast = mcast # cameras are listening to piCam.MCAST_GRP
+
+        # Packet Handlers
+        self.det_mgr = AssembleDetFrame( self.com_mgr.q_dets, self.system, health_period=health_period )
+        #self.img_mgr = AssembleImages( self.com_mgr.q_imgs, self.system )
+
+        # Client Comunications (ZMQ)
+        self.acks = 0
+        self._zctx = zmq.Context()
+
+        self.cnc_in = self._zctx.socket( zmq.ROUTER )
+        self.cnc_in.bind( "tcp://*:{}".format( Comms.ABT_PORT_SYSCNC ) )
+
+        self.state_pub = self._zctx.socket( zmq.PUB )
+        self.state_pub.bind( "tcp://*:{}".format( Comms.ABT_PORT_SYSSTATE ) )
+
+        self.data_pub = self._zctx.socket( zmq.PUB )
+        self.data_pub.bind( "tcp://*:{}".format( Comms.ABT_PORT_DATA ) )
+
+        self.poller = zmq.Poller()
+        self.poller.register( self.cnc_in, zmq.POLLIN )
+
+        # Data Frames are sent zero copy, so the det man's buffers are in flight until zmq is done with them
+        # During a rollout, frame_version=1 keeps clients that don't understand newer Data Frames working
+        self.frame_version = frame_version or Comms.ABT_FRAME_VERSION
+        self.frames_pub = 0
+        self._in_flight = [] # (tracker, buf_id)
+
+        # Enable Running
+        self.running = threading.Event()
+        self.running.set()
+
+    def handleCNC( self, dgm ):
+        # currently just cameras
+        verb = dgm[ 2 ].decode( "utf-8" )
+        noun = dgm[ 3 ].decode( "utf-8" )
+
+        # setting like msg?
+        value = None
+        tgt_idx = 4
+        if( verb == "set" or verb == "try" ):
+            verb = "set"
+            value = dgm[ 4 ].decode( "utf-8" )
+            tgt_idx = 5
+
+        # Multi-target flood message, encoded once and fanned out by the com man
+        tgt_out = len( dgm ) - 1
+        ips = []
+        for tgt in dgm[ tgt_idx: tgt_out ]:
+            ip = self.system.getCamIP( int( tgt.decode("utf-8") ) )
+            if( ip is None ):
+                print("Unknown Cam id")
+                continue
+            ips.append( ip )
+
+        if( not ips ):
+            return
+
+        # System wide sets & exes can go in one datagram to the multicast group
+        broadcast = self.mcast and verb != "get" and len( ips ) == self.system.num_cams
+
+        try:
+            cmd = CameraCommand.compose( verb, noun, value, ips, broadcast=broadcast )
+        except (KeyError, ValueError):
+            log.warning( "hCNC> Can't encode '{} {} {}'".format( verb, noun, value ) )
+            return
+
+        self.com_mgr.q_cmds.put( cmd )
+        log.info( "hCNC> {}".format( cmd ) )
+
+    def execute( self ):
+        # Start Services
+        self.det_mgr.start()
+        self.com_mgr.start()
+
+        # Say hello to the cameras
+        #self.com_mgr.q_cmds.put("192.168.0.32:get hello")
+
+        # Sleep in the poller until a client, the det man, or the cameras have something for us
+        # it hands back the file descriptor of anything that isn't a zmq socket
+        # NOTE: On a single core this costs ~0.2ms median latency against spinning, which kept the core busy so the
+        # comms thread woke late and took a frame's datagrams in one batch.  The spin costs a whole core though
+        self.poller.register( self.det_mgr.q_out.fileno(), zmq.POLLIN )
+        self.poller.register( self.det_mgr.q_health.fileno(), zmq.POLLIN )
+        self.poller.register( self.com_mgr.q_misc.fileno(), zmq.POLLIN )
+        self.poller.register( self.com_mgr.q_acks.fileno(), zmq.POLLIN )
+
+        while( self.running.isSet() ):
+            coms = dict( self.poller.poll( self.POLL_TIMEOUT ) )
+
+            # look for commands from clients, a pipelining client may have sent several
+            if (coms.get( self.cnc_in ) == zmq.POLLIN):
+                while( True ):
+                    try:
+                        dgm = self.cnc_in.recv_multipart( zmq.NOBLOCK )
+                    except zmq.Again:
+                        break
+                    # Should we could test the validity of the request?
+                    # Acnowlage recipt, and give a "Message Number"
+                    self.acks += 1
+                    ack = struct.pack( "I", self.acks )
+                    # echo a pipelining client's request id, from after the K?, so it can match the ack
+                    self.cnc_in.send_multipart( [ dgm[ 0 ], b'', ack + dgm[ -1 ][ len( Comms.ABT_CNC_END ): ] ] )
+                    self.handleCNC( dgm )
+
+                    # Emit a pub saying msg 'ack' has been done.
+                    self.data_pub.send_multipart( [ Comms.ABT_TOPIC_STATE_B, b"", b"DID", ack ] )
+
+            # Check for Dets or Images to send out
+            # TODO: In the future, merge frames from different families of cameras
+            if( self.det_mgr.q_out.fileno() in coms ):
+                for data in self.det_mgr.q_out.drain():
+                    self.publishDets( data ) # Make this a callback in the det man?
+
+            # Hand back any buffers zmq has finished sending
+            if( self._in_flight ):
+                self.releaseSent()
+
+            # Camera health snapshots
+            if( self.det_mgr.q_health.fileno() in coms ):
+                for snapshot in self.det_mgr.q_health.drain():
+                    self.publishHealth( snapshot )
+
+            # Look for misc & Orphans from cameraComms
+            if( self.com_mgr.q_misc.fileno() in coms ):
+                for _, data in self.com_mgr.q_misc.drain():
+                    dtype, timecode, msg = data
+                    self.data_pub.send_multipart( [ Comms.ABT_TOPIC_STATE_B, b"", msg ] )
+
+            # Multicast commands the cameras have (or haven't) answered
+            if( self.com_mgr.q_acks.fileno() in coms ):
+                for cmd, acked, missing in self.com_mgr.q_acks.drain():
+                    self.publishAcks( cmd, acked, missing )
+
+    def publishDets( self, data ):
+        time, sys_hash, strides, dets, buf_id = data
+        self.frames_pub += 1
+        parts = Comms.encodeFrame( self.frames_pub, time, sys_hash, strides, dets,
+                                   version=self.frame_version )
+        # zmq sends straight out of the det man's buffer, so it can't be reused until the tracker says it's done
+        tracker = self.data_pub.send_multipart( [ Comms.ABT_TOPIC_ROIDS_B, b"" ] + parts, copy=False, track=True )
+        self._in_flight.append( (tracker, buf_id) )
+
+    def releaseSent( self ):
+        # Slow subscribers can hold a frame longer than newer ones, so check them all
+        in_flight = []
+        for tracker, buf_id in self._in_flight:
+            if( tracker.done ):
+                self.det_mgr.release( buf_id )
+            else:
+                in_flight.append( (tracker, buf_id) )
+        self._in_flight = in_flight
+
+    def publishAcks( self, cmd, acked, missing ):
+        if( missing ):
+            log.warning( "No ack for multicast '{} {}' from {}".format( cmd.verb, cmd.noun, missing ) )
+        report = {
+            "verb"    : cmd.verb,
+            "noun"    : cmd.noun,
+            "acked"   : len( acked ),
+            "missing" : [ self.system.cam_dict.get( ip ) for ip in missing ],
+            "spread"  : 1000. * (max( acked.values() ) - min( acked.values() )) if acked else 0., # ms
+        }
+        self.state_pub.send_multipart( [ Comms.ABT_TOPIC_STATE_B, b"", b"ACKS",
+                                         bytes( json.dumps( report ), "utf-8" ) ] )
+
+    def publishHealth( self, snapshot ):
+        self.state_pub.send_multipart( [ Comms.ABT_TOPIC_STATE_B, b"", b"HEALTH",
+                                         bytes( json.dumps( snapshot ), "utf-8" ) ] )
+
+    def cleanClose( self ):
+        print( self.system )
+        # Remember the topology, so camera ids are the same next time
+        if( self.sys_file ):
+            try:
+                self.system.saveJSON( self.sys_file )
+            except OSError as e:
+                log.warning( "Couldn't save the system to '{}': {}".format( self.sys_file, e ) )
+
+        # Close managers
+        self.com_mgr.running.clear()
+        self.det_mgr.running.clear()
+
+        # Close sockets for graceful shutdown
+        self.cnc_in.close()
+        self.state_pub.close()
+        self.data_pub.close()
+        self._zctx.term()
+
+if( __name__ == "__main__" ):
+    app = Arbiter( "192.168.0.20", sys_file=os.path.join( DATA_PATH, "system.json" ) )
     app.execute()
\ No newline at end of file
@@ -0,0 +1,265 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" archiveTakes.py - Convert & compress a shoot day's takes, in parallel
+
+    Takes are cut into blocks of frames, and the blocks compressed by a pool of processes, so one long take keeps every
+    core busy as well as a directory of short ones.  Pickled takes are converted first, a take to a process.
+
+        python Apps/archiveTakes.py /shoots/day3 -j 8          # .pik -> .take -> .takez
+        python Apps/archiveTakes.py /shoots/day3 --expand      # .takez -> .take
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+sys.path.append( CODE_PATH )
+
+# Logging
+import logging
+logging.basicConfig()
+log = logging.getLogger( __name__ )
+log.setLevel( logging.DEBUG )
+
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import glob
+import time
+
+import numpy as np
+
+from Utils.takeFile import TakeReader, TakeWriter, convertPik
+from Utils.takeArchive import ArchiveReader, blockRanges, getCodec, packBlock, unpackBlock, writeArchive, \
+    BLOCK_FRAMES, CODECS, DEFAULT_CODEC, FILTERS
+
+WINDOW = 4 * (os.cpu_count() or 1) # blocks in flight
+
+
+# Each worker keeps the take it's on open, and its codec, between blocks
+_worker = { "path": None, "take": None, "codec": None, "funcs": None }
+
+
+def _open( path, opener ):
+    if( _worker[ "path" ] != path ):
+        if( _worker[ "take" ] is not None and hasattr( _worker[ "take" ], "close" ) ):
+            _worker[ "take" ].close()
+        _worker[ "take" ] = opener( path )
+        _worker[ "path" ] = path
+    return _worker[ "take" ]
+
+
+def _codec( codec, level ):
+    if( _worker[ "codec" ] != ( codec, level ) ):
+        _worker[ "funcs" ] = getCodec( codec, level )
+        _worker[ "codec" ] = ( codec, level )
+    return _worker[ "funcs" ]
+
+
+def _convertJob( pik_fq, rate ):
+    start = time.process_time()
+    take_fq = convertPik( pik_fq, rate=rate )
+    return (take_fq, time.process_time() - start)
+
+
+def _packJob( take_fq, start, stop, codec, level, filter_, verify ):
+    """ Compress a block, and how many bytes it was & how long it took """
+    cpu = time.process_time()
+    take = _open( take_fq, TakeReader )
+    compress, decompress = _codec( codec, level )
+    block = packBlock( take, start, stop, compress, filter_ )
+
+    offs, strides, dets, ids = take.frames( start, stop )
+    raw = take.times[ start:stop ].nbytes + offs.nbytes + strides.nbytes + dets.nbytes + ids.nbytes
+    if( verify ):
+        _, times, v_strides, v_dets, v_ids = unpackBlock( block, take.num_cams, decompress, filter_ )
+        if( not (np.array_equal( times, take.times[ start:stop ] ) and np.array_equal( v_strides, strides ) and
+                 np.array_equal( v_dets, dets ) and np.array_equal( v_ids, ids )) ):
+            raise ValueError( "'{}' frames {}:{} didn't survive compression".format( take_fq, start, stop ) )
+
+    return (block, raw, time.process_time() - cpu)
+
+
+def _unpackJob( arch_fq, idx ):
+    cpu = time.process_time()
+    arch = _open( arch_fq, ArchiveReader )
+    _, times, strides, dets, ids = arch.block( idx )
+    return ( ( times, strides, dets, ids ), time.process_time() - cpu )
+
+
+def _inOrder( pool, jobs, window ):
+    """ Results of jobs, in order, with no more than window of them in flight or waiting """
+    pending = deque()
+    for job in jobs:
+        pending.append( pool.submit( *job ) )
+        if( len( pending ) >= window ):
+            yield pending.popleft().result()
+    while( pending ):
+        yield pending.popleft().result()
+
+
+def findTakes( paths, exts ):
+    """
+    :param paths: (list) files, or directories to look in
+    :param exts: (tuple) extensions wanted in directories
+    :return: (list) the files, sorted
+    """
+    found = []
+    for path in paths:
+        if( os.path.isdir( path ) ):
+            for ext in exts:
+                found.extend( glob.glob( os.path.join( path, "*" + ext ) ) )
+        else:
+            found.append( path )
+    return sorted( set( found ) )
+
+
+def _report( name, frames, raw, packed, cpu ):
+    print( "{}: {} frames, {:.1f} MB -> {:.1f} MB, {:.2f}:1, {:.1f} MB/s per core".format(
+        name, frames, raw / 1e6, packed / 1e6, raw / max( packed, 1 ), raw / 1e6 / max( cpu, 1e-9 ) ) )
+
+
+def convertAll( pool, piks, rate=0. ):
+    """ Convert .piks to takes, one to a process.  Returns the takes """
+    takes = []
+    for take_fq, cpu in pool.map( _convertJob, piks, [ rate ] * len( piks ) ):
+        print( "{} converted in {:.2f}s".format( take_fq, cpu ) )
+        takes.append( take_fq )
+    return takes
+
+
+def compressAll( pool, takes, out_path=None, codec=None, level=None, filter_="delta", block_frames=None,
+                 verify=False, window=None ):
+    """
+    Archive takes, their blocks compressed in parallel.
+
+    :param pool: (Executor) the workers
+    :param takes: (list) takes to archive
+    :param out_path: (str) directory for the archives, default is next to the take
+    :param codec: (str) compressor. Default: DEFAULT_CODEC
+    :param level: (int) compression level, default is the codec's
+    :param filter_: (str) "delta" or "none"
+    :param block_frames: (int) frames in a block
+    :param verify: (bool) check each block expands back to what it was
+    :param window: (int) blocks in flight, bounds the memory used. Default: WINDOW
+    :return: (tuple) raw bytes, archived bytes, cpu seconds
+    """
+    codec = codec or DEFAULT_CODEC
+    block_frames = block_frames or BLOCK_FRAMES
+
+    # every take's blocks in one stream, so the pool moves on to the next take while this one's being written
+    plan = []
+    for take_fq in takes:
+        with TakeReader( take_fq ) as take:
+            plan.append( ( take_fq, take.num_frames, blockRanges( take.num_frames, block_frames ) ) )
+    jobs = ( ( _packJob, take_fq, start, stop, codec, level, filter_, verify )
+             for take_fq, _, ranges in plan for start, stop in ranges )
+    results = _inOrder( pool, jobs, window or WINDOW )
+
+    total_raw = total_packed = total_cpu = 0
+    for take_fq, num_frames, ranges in plan:
+        arch_fq = os.path.splitext( take_fq )[ 0 ] + ".takez"
+        if( out_path ):
+            arch_fq = os.path.join( out_path, os.path.basename( arch_fq ) )
+
+        raw = cpu = 0
+        def blocks():
+            nonlocal raw, cpu
+            for _ in ranges:
+                block, b_raw, b_cpu = next( results )
+                raw += b_raw
+                cpu += b_cpu
+                yield block
+
+        with TakeReader( take_fq ) as take:
+            packed = writeArchive( arch_fq, take, blocks(), block_frames, codec, filter_ )
+        _report( "{} -> {}".format( take_fq, arch_fq ), num_frames, raw, packed, cpu )
+        total_raw += raw
+        total_packed += packed
+        total_cpu += cpu
+
+    return (total_raw, total_packed, total_cpu)
+
+
+def expandAll( pool, archives, out_path=None, window=None ):
+    """ Archives back to takes.  Returns the frames written """
+    frames = 0
+    for arch_fq in archives:
+        arch = ArchiveReader( arch_fq )
+        take_fq = os.path.splitext( arch_fq )[ 0 ] + ".take"
+        if( out_path ):
+            take_fq = os.path.join( out_path, os.path.basename( take_fq ) )
+
+        jobs = ( ( _unpackJob, arch_fq, idx ) for idx in range( arch.num_blocks ) )
+        with TakeWriter( take_fq, num_cams=arch.num_cams, rate=arch.rate, frames_cap=arch.num_frames,
+                         dets_cap=arch.num_dets ) as writer:
+            for ( times, strides, dets, ids ), _ in _inOrder( pool, jobs, window or WINDOW ):
+                writer.append( times, strides, dets, ids )
+        print( "{} -> {}: {} frames".format( arch_fq, take_fq, arch.num_frames ) )
+        frames += arch.num_frames
+
+    return frames
+
+
+if( __name__ == "__main__" ):
+    parser = argparse.ArgumentParser( description="Convert & compress takes, in parallel" )
+    parser.add_argument( "paths", nargs="+", help="Takes, or directories of them" )
+    parser.add_argument( "-o", "--out", action="store", dest="out_path", default=None,
+                         help="Directory to write to. Default: next to the input" )
+    parser.add_argument( "-j", "--jobs", action="store", dest="jobs", default=os.cpu_count(), type=int,
+                         help="Worker processes. Default: one per core" )
+    parser.add_argument( "-c", "--codec", action="store", dest="codec", default=DEFAULT_CODEC, choices=list( CODECS ),
+                         help="Compressor, zstd & lz4 if they're installed. Default: {}".format( DEFAULT_CODEC ) )
+    parser.add_argument( "-l", "--level", action="store", dest="level", default=None, type=int,
+                         help="Compression level. Default: the codec's" )
+    parser.add_argument( "-f", "--filter", action="store", dest="filter_", default="delta", choices=FILTERS,
+                         help="Filter before compressing. Default: delta" )
+    parser.add_argument( "-b", "--block", action="store", dest="block_frames", default=BLOCK_FRAMES, type=int,
+                         help="Frames in a block. Default: {}".format( BLOCK_FRAMES ) )
+    parser.add_argument( "-r", "--rate", action="store", dest="rate", default=0., type=float,
+                         help="Frame rate of .pik takes. Default: unknown" )
+    parser.add_argument( "--verify", action="store_true", dest="verify", help="Check every block expands back" )
+    parser.add_argument( "--expand", action="store_true", dest="expand", help="Expand .takez archives to takes" )
+    args = parser.parse_args()
+
+    if( args.out_path ):
+        os.makedirs( args.out_path, exist_ok=True )
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor( max_workers=args.jobs ) as pool:
+        if( args.expand ):
+            frames = expandAll( pool, findTakes( args.paths, ( ".takez", ) ), out_path=args.out_path )
+            print( "Expanded {} frames in {:.1f}s".format( frames, time.perf_counter() - start ) )
+
+        else:
+            inputs = findTakes( args.paths, ( ".pik", ".take" ) )
+            piks = [ path for path in inputs if path.endswith( ".pik" ) ]
+            takes = [ path for path in inputs if not path.endswith( ".pik" ) ]
+            # a .pik with a take already is done
+            piks = [ path for path in piks if os.path.splitext( path )[ 0 ] + ".take" not in takes ]
+            takes.extend( convertAll( pool, piks, rate=args.rate ) )
+
+            raw, packed, cpu = compressAll( pool, sorted( takes ), out_path=args.out_path, codec=args.codec,
+                                            level=args.level, filter_=args.filter_, block_frames=args.block_frames,
+                                            verify=args.verify )
+            wall = time.perf_counter() - start
+            print( "{} takes, {:.1f} MB -> {:.1f} MB, {:.2f}:1 with {} {}, {:.1f} MB/s on {} processes, "
+                   "{:.1f} MB/s per core".format( len( takes ), raw / 1e6, packed / 1e6, raw / max( packed, 1 ),
+                                                  args.codec, args.filter_, raw / 1e6 / wall, args.jobs,
+                                                  raw / 1e6 / max( cpu, 1e-9 ) ) )
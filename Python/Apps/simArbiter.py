@@ -1,272 +1,341 @@
-# 
-# Copyright (C) 2016~2022 The Gimli Project
-# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
-#
-# Gimli is free software: you can redistribute it and/or modify
-# it under the terms of the GNU General Public License as published by
-# the Free Software Foundation, either version 3 of the License, or
-# (at your option) any later version.
-#
-# Gimli is distributed in the hope that it will be useful,
-# but WITHOUT ANY WARRANTY; without even the implied warranty of
-# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
-# GNU General Public License for more details.
-#
-# You should have received a copy of the GNU General Public License
-# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
-#
-
-""" simArbiter.py - "We sense a soul in search of answers"
-
-    This Tool will simulate the desired functionality of the arbiter.  Like a simCam
-    it will play back the exemplor data files to simulate a working MoCap system,
-    and it will simulate cameras responding correctly to C&C messages.
-
-    For now it will emulate a basic Mocap system of 10 cameras and 1 sync unit.
-"""
-
-# Workaround not being in PATH
-import os, sys
-_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) )
-print( _git_root_ )
-CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
-DATA_PATH = os.path.join( _git_root_, "Gimli", "ExampleData" )
-sys.path.append( CODE_PATH )
-
-# Logging
-import logging
-logging.basicConfig()
-log = logging.getLogger( __name__ )
-log.setLevel( logging.DEBUG )
-
-#detailed_log = logging.Formatter( "%(asctime)s.%(msecs)04d [%(levelname)-8s][%(name)-16s] %(message)s {%(filename)s@%(lineno)s}", "%y%m%d %H:%M:%S" )
-#terse_log = logging.Formatter( "%(asctime)s.%(msecs)04d [%(levelname)-8s] %(message)s", "%y%m%d %H:%M:%S" )
-
-import argparse
-import numpy as np
-np.set_printoptions( precision=3, suppress=True )
-import pickle
-from queue import SimpleQueue
-import struct
-import threading
-import time
-import zmq
-
-import Comms
-from Core.math3D import FLOAT_T, ID_T
-
-class Metronome( threading.Thread ):
-    """ This looks familiar! """
-
-    def __init__( self, the_flag, delay ):
-        super( Metronome, self ).__init__()
-        self._flag = the_flag
-        self._delay = delay
-        self.running = threading.Event()
-        self.running.set()
-
-    def run( self ):
-        while self.running.isSet():
-            time.sleep( self._delay )
-            self._flag.set()
-
-    def stop( self ):
-        self.running.clear()
-
-
-class Arbiter( object ):
-
-    def __init__( self, replay=None, rate=None, step=None ):
-        # inits
-        self.replay = replay or "calibration"
-        self.rate = rate or 25
-        self.step = step or 3
-
-        # System State
-        self.system = Comms.SysManager()
-
-        # No actual system communications, hold the det/com mans queues yourself
-        self.q_misc = SimpleQueue()
-
-        # Client Communications (ZMQ)
-        self.acks = 0
-        self._zctx = zmq.Context()
-
-        self.cnc_in = self._zctx.socket( zmq.ROUTER )
-        self.cnc_in.bind( "tcp://*:{}".format( Comms.ABT_PORT_SYSCNC ) )
-
-        self.state_pub = self._zctx.socket( zmq.PUB )
-        self.state_pub.bind( "tcp://*:{}".format( Comms.ABT_PORT_SYSSTATE ) )
-
-        self.data_pub = self._zctx.socket( zmq.PUB )
-        self.data_pub.bind( "tcp://*:{}".format( Comms.ABT_PORT_DATA ) )
-
-        self.poller = zmq.Poller()
-        self.poller.register( self.cnc_in, zmq.POLLIN )
-
-        # Setup a bogus system
-        _BOGO_SYS_ = {
-            "Sync" : "192.168.10.100",
-            "Cam1" : "192.168.10.101",
-            "Cam2" : "192.168.10.102",
-            "Cam3" : "192.168.10.103",
-            "Cam4" : "192.168.10.104",
-            "Cam5" : "192.168.10.105",
-            "Cam6" : "192.168.10.106",
-            "Cam7" : "192.168.10.107",
-            "Cam8" : "192.168.10.108",
-            "Cam9" : "192.168.10.109",
-            "CamA" : "192.168.10.110",
-        }
-        cam_list = [ c for c in _BOGO_SYS_.keys() if c.startswith("C") ]
-        for cam in cam_list:
-            self.system.manualAdd( cam )
-        self.system.remarshelCameras()
-
-
-        # setup replay
-        self.ticks = 0
-        self.cur_frame = 0
-        self.frames = []
-        self.strides = []
-        self.num_frames = 0
-        self.sent_frames = 0
-        self._setupReplay()
-
-        # a clock thread to tick the data replay
-        self.tick = threading.Event()
-        self.tick.clear()
-        self.timer = Metronome( self.tick, 1.0 / self.rate )
-
-        # Enable Running
-        self.running = threading.Event()
-        self.running.set()
-
-    def _setupReplay( self ):
-        # load up the replay files
-        frames=[]
-        with open( os.path.join( DATA_PATH, self.replay + ".pik" ), "rb" ) as fh:
-            frames = pickle.load( fh )
-
-        # repack each frame
-        self.num_frames = len( frames )
-        empties = 0
-        for (stride, frame, ids) in frames:
-            # I'll have that as NumPy, thanks
-            np_frames = np.array( frame, dtype=FLOAT_T )
-            np_stride = np.array( stride, dtype=ID_T )
-            if( len(np_frames) == 0 ):
-                empties += 1
-            self.frames.append( np_frames )
-            self.strides.append( np_stride )
-            
-        print( "Prepared {} frames, containing {} Empty frames".format( self.num_frames, empties ) )
-
-    def handleCNC( self, dgm ):
-        # currently just cameras
-        verb = dgm[ 2 ]
-        noun = dgm[ 3 ]
-
-        # setting like msg?
-        setting = False
-        tgt_idx = 4
-        if( verb == b"set" or verb == b"try" ):
-            setting = True
-            tgt_idx = 5
-
-        # Multi-target flood message
-        tgt_out = len( dgm ) - 1
-        tgts = dgm[ tgt_idx: tgt_out ]
-        for tgt in tgts:
-            ip = self.system.getCamIP( int( tgt.decode("utf-8") ) )
-            if( ip is None ):
-                print("Unknown Cam id")
-                continue
-            msg = ""
-            if( setting ):
-                msg = "{}:set {} {}".format( ip, noun, dgm[ 4 ] )
-                # todo: set on the bogo sys
-            else:
-                msg = "{}:{} {}".format( ip, verb, noun )
-            log.info( "hCNC> " + msg )
-        # Simulate the result of this??
-
-    def execute( self ):
-        # Start Services
-        self.timer.start()
-
-        # run
-        while( self.running.isSet() ):
-            try:
-                # look for commands from clients
-                coms = dict( self.poller.poll( 0 ) )
-                if( coms.get( self.cnc_in ) == zmq.POLLIN ):
-                    dgm = self.cnc_in.recv_multipart()
-                    # Should we could test the validity of the request?
-                    # Acknowledge receipt, and give a "Message Number"
-                    self.acks += 1
-                    ack = struct.pack( "I", self.acks )
-                    self.cnc_in.send_multipart( [ dgm[ 0 ], b'', ack ] )
-                    self.handleCNC( dgm )
-
-                    # Emit a pub saying msg 'ack' has been done.
-                    self.data_pub.send_multipart( [ Comms.ABT_TOPIC_STATE_B, b"", b"DID", ack ] )
-
-                # Send some data
-                if( self.tick.isSet() ):
-                    data = [ self.cur_frame, self.strides[self.cur_frame], self.frames[self.cur_frame] ]
-                    self.publishDets( data ) # Make this a callback in the det man?
-                    self.ticks += 1
-                    self.cur_frame += (self.step + 1)
-                    if( self.cur_frame > self.num_frames ):
-                        self.cur_frame = 0
-                    self.tick.clear()
-
-                # Look for misc & Orphans from cameraComms
-                while( not self.q_misc.empty() ):
-                    _, data = self.q_misc.get( block=False, timeout=0.001 )
-                    print( data )
-                    dtype, timecode, msg = data
-                    self.data_pub.send_multipart( [ Comms.ABT_TOPIC_STATE_B, b"", msg ] )
-
-            except KeyboardInterrupt:
-                print( "Closing due to Interupt" )
-                self.running.clear()
-
-        # while running
-        self.cleanClose()
-        print( "Sent {} frames".format( self.sent_frames ) )
-
-    def publishDets( self, data ):
-        _, strides, dets = data
-        self.data_pub.send_multipart( [ Comms.ABT_TOPIC_ROIDS_B, b"",
-                                        bytes( str( self.ticks ), "utf-8" ),
-                                        strides.tobytes(),
-                                        dets.tobytes() ] )
-        #log.info( "sent dets" )
-        self.sent_frames += 1
-
-    def cleanClose( self ):
-        print( self.system )
-        self.timer.stop()
-        # Close sockets for graceful shutdown
-        self.cnc_in.close()
-        self.state_pub.close()
-        self.data_pub.close()
-        self._zctx.term()
-
-
-if( __name__ == "__main__" ):
-    parser = argparse.ArgumentParser()
-    parser.add_argument( "-s", "--simulate", action="store", dest="replay", default="calibration",
-                         help="Replay data file. Can be 'calibration' or 'rom'. Default: calibration" )
-    parser.add_argument( "-r", "--rate", action="store", dest="rate", default=25,
-                         help="Rate (fps). Default: 25", type=int )
-    parser.add_argument( "-k", "--skip", action="store", dest="step", default=3,
-                         help="Frames to skip. if data is 100fps and rate is 25 skip=3 to get realtime. Default:3",
-                         type=int )
-
-    args = parser.parse_args()
-
-    app = Arbiter( replay=args.replay, rate=args.rate, step=args.step )
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" simArbiter.py - "We sense a soul in search of answers"
+
+    This Tool will simulate the desired functionality of the arbiter.  Like a simCam
+    it will play back the exemplor data files to simulate a working MoCap system,
+    and it will simulate cameras responding correctly to C&C messages.
+
+    For now it will emulate a basic Mocap system of 10 cameras and 1 sync unit.
+
+    The replay is played from a take through a TakePlayer, and can be driven by "trans" C&C commands (see
+    handleTrans), the transport's state is published on the TRANS topic.
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) )
+print( _git_root_ )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+DATA_PATH = os.path.join( _git_root_, "Gimli", "ExampleData" )
+sys.path.append( CODE_PATH )
+
+# Logging
+import logging
+logging.basicConfig()
+log = logging.getLogger( __name__ )
+log.setLevel( logging.DEBUG )
+
+#detailed_log = logging.Formatter( "%(asctime)s.%(msecs)04d [%(levelname)-8s][%(name)-16s] %(message)s {%(filename)s@%(lineno)s}", "%y%m%d %H:%M:%S" )
+#terse_log = logging.Formatter( "%(asctime)s.%(msecs)04d [%(levelname)-8s] %(message)s", "%y%m%d %H:%M:%S" )
+
+import argparse
+import json
+import numpy as np
+np.set_printoptions( precision=3, suppress=True )
+import struct
+import threading
+import time
+import zmq
+
+import Comms
+from Utils import Metronome, SelectableQueue
+from Utils.takeFile import TakePlayer, TakeReader, convertPik
+
+class Arbiter( object ):
+    POLL_TIMEOUT = 250 # ms, only so a cleared running flag gets noticed
+    CLOCK_PERIOD = 1.0 # seconds between clock reports
+
+    def __init__( self, replay=None, rate=None, step=None, frame_version=None, policy=None, send_ids=False ):
+        # inits
+        self.replay = replay or "calibration"
+        self.rate = rate or 25
+        self.policy = policy or Metronome.CATCH_UP
+        self.step = step or 3
+        self.frame_version = frame_version or Comms.ABT_FRAME_VERSION
+        self.send_ids = send_ids # the take's labels are an extra part, clients expecting a fixed 5 part message break
+
+        # System State
+        self.system = Comms.SysManager()
+
+        # No actual system communications, hold the det/com mans queues yourself
+        self.q_misc = SelectableQueue()
+
+        # Client Communications (ZMQ)
+        self.acks = 0
+        self._zctx = zmq.Context()
+
+        self.cnc_in = self._zctx.socket( zmq.ROUTER )
+        self.cnc_in.bind( "tcp://*:{}".format( Comms.ABT_PORT_SYSCNC ) )
+
+        self.state_pub = self._zctx.socket( zmq.PUB )
+        self.state_pub.bind( "tcp://*:{}".format( Comms.ABT_PORT_SYSSTATE ) )
+
+        self.data_pub = self._zctx.socket( zmq.PUB )
+        self.data_pub.bind( "tcp://*:{}".format( Comms.ABT_PORT_DATA ) )
+
+        self.poller = zmq.Poller()
+        self.poller.register( self.cnc_in, zmq.POLLIN )
+
+        # Setup a bogus system
+        _BOGO_SYS_ = {
+            "Sync" : "192.168.10.100",
+            "Cam1" : "192.168.10.101",
+            "Cam2" : "192.168.10.102",
+            "Cam3" : "192.168.10.103",
+            "Cam4" : "192.168.10.104",
+            "Cam5" : "192.168.10.105",
+            "Cam6" : "192.168.10.106",
+            "Cam7" : "192.168.10.107",
+            "Cam8" : "192.168.10.108",
+            "Cam9" : "192.168.10.109",
+            "CamA" : "192.168.10.110",
+        }
+        cam_list = [ c for c in _BOGO_SYS_.keys() if c.startswith("C") ]
+        self.system._load( sorted( _BOGO_SYS_[ cam ] for cam in cam_list ) ) # in ip order, no need to remarshel
+
+
+        # setup replay
+        self.ticks = 0
+        self.take = None
+        self.player = None
+        self.num_frames = 0
+        self.sent_frames = 0
+        self._setupReplay()
+
+        # a clock thread to tick the data replay, when dropping a mailbox means only the latest tick is ever waiting
+        self.tick = SelectableQueue( maxlen=1 if (self.policy == Metronome.DROP) else None )
+        self.timer = Metronome( self.tick, 1.0 / self.rate, policy=self.policy )
+
+        # Enable Running
+        self.running = threading.Event()
+        self.running.set()
+
+    def _setupReplay( self ):
+        # Map the take, converting the pickled example data the first time it's played
+        take_fq = os.path.join( DATA_PATH, self.replay + ".take" )
+        if( not os.path.exists( take_fq ) ):
+            convertPik( os.path.join( DATA_PATH, self.replay + ".pik" ), take_fq )
+        self.take = TakeReader( take_fq )
+        self.player = TakePlayer( self.take, speed=self.step + 1 )
+
+        self.num_frames = len( self.take )
+        empties = int( np.count_nonzero( np.diff( self.take.offsets ) == 0 ) )
+        print( "Prepared {} frames, containing {} Empty frames".format( self.num_frames, empties ) )
+
+    def handleCNC( self, dgm ):
+        # cameras, or the replay's transport
+        verb = dgm[ 2 ]
+        noun = dgm[ 3 ]
+
+        if( verb == b"trans" ):
+            value = dgm[ 4 ].decode( "utf-8" ) if (len( dgm ) > 5) else None
+            self.handleTrans( noun.decode( "utf-8" ), value )
+            return
+
+        # setting like msg?
+        setting = False
+        tgt_idx = 4
+        if( verb == b"set" or verb == b"try" ):
+            setting = True
+            tgt_idx = 5
+
+        # Multi-target flood message
+        tgt_out = len( dgm ) - 1
+        tgts = dgm[ tgt_idx: tgt_out ]
+        for tgt in tgts:
+            ip = self.system.getCamIP( int( tgt.decode("utf-8") ) )
+            if( ip is None ):
+                print("Unknown Cam id")
+                continue
+            msg = ""
+            if( setting ):
+                msg = "{}:set {} {}".format( ip, noun, dgm[ 4 ] )
+                # todo: set on the bogo sys
+            else:
+                msg = "{}:{} {}".format( ip, verb, noun )
+            log.info( "hCNC> " + msg )
+        # Simulate the result of this??
+
+    def handleTrans( self, noun, value ):
+        """
+        Transport control of the replay, the new state goes out on the TRANS topic.
+
+            play, pause          : start & stop the head, the frame under it is still sent while paused
+            speed <frames>       : frames to move per tick, negative plays backwards, fractions slower
+            seek <frame>         : go to a frame
+            seek <HH:MM:SS:FF>   : go to the first frame stamped at or after the timecode
+            range <start:stop>   : play only frames start to stop-1, either can be left out
+            loop <0|1>           : loop in the range, or stop at its ends
+
+        :param noun: (str) the command
+        :param value: (str) its argument, if it has one
+        """
+        player = self.player
+        try:
+            if( noun == "play" ):
+                player.playing = True
+
+            elif( noun == "pause" ):
+                player.playing = False
+
+            elif( noun == "speed" ):
+                player.speed = float( value )
+
+            elif( noun == "seek" ):
+                if( ":" in value ):
+                    # Packed as a Data Frame's time stamp
+                    toks = [ int( tok ) for tok in value.replace( ";", ":" ).split( ":" ) ]
+                    toks = (toks + [ 0, 0, 0, 0 ])[ :4 ]
+                    player.seekTime( int.from_bytes( bytes( toks ), "big" ) )
+                else:
+                    player.seek( int( value ) )
+
+            elif( noun == "range" ):
+                start, stop = (value or ":").split( ":" )
+                player.setRange( int( start ) if start else None, int( stop ) if stop else None )
+
+            elif( noun == "loop" ):
+                player.loop = value not in ( "0", "false", "False" )
+
+            else:
+                log.warning( "Unknown transport command '{}'".format( noun ) )
+                return
+
+        except (AttributeError, TypeError, ValueError) as e:
+            log.warning( "Bad transport command '{} {}': {}".format( noun, value, e ) )
+            return
+
+        self.publishTrans()
+
+    def publishTrans( self ):
+        status = self.player.status()
+        status[ "take" ] = self.replay
+        self.state_pub.send_multipart( [ Comms.ABT_TOPIC_TRANS_B, b"", bytes( json.dumps( status ), "utf-8" ) ] )
+
+    def execute( self ):
+        # Start Services
+        self.timer.start()
+        self.publishTrans()
+
+        # Sleep in the poller until a client, the clock or the bogus cameras want something
+        # it hands back the file descriptor of anything that isn't a zmq socket
+        self.poller.register( self.tick.fileno(), zmq.POLLIN )
+        self.poller.register( self.q_misc.fileno(), zmq.POLLIN )
+
+        # run
+        last_clock = time.monotonic()
+        while( self.running.isSet() ):
+            try:
+                # look for commands from clients
+                coms = dict( self.poller.poll( self.POLL_TIMEOUT ) )
+                if( coms.get( self.cnc_in ) == zmq.POLLIN ):
+                    while( True ):
+                        try:
+                            dgm = self.cnc_in.recv_multipart( zmq.NOBLOCK )
+                        except zmq.Again:
+                            break
+                        # Should we could test the validity of the request?
+                        # Acknowledge receipt, and give a "Message Number"
+                        self.acks += 1
+                        ack = struct.pack( "I", self.acks )
+                        # echo a pipelining client's request id, from after the K?, so it can match the ack
+                        self.cnc_in.send_multipart( [ dgm[ 0 ], b'', ack + dgm[ -1 ][ len( Comms.ABT_CNC_END ): ] ] )
+                        self.handleCNC( dgm )
+
+                        # Emit a pub saying msg 'ack' has been done.
+                        self.data_pub.send_multipart( [ Comms.ABT_TOPIC_STATE_B, b"", b"DID", ack ] )
+
+                # Send some data, a frame a tick.  When dropping only the latest tick gets here
+                if( self.tick.fileno() in coms ):
+                    for _ in self.tick.drain():
+                        playing = self.player.playing
+                        self.publishDets( self.player.tick() ) # Make this a callback in the det man?
+                        self.ticks += 1
+                        if( playing != self.player.playing ):
+                            self.publishTrans() # ran off the end of the range
+
+                now = time.monotonic()
+                if( now - last_clock >= self.CLOCK_PERIOD ):
+                    self.publishClock()
+                    last_clock = now
+
+                # Look for misc & Orphans from cameraComms
+                if( self.q_misc.fileno() in coms ):
+                    for _, data in self.q_misc.drain():
+                        dtype, timecode, msg = data
+                        self.data_pub.send_multipart( [ Comms.ABT_TOPIC_STATE_B, b"", msg ] )
+
+            except KeyboardInterrupt:
+                print( "Closing due to Interupt" )
+                self.running.clear()
+
+        # while running
+        self.cleanClose()
+        print( "Sent {} frames".format( self.sent_frames ) )
+
+    def publishClock( self ):
+        self.state_pub.send_multipart( [ Comms.ABT_TOPIC_STATE_B, b"", b"CLOCK",
+                                         bytes( json.dumps( self.timer.stats() ), "utf-8" ) ] )
+
+    def publishDets( self, data ):
+        frame, strides, dets, ids = data
+        # stamped with the take's time, so clients see where the replay is
+        parts = Comms.encodeFrame( self.sent_frames, int( self.take.times[ frame ] ), self.system.sys_hash, strides,
+                                   dets, ids=ids if self.send_ids else None, version=self.frame_version )
+        # the replay frames live as long as we do, so no need to track them
+        self.data_pub.send_multipart( [ Comms.ABT_TOPIC_ROIDS_B, b"" ] + parts, copy=False )
+        #log.info( "sent dets" )
+        self.sent_frames += 1
+
+    def cleanClose( self ):
+        print( self.system )
+        self.timer.stop()
+        # Close sockets for graceful shutdown
+        self.cnc_in.close()
+        self.state_pub.close()
+        self.data_pub.close()
+        self._zctx.term()
+        self.take.close() # zmq's done with the frames now
+
+
+if( __name__ == "__main__" ):
+    parser = argparse.ArgumentParser()
+    parser.add_argument( "-s", "--simulate", action="store", dest="replay", default="calibration",
+                         help="Replay data file. Can be 'calibration' or 'rom'. Default: calibration" )
+    parser.add_argument( "-r", "--rate", action="store", dest="rate", default=25,
+                         help="Rate (fps). Default: 25", type=int )
+    parser.add_argument( "-k", "--skip", action="store", dest="step", default=3,
+                         help="Frames to skip. if data is 100fps and rate is 25 skip=3 to get realtime. Default:3",
+                         type=int )
+    parser.add_argument( "-f", "--frame-version", action="store", dest="frame_version", default=None,
+                         help="Data Frame version to publish. Use 1 during a rollout, for clients that only know the "
+                              "first header. Messages are 5 parts either way, unless --ids is given. Default: newest",
+                         type=int )
+    parser.add_argument( "-i", "--ids", action="store_true", dest="send_ids",
+                         help="Publish the take's per det labels, as an extra part. Needs frame version 2 or newer" )
+    parser.add_argument( "-p", "--policy", action="store", dest="policy", default=Metronome.CATCH_UP,
+                         choices=Metronome.POLICIES,
+                         help="Late ticks: 'catchup' sends every frame, 'drop' skips them. Default: catchup" )
+
+    args = parser.parse_args()
+
+    app = Arbiter( replay=args.replay, rate=args.rate, step=args.step, frame_version=args.frame_version,
+                   policy=args.policy, send_ids=args.send_ids )
     app.execute()
\ No newline at end of file
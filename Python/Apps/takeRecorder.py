@@ -0,0 +1,183 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" takeRecorder.py - Record the Arbiter's Centroid stream to a take
+
+    Subscribes to ROIDS like any other client, so the Arbiter doesn't know or care that it's being recorded.  A PUB
+    socket drops frames for a subscriber that can't keep up rather than waiting for it, so recording can never hold
+    up the live stream.
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+sys.path.append( CODE_PATH )
+
+# Logging
+import logging
+logging.basicConfig()
+log = logging.getLogger( __name__ )
+log.setLevel( logging.DEBUG )
+
+import argparse
+import numpy as np
+import threading
+import time
+
+import Comms
+from Utils.takeFile import TakeWriter, IDS_T
+
+
+class TakeRecorder( threading.Thread ):
+    """
+    Records Data Frames to a take.  An ArbiterListen thread keeps the subscription drained into a bounded queue, this
+    thread wakes every flush_period, takes everything that's queued, and bulk writes it with a TakeWriter.  If the
+    disk can't keep up the queue fills and the oldest frames are dropped, rather than the receiver stalling.
+
+    Counters:
+        received   : frames that arrived
+        written    : frames in the take
+        dropped    : frames that arrived, but were pushed out of the queue before they were written
+        missed     : gaps in the frame numbers, frames the Arbiter sent that never got here
+        bandwidth  : bytes/s written over the last flush period
+    """
+    FLUSH_PERIOD = 0.25 # seconds
+    DEPTH = 4096 # frames queued, ~17s at 240Hz
+
+    def __init__( self, take_fq, num_cams=0, rate=0., host=None, flush_period=None, depth=None ):
+        """
+        :param take_fq: (str) The take to record, it's replaced
+        :param num_cams: (int) Cameras expected, more can turn up
+        :param rate: (float) Frame rate, noted in the take
+        :param host: (str) Where the Arbiter is, default localhost
+        """
+        # Thread setup
+        super( TakeRecorder, self ).__init__()
+        self.daemon = True
+
+        self.flush_period = flush_period or self.FLUSH_PERIOD
+        self.writer = TakeWriter( take_fq, num_cams=num_cams, rate=rate )
+        self.listen = Comms.ArbiterListen( latest=False, depth=depth or self.DEPTH, host=host )
+
+        # Counters
+        self.written = 0
+        self.missed = 0
+        self.bandwidth = 0.
+        self._last_no = None # frame number of the last frame written
+        self._dropped_seen = 0 # queue drops already accounted for in the gaps
+
+        # Thread Control
+        self.running = threading.Event()
+        self.running.set()
+
+    @property
+    def received( self ):
+        return self.listen.sub.received
+
+    @property
+    def dropped( self ):
+        return self.listen.sub.dropped
+
+    def start( self ):
+        self.listen.start()
+        super( TakeRecorder, self ).start()
+
+    def run( self ):
+        # Core Thread
+        last = time.perf_counter()
+        while( self.running.isSet() ):
+            time.sleep( self.flush_period )
+            now = time.perf_counter()
+            before = self.writer.bytes_written
+            self.record( self.listen.frames.drain() )
+            self.bandwidth = (self.writer.bytes_written - before) / (now - last)
+            last = now
+
+        # while
+        self.record( self.listen.frames.drain() ) # anything that was still queued
+        self.writer.close()
+
+    def record( self, frames ):
+        """
+        Write a batch of Data Frames.
+
+        :param frames: (list) DataFrames, in the order they arrived
+        """
+        if( not frames ):
+            return
+
+        # Gaps in the frame numbers, that weren't our queue's doing
+        first = frames[ 0 ].frame_no if (self._last_no is None) else self._last_no + 1
+        gaps = (frames[ -1 ].frame_no - first + 1) - len( frames )
+        dropped = self.dropped
+        self.missed += max( 0, gaps - (dropped - self._dropped_seen) )
+        self._dropped_seen = dropped
+        self._last_no = frames[ -1 ].frame_no
+
+        times = np.fromiter( (frame.time_stamp for frame in frames), dtype=np.int64, count=len( frames ) )
+        dets = np.concatenate( [ frame.dets for frame in frames ] )
+        ids = np.concatenate( [ frame.ids if (frame.ids is not None) else np.full( (len( frame.dets ),), -1, dtype=IDS_T )
+                                for frame in frames ] )
+        self.writer.append( times, [ frame.strides for frame in frames ], dets, ids )
+        self.writer.flush()
+        self.written += len( frames )
+
+    def stats( self ):
+        return {
+            "received"  : self.received,
+            "written"   : self.written,
+            "dropped"   : self.dropped,
+            "missed"    : self.missed,
+            "bandwidth" : self.bandwidth,
+        }
+
+    def cleanClose( self ):
+        # write out what's queued, then stop listening
+        self.running.clear()
+        self.join()
+        self.listen.running.clear()
+        self.listen.join()
+
+# class TakeRecorder
+
+
+if( __name__ == "__main__" ):
+    parser = argparse.ArgumentParser()
+    parser.add_argument( "take", action="store", help="Take file to record" )
+    parser.add_argument( "-a", "--arbiter", action="store", dest="host", default=None,
+                         help="Host the Arbiter is on. Default: localhost" )
+    parser.add_argument( "-r", "--rate", action="store", dest="rate", default=0., type=float,
+                         help="Frame rate, noted in the take. Default: unknown" )
+    parser.add_argument( "-c", "--cameras", action="store", dest="num_cams", default=0, type=int,
+                         help="Cameras expected, more can turn up. Default: 0" )
+    args = parser.parse_args()
+
+    rec = TakeRecorder( args.take, num_cams=args.num_cams, rate=args.rate, host=args.host )
+    rec.start()
+    try:
+        while( True ):
+            time.sleep( 1. )
+            stats = rec.stats()
+            print( "{written:>8} frames written, {dropped} dropped, {missed} missed, {:.2f} MB/s".format(
+                   stats[ "bandwidth" ] / 1e6, **stats ) )
+    except KeyboardInterrupt:
+        print( "Stopping" )
+
+    rec.cleanClose()
+    print( "Recorded {} frames to '{}'".format( rec.written, args.take ) )
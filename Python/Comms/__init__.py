@@ -1,296 +1,1053 @@
-# 
-# Copyright (C) 2016~2022 The Gimli Project
-# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
-#
-# Gimli is free software: you can redistribute it and/or modify
-# it under the terms of the GNU General Public License as published by
-# the Free Software Foundation, either version 3 of the License, or
-# (at your option) any later version.
-#
-# Gimli is distributed in the hope that it will be useful,
-# but WITHOUT ANY WARRANTY; without even the implied warranty of
-# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
-# GNU General Public License for more details.
-#
-# You should have received a copy of the GNU General Public License
-# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
-#
-
-"""
-MoCap Camera / control unit communications
-
-Classes at the module level are architecture agnostic.  So a concrete example, piCam is implementation info about a piCam
-piComunicate is the communication routines that are specific to that camera.  In the future there might be an "odroidCam" or
-an "arduinoCam" which will have different implementation and communication methods.  Perhaps one gets C&C over telnet.
-That is why C&C is done in a "Platonic Language" that is not related to implementation.
-
-We will also define the Arbiter's C&C Language which would be used by multipule clients without underlying knowlage of
-camera hardware and implementation details.
-"""
-import numpy as np
-import struct
-import threading
-import zmq
-
-
-class CameraTraits( object ): # D E P R I C A T E D
-    """ ToDo: NOPE! This is UI, not really anything to do with comunications
-        Object describing controllable traits of a camera. It holds GUI presentable data
-        like a human readable name, description etc, and implementation specific data
-        like how to set the value (which will be very camera dependant)
-
-        mode is a combination of Read, Write, Advanced, eXclude = "rwa", "rx"
-    """
-    def __init__(self, name, default, min, max, dtype, value=None, units=None, human_name=None, desc=None, mode=None ):
-        # required
-        self.name = name
-        self.default = default
-        self.min = min
-        self.max = max
-        self.dtype = dtype
-
-        # interface sugar
-        self.value = value or default
-        self.units = units or ""
-        self.human_name = human_name or name
-        self.desc = desc or ""
-        self.mode = mode or "rw"
-
-    def isValid( self, candidate ):
-        """ Basic Validation, override for special cases """
-        return ( (candidate <= self.max) and (candidate >= self.min) )
-
-import logging
-logging.basicConfig()
-log = logging.getLogger( __name__ )
-log.setLevel( logging.DEBUG )
-
-#detailed_log = logging.Formatter( "%(asctime)s.%(msecs)04d [%(levelname)-8s][%(name)-16s] %(message)s {%(filename)s@%(lineno)s}", "%y%m%d %H:%M:%S" )
-#terse_log = logging.Formatter( "%(asctime)s.%(msecs)04d [%(levelname)-8s] %(message)s", "%y%m%d %H:%M:%S" )
-
-class SysManager( object ):
-    """
-    Class to manage system topology, hold camera table. manage camera_ids, know camera types
-    Might pass implementation specific helpers back up to an Arbiter for converting camera detections
-    to an NDC representation, so everything outside of Arbiter is Implementation Agnostic.
-
-    This is either too complex, or not complex enough.
-
-    Would a CamControl UI have it's own sys manager internall that's updated by a P/S Topic from Arbiter?
-
-    Assumptions: IP address is fixed so camera type is consistent between sessions
-    """
-
-    def __init__( self ):
-        self._reset()
-
-    def _reset( self ):
-        self.cam_dict = {}  # ip -> id
-        self.rev_dict = {}  # id -> ip
-        self.num_cams =  0  # count of all cameras
-        self.sys_hash =  0  # if topology changes, this does too
-        self.old_hash = {}  # record of previous "state" (Cam order, list of cam ips)
-        self.bad_cams = []  # list of cameras that may be at fault
-        self.last_dgm = {}  # timestamp (BCD cast as I) of last communication from a camera
-        self.cam_type = {}  # ip -> camera data (family, type, resolution)
-
-        self.current_time = 0
-
-    def __str__( self ):
-        out = ""
-        for k, v, in self.cam_dict.items():
-            out += "{}:{}\n".format( k, v )
-        return out
-
-    def getCamId( self, cam_ip, timestamp=None ):
-        """
-        Get a camera's ID.  if it's a new camera, update the table and announce a state change.
-        Also note the last contact time for the camera, could help with diagnostics.
-        This gets run a lot!
-
-        :param cam_ip: Camera ip
-        :return: id, state_changed
-        """
-        state_changed = False
-        try:
-            cam_id = self.cam_dict[ cam_ip ]
-        except KeyError:
-            # New Camera Discovered, add to cam list
-            cam_id = self.manualAdd( cam_ip )
-            state_changed = True
-
-        if( timestamp is not None ):
-            self.last_dgm[ cam_id ] = timestamp
-
-        if( state_changed ):
-            log.info( "Setting CamID for '{}' to '{}'".format( cam_ip, cam_id ) )
-            
-        return (cam_id, state_changed)
-
-    def getCamIP( self, cam_id ):
-        return self.rev_dict.get( cam_id, None )
-
-    def manualAdd( self, cam_ip ):
-        cam_id = self.num_cams
-        self.num_cams += 1
-        self.cam_dict[ cam_ip ] = cam_id
-        self.rev_dict[ cam_id ] = cam_ip
-        self._updateHash()
-        return cam_id
-
-    def _updateHash( self ):
-        self.sys_hash += 1
-        self.old_hash[ self.sys_hash ] = self.getCamList()
-
-    def flagBadId( self, cam_id ):
-        if (not cam_id in self.bad_cams):
-            self.bad_cams.append( cam_id )
-        # leave it to the UI?
-
-    def _load( self, camip_list ):
-        # setup ids from the given list, fully resets state
-        self._reset()
-        self.cam_dict = { ip: n for n, ip in enumerate( camip_list ) }
-        self.rev_dict = { val: key for key, val in self.cam_dict.items() }
-        self.num_cams = len( self.cam_dict )
-
-    def loadJSON( self, file_fq ):
-        pass
-
-    def saveJSON( self, file_fq ):
-        # make a dict of camera data
-        dat = { }
-        for ip, id in self.cam_dict.items():
-            dat[ ip ] = {
-                "ID"    : id,
-                "FAMILY": self.cam_type[ ip ][ 0 ],
-                "TYPE"  : self.cam_type[ ip ][ 1 ],
-                "SENSOR": self.cam_type[ ip ][ 2 ],
-            }
-
-        sys_cfg = json.dumps( dat, indent=4, sort_keys=True )
-
-        with open( file_fq, "w" ) as fh:
-            fh.write( sys_cfg )
-
-    def remarshelCameras( self ):
-        """
-        Sort the cameras to be ordered by ip.  This will invalidate and frame assembly going on and corrupt your
-        calibration. use the supplied "rename map" to fix you calibration.
-        :return: (dict) rename_map - lut of old to new camera IDs
-        """
-        # ? Lock ?
-        new_dict = { ip: n for n, ip in enumerate( sorted( self.cam_dict.keys() ) ) }
-        rename_map = { val: new_dict[ key ] for key, val in self.cam_dict.items() }
-        self.cam_dict.clear()
-        self.cam_dict = new_dict
-        self.rev_dict = { val: key for key, val in self.cam_dict.items() }
-        self._updateHash()
-
-        return rename_map
-
-    def getCamList( self ):
-        return (c for c in sorted( self.cam_dict.items(), key=lambda x: x[ 1 ] ))
-
-
-# Arbiter Consts and Settings
-# Coms Ports
-ABT_PORT_SYSCNC   = 5555 # Router/Req for System Control
-ABT_PORT_SYSSTATE = 5566 # P/S for System State / Camera Info
-ABT_PORT_DATA     = 5577 # MoCap Data & Images
-
-ABT_TOPIC_STATE = "STATE" # System State
-ABT_TOPIC_TRANS = "TRANS" # Transport
-ABT_TOPIC_ROIDS = "ROIDS" # Centroid Data
-ABT_TOPIC_IMAGE = "IMAGE" # Image Data
-ABT_TOPIC_LOSTD = "LOSTD" # Orphen Daat
-
-# Pre cast to Bytes for conveniance with ZMQ
-ABT_TOPIC_STATE_B = bytes( ABT_TOPIC_STATE, "utf-8" )
-ABT_TOPIC_TRANS_B = bytes( ABT_TOPIC_TRANS, "utf-8" )
-ABT_TOPIC_ROIDS_B = bytes( ABT_TOPIC_ROIDS, "utf-8" )
-ABT_TOPIC_IMAGE_B = bytes( ABT_TOPIC_IMAGE, "utf-8" )
-ABT_TOPIC_LOSTD_B = bytes( ABT_TOPIC_LOSTD, "utf-8" )
-
-# SYS Verbs
-# CAM_EXE, SYN_EXE, GET, SET, TRY ???
-
-class ArbiterControl( object ):
-    """
-    ArbiterControl can be used in other apps to emit C&C to the Arbiter.  In future
-    embodyments it might manage the hand-off between inproc and tcp messaging for
-    a client.
-    """
-
-    def __init__( self ):
-        # Setup command socket
-        self._zctx = zmq.Context()
-        self.comand = self._zctx.socket( zmq.REQ )
-        self.comand.connect( "tcp://localhost:{}".format( ABT_PORT_SYSCNC ) )
-        # recipts
-        self.last_ack = -1
-
-    def send( self, verb, noun, value=None, tgt_list=None ):
-        # compose and emit a message
-        self.comand.send( bytes( verb, "utf-8" ), zmq.SNDMORE )
-        self.comand.send( bytes( noun, "utf-8" ), zmq.SNDMORE )
-        if( value is not None ):
-            self.comand.send( bytes( str( value ), "utf-8" ), zmq.SNDMORE )
-        for target in tgt_list:
-            self.comand.send( bytes( str( target ), "utf-8" ), zmq.SNDMORE )
-        self.comand.send( b"K?" )
-
-        # get ack - BLOCKING!
-        resp = self.comand.recv()
-        self.last_ack = struct.unpack( "I", resp )
-        print( "got '{}'".format( self.last_ack ) )
-
-    def cleanClose( self ):
-        self.comand.close()
-        self._zctx.term()
-
-
-class ArbiterListen( threading.Thread ):
-
-    def __init__( self, out_q, func ):
-        # Thread setup
-        super( ArbiterListen, self ).__init__()
-        self.daemon = True
-
-        # setup ZMQ
-        self._zctx = zmq.Context()
-
-        self.dets_recv = self._zctx.socket( zmq.SUB )
-        self.dets_recv.subscribe( ABT_TOPIC_ROIDS )
-        self.dets_recv.connect( "tcp://localhost:{}".format( ABT_PORT_DATA ) )
-
-        self.poller = zmq.Poller()
-        self.poller.register( self.dets_recv, zmq.POLLIN )
-
-        # output Queue
-        self._q = out_q
-        self._func = func
-
-        # Thread Control
-        self.running = threading.Event()
-        self.running.set()
-
-
-    def run( self ):
-        # Core Thread
-        while( self.running.isSet() ):
-            # look for packets
-            coms = dict( self.poller.poll( 0 ) )
-            if (coms.get( self.dets_recv ) == zmq.POLLIN):
-                topic, _, time, strides, data = self.dets_recv.recv_multipart()
-                # pass to the callbacks
-                nd_strides = np.frombuffer( strides, dtype=np.int32 )
-                nd_data = np.frombuffer( data, dtype=np.float32 ).reshape( -1, 3 )
-                self._q.put( (time, nd_strides, nd_data) )
-
-        # while
-        self.cleanClose()
-
-    def cleanClose( self ):
-        self.dets_recv.close()
-        self._zctx.term()
\ No newline at end of file
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+MoCap Camera / control unit communications
+
+Classes at the module level are architecture agnostic.  So a concrete example, piCam is implementation info about a piCam
+piComunicate is the communication routines that are specific to that camera.  In the future there might be an "odroidCam" or
+an "arduinoCam" which will have different implementation and communication methods.  Perhaps one gets C&C over telnet.
+That is why C&C is done in a "Platonic Language" that is not related to implementation.
+
+We will also define the Arbiter's C&C Language which would be used by multipule clients without underlying knowlage of
+camera hardware and implementation details.
+"""
+from collections import OrderedDict
+from concurrent.futures import Future
+import itertools
+import json
+import numpy as np
+import os
+import socket
+import struct
+import threading
+import time
+import zmq
+
+from Utils import SelectableQueue
+
+
+class CameraTraits( object ): # D E P R I C A T E D
+    """ ToDo: NOPE! This is UI, not really anything to do with comunications
+        Object describing controllable traits of a camera. It holds GUI presentable data
+        like a human readable name, description etc, and implementation specific data
+        like how to set the value (which will be very camera dependant)
+
+        mode is a combination of Read, Write, Advanced, eXclude = "rwa", "rx"
+    """
+    def __init__(self, name, default, min, max, dtype, value=None, units=None, human_name=None, desc=None, mode=None ):
+        # required
+        self.name = name
+        self.default = default
+        self.min = min
+        self.max = max
+        self.dtype = dtype
+
+        # interface sugar
+        self.value = value or default
+        self.units = units or ""
+        self.human_name = human_name or name
+        self.desc = desc or ""
+        self.mode = mode or "rw"
+
+    def isValid( self, candidate ):
+        """ Basic Validation, override for special cases """
+        return ( (candidate <= self.max) and (candidate >= self.min) )
+
+import logging
+logging.basicConfig()
+log = logging.getLogger( __name__ )
+log.setLevel( logging.DEBUG )
+
+#detailed_log = logging.Formatter( "%(asctime)s.%(msecs)04d [%(levelname)-8s][%(name)-16s] %(message)s {%(filename)s@%(lineno)s}", "%y%m%d %H:%M:%S" )
+#terse_log = logging.Formatter( "%(asctime)s.%(msecs)04d [%(levelname)-8s] %(message)s", "%y%m%d %H:%M:%S" )
+
+class CameraTable( object ):
+    """
+    Per camera state held in arrays indexed by dense camera id, so it can be gathered or masked for a whole system at
+    once.  ip to id is the Topology's dict, Python sockets hand back ip strings, and a dict of those is as quick as
+    anything.
+
+        ips      : packed address of each id
+        last_ts  : timestamp of the camera's last datagram, -1 if there hasn't been one
+        type_idx : index of the camera's type in the SysManager's cam_types, -1 if unknown
+        bad      : the camera is flagged as faulty
+    """
+
+    def __init__( self, capacity=None ):
+        self.num_cams = 0
+        self.ips = np.zeros( (0,), dtype=np.uint32 )
+        self.last_ts = np.zeros( (0,), dtype=np.int64 )
+        self.type_idx = np.zeros( (0,), dtype=np.int16 )
+        self.bad = np.zeros( (0,), dtype=bool )
+        self.reserve( capacity or 8 )
+
+    @staticmethod
+    def packIP( ip ):
+        """
+        :param ip: (str) Dotted quad
+        :return: (int) The address as a u32
+        """
+        return int.from_bytes( socket.inet_aton( ip ), "big" )
+
+    def reserve( self, num_cams ):
+        """ Make room for num_cams in the state arrays """
+        cap = len( self.ips )
+        if( num_cams > cap ):
+            new_cap = max( num_cams, cap * 2 )
+            def grow( arr, fill ):
+                new_arr = np.full( (new_cap,), fill, dtype=arr.dtype )
+                new_arr[ :cap ] = arr
+                return new_arr
+            self.ips = grow( self.ips, 0 )
+            self.last_ts = grow( self.last_ts, -1 )
+            self.type_idx = grow( self.type_idx, -1 )
+            self.bad = grow( self.bad, False )
+
+    def add( self, key ):
+        """
+        :param key: (int) Packed address of a new camera
+        :return: (int) its id, the next dense one
+        """
+        cam_id = self.num_cams
+        self.reserve( cam_id + 1 )
+        self.num_cams += 1
+        self.ips[ cam_id ] = key
+        self.last_ts[ cam_id ] = -1
+        self.type_idx[ cam_id ] = -1
+        self.bad[ cam_id ] = False
+        return cam_id
+
+    def reorder( self, order ):
+        """
+        Renumber the cameras, with the state following them.
+
+        :param order: (ndarray) old id of each new id
+        """
+        num = self.num_cams
+        for arr in ( self.ips, self.last_ts, self.type_idx, self.bad ):
+            arr[ :num ] = arr[ :num ][ order ]
+
+    def copy( self ):
+        """ A table that can be changed without disturbing this one """
+        other = CameraTable.__new__( CameraTable )
+        other.__dict__.update( self.__dict__ )
+        for name in ( "ips", "last_ts", "type_idx", "bad" ):
+            setattr( other, name, getattr( self, name ).copy() )
+        return other
+
+# class CameraTable
+
+
+class Topology( object ):
+    """
+    An immutable snapshot of the system's cameras, tied to a sys_hash.  Readers grab the SysManager's current
+    snapshot once and use it throughout, writers build a new one and replace it wholesale, so the per packet path
+    never needs a lock and never sees a half made change.
+
+        ips       : ip of each camera id
+        ids       : ip -> id, don't modify it
+        cam_types : distinct camera types, indexed by table.type_idx
+        table     : CameraTable of the packed ips, and the per camera state
+        parent    : the snapshot this one replaced, None if the system was reset
+        rename    : new id of each of the parent's ids, None if they didn't change
+
+    The table's per camera state (last timestamp, bad flag) is written in place, it's carried into the next snapshot
+    when one is made.  A write racing the change lands in the old table, and is lost.
+    """
+    __slots__ = ( "sys_hash", "ips", "ids", "cam_types", "table", "parent", "rename" )
+
+    def __init__( self, sys_hash, ips, cam_types, table, parent=None, rename=None ):
+        self.sys_hash = sys_hash
+        self.ips = tuple( ips )
+        self.ids = { ip: n for n, ip in enumerate( self.ips ) }
+        self.cam_types = tuple( cam_types )
+        self.table = table
+        self.parent = parent
+        self.rename = rename
+
+    @property
+    def num_cams( self ):
+        return len( self.ips )
+
+    def getCamList( self ):
+        return [ (ip, n) for n, ip in enumerate( self.ips ) ]
+
+    def renameFrom( self, older ):
+        """
+        Map camera ids in an older snapshot to ids in this one, so frames that were in flight can be moved over.
+
+        :param older: (Topology) A snapshot this one descends from
+        :return: (ndarray) new id of each of older's ids, or None if they haven't changed
+        :raises: ValueError if older isn't an ancestor, the system has been reset since
+        """
+        steps = []
+        topo = self
+        while( topo is not older ):
+            if( topo.parent is None ):
+                raise ValueError( "Topology {} doesn't descend from {}".format( self.sys_hash, older.sys_hash ) )
+            if( topo.rename is not None ):
+                steps.append( topo.rename )
+            topo = topo.parent
+
+        if( not steps ):
+            return None
+
+        lut = np.arange( older.num_cams, dtype=np.intp )
+        for rename in reversed( steps ):
+            lut = rename[ lut ]
+        return lut
+
+    def ndcParams( self ):
+        """
+        Per camera parameters to move centroids from pixels to NDC.  The sensor's longest side spans -1 to 1, so the
+        aspect ratio is kept, and the principal point is the origin.
+
+            ndc = (px - pp) * scale
+
+        Cameras of unknown type are passed through unchanged.
+
+        :return: (ndarray) ( num_cams, 4 ) float32 rows of pp_x, pp_y, 0, scale indexed by cam id.  The zero lines up
+                           with the radius column of a centroid, which only needs scaling.
+        """
+        # one row per type, plus identity for unknown cameras at the end, then gathered per camera
+        type_params = np.zeros( (len( self.cam_types ) + 1, 4), dtype=np.float32 )
+        type_params[ :, 3 ] = 1.
+        for idx, cam_type in enumerate( self.cam_types ):
+            sensor = cam_type[ 2 ]
+            width, height = sensor[ 0 ], sensor[ 1 ]
+            pp_x, pp_y = sensor[ 2:4 ] if (len( sensor ) > 2) else (width / 2., height / 2.)
+            type_params[ idx ] = ( pp_x, pp_y, 0., 2. / max( width, height ) )
+
+        return type_params[ self.table.type_idx[ :self.num_cams ] ] # -1 picks the identity row
+
+# class Topology
+
+
+class SysManager( object ):
+    """
+    Class to manage system topology, hold camera table. manage camera_ids, know camera types
+    Might pass implementation specific helpers back up to an Arbiter for converting camera detections
+    to an NDC representation, so everything outside of Arbiter is Implementation Agnostic.
+
+    This is either too complex, or not complex enough.
+
+    Would a CamControl UI have it's own sys manager internall that's updated by a P/S Topic from Arbiter?
+
+    Assumptions: IP address is fixed so camera type is consistent between sessions
+
+    Camera types are ( family, type, sensor ), sensor is ( width, height ) in pixels, optionally followed by the
+    principal point ( width, height, pp_x, pp_y ), otherwise the centre of the sensor is used.
+
+    The cameras are held in an immutable Topology, 'topology' is swapped for a new one on every change of state.
+    Changes are serialized with a lock, but reading never takes it.
+    """
+
+    def __init__( self, default_type=None ):
+        self.default_type = default_type # type given to newly discovered cameras
+        self.old_hash = {}  # record of previous "state", sys_hash -> Topology
+        self.topology = None
+        self._write_lock = threading.Lock()
+        self._reset()
+
+    def _reset( self ):
+        self._typed_ahead = {} # ip -> type, for cameras given a type before they're discovered
+        self._publish( (), (), CameraTable(), root=True )
+
+        self.current_time = 0
+
+    def _publish( self, ips, cam_types, table, rename=None, root=False ):
+        # Replace the topology, sys_hash carries on over a reset so a frame's hash is never ambiguous
+        old = self.topology
+        sys_hash = 0 if (old is None) else old.sys_hash + 1
+        topo = Topology( sys_hash, ips, cam_types, table, None if root else old, rename )
+        self.old_hash[ sys_hash ] = topo
+        self.topology = topo # Readers pick it up from here
+        return topo
+
+    # The current topology's view, for convenience.  Hold on to 'topology' for a consistent view.
+    @property
+    def sys_hash( self ):
+        # if topology changes, this does too
+        return self.topology.sys_hash
+
+    @property
+    def num_cams( self ):
+        return self.topology.num_cams
+
+    @property
+    def cam_dict( self ):
+        return self.topology.ids
+
+    @property
+    def cam_types( self ):
+        return self.topology.cam_types
+
+    @property
+    def table( self ):
+        return self.topology.table
+
+    def __str__( self ):
+        out = ""
+        for k, v, in self.cam_dict.items():
+            out += "{}:{}\n".format( k, v )
+        return out
+
+    def getCamId( self, cam_ip, timestamp=None ):
+        """
+        Get a camera's ID.  if it's a new camera, update the table and announce a state change.
+        Also note the last contact time for the camera, could help with diagnostics.
+        This gets run a lot!
+
+        :param cam_ip: Camera ip
+        :return: id, state_changed
+        """
+        topo = self.topology
+        cam_id = topo.ids.get( cam_ip )
+        if( cam_id is None ):
+            # New Camera Discovered, add to cam list
+            cam_id = self.manualAdd( cam_ip )
+            if( timestamp is not None ):
+                self.table.last_ts[ cam_id ] = timestamp
+            return (cam_id, True)
+
+        if( timestamp is not None ):
+            topo.table.last_ts[ cam_id ] = timestamp
+
+        return (cam_id, False)
+
+    def getCamIP( self, cam_id ):
+        ips = self.topology.ips
+        return ips[ cam_id ] if (0 <= cam_id < len( ips )) else None
+
+    def manualAdd( self, cam_ip ):
+        with self._write_lock:
+            topo = self.topology
+            cam_id = topo.ids.get( cam_ip )
+            if( cam_id is not None ):
+                return cam_id # Someone beat us to it
+
+            table = topo.table.copy()
+            cam_id = table.add( CameraTable.packIP( cam_ip ) )
+            cam_types = topo.cam_types
+            cam_type = self._typed_ahead.pop( cam_ip, self.default_type )
+            if( cam_type is not None ):
+                cam_types, table.type_idx[ cam_id ] = self._typeIdx( cam_types, cam_type )
+            self._publish( topo.ips + (cam_ip,), cam_types, table )
+
+        log.info( "Setting CamID for '%s' to '%d'", cam_ip, cam_id )
+        return cam_id
+
+    @staticmethod
+    def _typeIdx( cam_types, cam_type ):
+        # index of the type, and the list of types it's in
+        cam_type = ( cam_type[ 0 ], cam_type[ 1 ], tuple( cam_type[ 2 ] ) )
+        if( cam_type not in cam_types ):
+            cam_types = cam_types + (cam_type,)
+        return (cam_types, cam_types.index( cam_type ))
+
+    def getCamType( self, cam_ip ):
+        """
+        :param cam_ip: (str) Camera ip
+        :return: (tuple) ( family, type, sensor ), or None if it's unknown
+        """
+        topo = self.topology
+        cam_id = topo.ids.get( cam_ip )
+        if( cam_id is None or topo.table.type_idx[ cam_id ] < 0 ):
+            return None
+        return topo.cam_types[ topo.table.type_idx[ cam_id ] ]
+
+    def setCamType( self, cam_ip, family, cam_type, sensor ):
+        """
+        Record what kind of camera is at the given ip.  As this changes how it's centroids are normalized, it's a
+        change of state.
+
+        :param cam_ip: (str) Camera ip
+        :param family: (str) Camera family, eg "piCam"
+        :param cam_type: (str) Model of camera
+        :param sensor: (tuple) ( width, height ) or ( width, height, pp_x, pp_y ) in pixels
+        """
+        with self._write_lock:
+            topo = self.topology
+            cam_id = topo.ids.get( cam_ip )
+            if( cam_id is None ):
+                self._typed_ahead[ cam_ip ] = ( family, cam_type, sensor )
+                return
+            table = topo.table.copy()
+            cam_types, table.type_idx[ cam_id ] = self._typeIdx( topo.cam_types, ( family, cam_type, sensor ) )
+            self._publish( topo.ips, cam_types, table )
+
+    def ndcParams( self ):
+        """ See Topology.ndcParams """
+        return self.topology.ndcParams()
+
+    @property
+    def bad_cams( self ):
+        # list of cameras that may be at fault
+        return np.flatnonzero( self.table.bad[ :self.num_cams ] ).tolist()
+
+    @property
+    def last_dgm( self ):
+        # timestamp (BCD cast as I) of last communication from each camera, -1 if none yet
+        return self.table.last_ts[ :self.num_cams ]
+
+    def flagBadId( self, cam_id ):
+        self.table.bad[ cam_id ] = True
+        # leave it to the UI?
+
+    def clearBadId( self, cam_id ):
+        # The camera's recovered
+        self.table.bad[ cam_id ] = False
+
+    def _load( self, camip_list, cam_types=None ):
+        """
+        Setup ids from the given list, fully resets state.  The whole topology is made in one go, so there's no
+        discovery to do and the ids are exactly as given.
+
+        :param camip_list: (list) ip of each camera id
+        :param cam_types: (list) ( family, type, sensor ) of each camera, None if it's unknown
+        """
+        with self._write_lock:
+            self._reset()
+            table = CameraTable( len( camip_list ) )
+            types = ()
+            for n, ip in enumerate( camip_list ):
+                cam_id = table.add( CameraTable.packIP( ip ) )
+                cam_type = cam_types[ n ] if cam_types else None
+                cam_type = cam_type or self.default_type
+                if( cam_type is not None ):
+                    types, table.type_idx[ cam_id ] = self._typeIdx( types, cam_type )
+            self._publish( camip_list, types, table )
+
+    def loadJSON( self, file_fq ):
+        """
+        Load a topology saved with saveJSON, so cameras keep their ids between sessions.  Load it before making the
+        Assembler and the like, then they can size everything for the known cameras up front.  Cameras discovered
+        later are added after them, so they're never renumbered.  Gaps in the saved ids are closed up.
+
+        :param file_fq: (str) path to the file
+        :return: (int) number of cameras loaded
+        """
+        with open( file_fq, "r" ) as fh:
+            dat = json.load( fh )
+
+        cams = sorted( dat.items(), key=lambda x: x[ 1 ][ "ID" ] )
+        cam_types = []
+        for ip, cam in cams:
+            cam_type = None
+            if( cam.get( "FAMILY" ) is not None ):
+                cam_type = ( cam[ "FAMILY" ], cam[ "TYPE" ], tuple( cam[ "SENSOR" ] ) )
+            cam_types.append( cam_type )
+
+        self._load( [ ip for ip, _ in cams ], cam_types )
+        log.info( "Loaded {} cameras from '{}'".format( len( cams ), file_fq ) )
+        return len( cams )
+
+    def saveJSON( self, file_fq ):
+        # make a dict of camera data, from one snapshot
+        topo = self.topology
+        dat = { }
+        for id, ip in enumerate( topo.ips ):
+            type_idx = topo.table.type_idx[ id ]
+            cam_type = topo.cam_types[ type_idx ] if (type_idx >= 0) else ( None, None, None )
+            dat[ ip ] = {
+                "ID"    : id,
+                "FAMILY": cam_type[ 0 ],
+                "TYPE"  : cam_type[ 1 ],
+                "SENSOR": cam_type[ 2 ],
+            }
+
+        sys_cfg = json.dumps( dat, indent=4, sort_keys=True )
+
+        # write aside and swap, so a crash doesn't leave half a topology
+        tmp_fq = file_fq + ".tmp"
+        with open( tmp_fq, "w" ) as fh:
+            fh.write( sys_cfg )
+        os.replace( tmp_fq, file_fq )
+
+    def remarshelCameras( self ):
+        """
+        Sort the cameras to be ordered by ip.  Frames being assembled can be moved to the new ids with
+        Topology.renameFrom, but it'll still corrupt your calibration. use the supplied "rename map" to fix it.
+        A topology from loadJSON keeps the ids stable between sessions, so this shouldn't be needed.
+        :return: (dict) rename_map - lut of old to new camera IDs
+        """
+        with self._write_lock:
+            topo = self.topology
+            ips = sorted( topo.ips )
+            new_ids = { ip: n for n, ip in enumerate( ips ) }
+            rename = np.array( [ new_ids[ ip ] for ip in topo.ips ], dtype=np.intp ) # new id of each old id
+            order = np.argsort( rename ) # old id of each new id
+            table = topo.table.copy()
+            table.reorder( order )
+            self._publish( ips, topo.cam_types, table, rename=rename )
+
+        return dict( enumerate( rename.tolist() ) )
+
+    def getCamList( self ):
+        return self.topology.getCamList()
+
+# class SysManager
+
+
+class CameraHealth( object ):
+    """
+    Rolling per camera health statistics over the last 'history' frames.  Each frame adds a row to fixed size ring
+    buffers of:
+        loss     : fraction of the camera's fragments that didn't arrive (1.0 if nothing turned up)
+        latency  : seconds from the frame's first fragment to the camera's last
+        complete : all the camera's fragments arrived
+
+    Running sums are kept so the rolling means don't need the whole history summing every frame.  The samples are
+    float32 and the sums float64, so taking the oldest sample back out doesn't accumulate error.  Every 'check_freq'
+    frames the mean loss is tested with hysteresis, a camera goes bad over 'bad_loss' and is only rehabilitated once
+    it's under 'good_loss'.  Nothing is allocated by update() unless a camera is discovered.
+    """
+    DEFAULT_HISTORY = 120 # frames
+    DEFAULT_CHECK_FREQ = 10
+    DEFAULT_BAD_LOSS = 0.5
+    DEFAULT_GOOD_LOSS = 0.1
+
+    def __init__( self, num_cams=0, history=None, check_freq=None, bad_loss=None, good_loss=None ):
+        self.history    = history    or self.DEFAULT_HISTORY
+        self.check_freq = check_freq or self.DEFAULT_CHECK_FREQ
+        self.bad_loss   = self.DEFAULT_BAD_LOSS  if bad_loss  is None else bad_loss
+        self.good_loss  = self.DEFAULT_GOOD_LOSS if good_loss is None else good_loss
+
+        self.num_cams = 0 # cameras being tracked
+        self.frames = 0 # frames seen
+        self._head = 0 # next row of the rings
+
+        # Rings
+        self.loss     = np.zeros( (self.history, 0), dtype=np.float32 )
+        self.latency  = np.zeros( (self.history, 0), dtype=np.float32 )
+        self.complete = np.zeros( (self.history, 0), dtype=bool )
+        self.seen     = np.zeros( (self.history, 0), dtype=bool )
+
+        # Running sums & state
+        self._sums = np.zeros( (4, 0), dtype=np.float64 ) # loss, latency, complete, seen
+        self.bad = np.zeros( (0,), dtype=bool )
+        self._mean = np.zeros( (0,), dtype=np.float64 )
+        self._flip = np.zeros( (0,), dtype=bool )
+        self._diff = np.zeros( (0,), dtype=bool )
+
+        self.reserve( num_cams )
+
+    def reserve( self, num_cams ):
+        """ Make room to track num_cams cameras, capacity doubles so discovery is cheap """
+        cap = self.bad.shape[ 0 ]
+        if( num_cams > cap ):
+            new_cap = max( num_cams, cap * 2 )
+
+            def grow( arr ):
+                # pad the last (camera) axis with zeros
+                return np.concatenate( (arr, np.zeros( arr.shape[ :-1 ] + (new_cap - cap,), dtype=arr.dtype )), axis=-1 )
+
+            self.loss, self.latency = grow( self.loss ), grow( self.latency )
+            self.complete, self.seen = grow( self.complete ), grow( self.seen )
+            self._sums, self.bad = grow( self._sums ), grow( self.bad )
+            self._mean, self._flip, self._diff = grow( self._mean ), grow( self._flip ), grow( self._diff )
+
+        self.num_cams = max( num_cams, self.num_cams )
+
+    def update( self, frags_got, frag_cnts, last_seen, first_seen ):
+        """
+        Add a frame's worth of statistics.
+
+        :param frags_got: (ndarray) Fragments received from each camera
+        :param frag_cnts: (ndarray) Fragments each camera said it sent, 0 if we heard nothing
+        :param last_seen: (ndarray) perf_counter time of each camera's last fragment
+        :param first_seen: (float) perf_counter time of the frame's first fragment
+
+        :return: (bool) True if a camera has gone bad, or recovered
+        """
+        num_cams = len( frags_got )
+        if( num_cams > self.num_cams ):
+            self.reserve( num_cams )
+
+        row = self._head
+        loss, latency = self.loss[ row, :num_cams ], self.latency[ row, :num_cams ]
+        complete, seen = self.complete[ row, :num_cams ], self.seen[ row, :num_cams ]
+        sums = self._sums[ :, :num_cams ]
+
+        # Forget the oldest frame
+        np.subtract( sums[ 0 ], loss, out=sums[ 0 ] )
+        np.subtract( sums[ 1 ], latency, out=sums[ 1 ] )
+        np.subtract( sums[ 2 ], complete, out=sums[ 2 ] )
+        np.subtract( sums[ 3 ], seen, out=sums[ 3 ] )
+
+        # Remember this one
+        np.maximum( frag_cnts, 1, out=loss )
+        np.divide( frags_got, loss, out=loss )
+        np.subtract( 1., loss, out=loss )
+        np.maximum( loss, 0., out=loss ) # duplicates
+        np.subtract( last_seen, first_seen, out=latency )
+        np.greater( frags_got, 0, out=seen )
+        np.greater_equal( frags_got, frag_cnts, out=complete )
+        np.logical_and( complete, seen, out=complete )
+
+        np.add( sums[ 0 ], loss, out=sums[ 0 ] )
+        np.add( sums[ 1 ], latency, out=sums[ 1 ] )
+        np.add( sums[ 2 ], complete, out=sums[ 2 ] )
+        np.add( sums[ 3 ], seen, out=sums[ 3 ] )
+
+        self.frames += 1
+        self._head = (self._head + 1) % self.history
+
+        if( (self.frames % self.check_freq) == 0 ):
+            return self._check()
+
+        return False
+
+    def _check( self ):
+        # Hysteresis on the mean loss
+        n = self.num_cams
+        mean, flip, bad = self._mean[ :n ], self._flip[ :n ], self.bad[ :n ]
+        np.divide( self._sums[ 0, :n ], min( self.frames, self.history ), out=mean )
+
+        np.greater( mean, self.bad_loss, out=flip ) # good cameras going bad
+        np.greater_equal( mean, self.good_loss, out=flip, where=bad ) # bad ones staying bad
+        np.not_equal( flip, bad, out=self._diff[ :n ] )
+        bad[:] = flip
+
+        return bool( self._diff[ :n ].any() )
+
+    def remap( self, lut, num_cams ):
+        """
+        Follow cameras that have been renumbered, anyone without an old id starts afresh.
+
+        :param lut: (ndarray) new id of each old id
+        :param num_cams: (int) Number of cameras after the renumbering
+        """
+        self.reserve( num_cams )
+        old = len( lut )
+        for arr in ( self.loss, self.latency, self.complete, self.seen, self._sums, self.bad ):
+            rows = arr[ ..., :old ].copy()
+            arr[ ..., :num_cams ] = 0
+            arr[ ..., lut ] = rows
+
+    def badIds( self ):
+        return np.flatnonzero( self.bad[ :self.num_cams ] ).astype( np.int32 )
+
+    def snapshot( self ):
+        """
+        Health of every camera, for publishing.
+
+        :return: (dict) frames seen, and lists indexed by camera id of the mean loss, mean latency (ms) of the frames
+                        the camera was seen in, fraction of frames it was complete in, and it's bad flag.
+        """
+        n = self.num_cams
+        frames = max( min( self.frames, self.history ), 1 )
+        seen = np.maximum( self._sums[ 3, :n ], 1 )
+        return {
+            "frames"  : self.frames,
+            "loss"    : np.round( self._sums[ 0, :n ] / frames, 4 ).tolist(),
+            "latency" : np.round( 1000. * self._sums[ 1, :n ] / seen, 3 ).tolist(),
+            "complete": np.round( self._sums[ 2, :n ] / frames, 4 ).tolist(),
+            "bad"     : self.bad[ :n ].tolist(),
+        }
+
+# class CameraHealth
+
+
+# Arbiter Consts and Settings
+# Coms Ports
+ABT_PORT_SYSCNC   = 5555 # Router/Req for System Control
+ABT_PORT_SYSSTATE = 5566 # P/S for System State / Camera Info
+ABT_PORT_DATA     = 5577 # MoCap Data & Images
+
+ABT_TOPIC_STATE = "STATE" # System State
+ABT_TOPIC_TRANS = "TRANS" # Transport
+ABT_TOPIC_ROIDS = "ROIDS" # Centroid Data
+ABT_TOPIC_IMAGE = "IMAGE" # Image Data
+ABT_TOPIC_LOSTD = "LOSTD" # Orphen Daat
+
+# Pre cast to Bytes for conveniance with ZMQ
+ABT_TOPIC_STATE_B = bytes( ABT_TOPIC_STATE, "utf-8" )
+ABT_TOPIC_TRANS_B = bytes( ABT_TOPIC_TRANS, "utf-8" )
+ABT_TOPIC_ROIDS_B = bytes( ABT_TOPIC_ROIDS, "utf-8" )
+ABT_TOPIC_IMAGE_B = bytes( ABT_TOPIC_IMAGE, "utf-8" )
+ABT_TOPIC_LOSTD_B = bytes( ABT_TOPIC_LOSTD, "utf-8" )
+
+# "Data Frame" wire format.  A ROIDS message is [topic, b"", header, strides, dets, (ids)], the header is a binary
+# record so a client can view the strides, dets & ids buffers in place without parsing strings.  Each version only
+# appends to the one before, so a decoder reads the prefix it knows, and ignores fields & parts it doesn't.
+#   v1: magic, version, dets columns, frame no, timestamp, sys_hash, strides dtype, dets dtype, num strides, num dets
+#   v2: + timecode rate, flags, reserved, ids dtype, num ids
+# The timestamp is the SMPTE Timecode the cameras stamp their packets with, HH:MM:SS:FF packed big-endian in a u32.
+ABT_FRAME_MAGIC   = b"GF"
+ABT_FRAME_VERSION = 2 # newest we know
+ABT_FRAME_FMTS    = { 1: "<2sBBIII4s4sII",
+                      2: "<2sBBIII4s4sIIBBH4sI", }
+ABT_FRAME_SZS     = { ver: struct.calcsize( fmt ) for ver, fmt in ABT_FRAME_FMTS.items() }
+
+# v2 flags
+ABT_FRAME_HAS_IDS = 0x01
+
+
+def _dtypeCode( dtype ):
+    return bytes( dtype.str, "utf-8" )
+
+def _codeDtype( code ):
+    return np.dtype( code.rstrip( b"\x00" ).decode( "utf-8" ) )
+
+
+def encodeFrame( frame_no, time_stamp, sys_hash, strides, dets, ids=None, tc_rate=0, version=None ):
+    """
+    Compose the parts of a Data Frame, to follow the topic and delimiter of a ROIDS message.  The arrays are passed
+    through as they are, so they can be sent with copy=False.
+
+    :param frame_no: (int) Running count of frames published
+    :param time_stamp: (int) The frame's timestamp (packed SMPTE Timecode)
+    :param sys_hash: (int) The SysManager's hash the strides were produced under
+    :param strides: (ndarray) Per camera offsets into the dets
+    :param dets: (ndarray) Nx? Array of detections
+    :param ids: (ndarray) Optional per det labels, v2 only
+    :param tc_rate: (int) SMPTE Timecode rate, 0 if unknown, v2 only
+    :param version: (int) Version to write, defaults to the newest.  Use 1 for clients that haven't caught up yet
+    :return: (list) header, strides, dets, and ids if there are any
+    """
+    version = version or ABT_FRAME_VERSION
+    num_cols = dets.shape[ 1 ] if dets.ndim > 1 else 1
+    fields = [ ABT_FRAME_MAGIC, version, num_cols, frame_no & 0xFFFFFFFF, time_stamp & 0xFFFFFFFF, sys_hash,
+               _dtypeCode( strides.dtype ), _dtypeCode( dets.dtype ), strides.size, dets.shape[ 0 ] ]
+    parts = [ None, strides, dets ]
+
+    if( version >= 2 ):
+        flags, ids_code, num_ids = 0, b"", 0
+        if( ids is not None ):
+            flags |= ABT_FRAME_HAS_IDS
+            ids_code, num_ids = _dtypeCode( ids.dtype ), ids.size
+            parts.append( ids )
+        fields += [ tc_rate, flags, 0, ids_code, num_ids ]
+
+    parts[ 0 ] = struct.pack( ABT_FRAME_FMTS[ version ], *fields )
+
+    return parts
+
+
+class DataFrame( object ):
+    """
+    A received Data Frame.  The arrays are views on the message's buffers, so receiving with copy=False makes
+    decoding zero copy.  Fields a sender's version doesn't have are left at their defaults.
+    """
+    __slots__ = ( "version", "frame_no", "time_stamp", "sys_hash", "tc_rate", "strides", "dets", "ids" )
+
+    def __init__( self ):
+        self.version    = 0
+        self.frame_no   = 0
+        self.time_stamp = 0
+        self.sys_hash   = 0
+        self.tc_rate    = 0    # unknown
+        self.strides    = None
+        self.dets       = None
+        self.ids        = None # if the sender had any
+
+    @property
+    def timecode( self ):
+        """ (tuple) HH, MM, SS, FF """
+        return tuple( self.time_stamp.to_bytes( 4, "big" ) )
+
+# class DataFrame
+
+
+def decodeFrame( parts ):
+    """
+    Read a Data Frame.  Versions newer than we know are read as far as we understand them.
+
+    :param parts: (list) The parts of a ROIDS message after the topic and delimiter, bytes or zmq.Frames
+    :return: (DataFrame) the frame
+    :raises: ValueError if this isn't a Data Frame we understand
+    """
+    header = memoryview( parts[ 0 ] )
+    if( len( header ) < ABT_FRAME_SZS[ 1 ] or bytes( header[ :2 ] ) != ABT_FRAME_MAGIC ):
+        raise ValueError( "Not a Data Frame header" )
+
+    frame = DataFrame()
+    version = header[ 2 ]
+    known = min( version, ABT_FRAME_VERSION )
+    if( len( header ) < ABT_FRAME_SZS[ known ] ):
+        raise ValueError( "Data Frame header too short for v{} ({} bytes)".format( version, len( header ) ) )
+
+    fields = struct.unpack_from( ABT_FRAME_FMTS[ known ], header )
+    _, frame.version, num_cols, frame.frame_no, frame.time_stamp, frame.sys_hash = fields[ :6 ]
+    strides_code, dets_code, num_strides, num_dets = fields[ 6:10 ]
+
+    frame.strides = np.frombuffer( parts[ 1 ], dtype=_codeDtype( strides_code ), count=num_strides )
+    frame.dets = np.frombuffer( parts[ 2 ], dtype=_codeDtype( dets_code ),
+                                count=num_dets * num_cols ).reshape( num_dets, num_cols )
+
+    if( known >= 2 ):
+        frame.tc_rate, flags, _, ids_code, num_ids = fields[ 10:15 ]
+        if( flags & ABT_FRAME_HAS_IDS ):
+            frame.ids = np.frombuffer( parts[ 3 ], dtype=_codeDtype( ids_code ), count=num_ids )
+
+    return frame
+
+
+# SYS Verbs
+# CAM_EXE, SYN_EXE, GET, SET, TRY ???
+
+# C&C messages end with this, a pipelining client follows it with a u32 request id that the Arbiter echos after
+# the ack number in its reply
+ABT_CNC_END = b"K?"
+
+
+class ArbiterControl( threading.Thread ):
+    """
+    ArbiterControl can be used in other apps to emit C&C to the Arbiter.  In future
+    embodyments it might manage the hand-off between inproc and tcp messaging for
+    a client.
+
+    Commands are pipelined over a DEALER socket owned by this thread, so sending never waits on the Arbiter.  send()
+    returns a Future that resolves to the Arbiter's ack number, matched to the command by the request id the Arbiter
+    echoes.  Commands not acked in time are resent (sets are idempotent), and fail with a TimeoutError when the
+    retries run out.
+    """
+    TIMEOUT = 1.0 # s to wait for an ack
+    RETRIES = 2
+    POLL_TIMEOUT = 250 # ms, only so a cleared running flag gets noticed
+
+    def __init__( self, host=None, timeout=None, retries=None ):
+        """
+        :param host: (str) Where the Arbiter is, default localhost
+        :param timeout: (float) Seconds to wait for an ack before resending
+        :param retries: (int) Resends before giving up
+        """
+        # Thread setup
+        super( ArbiterControl, self ).__init__()
+        self.daemon = True
+
+        self.timeout = timeout or self.TIMEOUT
+        self.retries = self.RETRIES if retries is None else retries
+
+        # recipts
+        self.last_ack = -1
+        self._req_ids = itertools.count( 1 )
+        self._pending = OrderedDict() # req_id : [ future, msg, deadline, tries ], in deadline order
+
+        # Commands from any thread, to be sent by ours
+        self._q_send = SelectableQueue()
+
+        # Setup command socket
+        self._zctx = zmq.Context()
+        self.comand = self._zctx.socket( zmq.DEALER )
+        self.comand.setsockopt( zmq.LINGER, 0 )
+        self.comand.connect( "tcp://{}:{}".format( host or "localhost", ABT_PORT_SYSCNC ) )
+
+        # Thread Control
+        self.running = threading.Event()
+        self.running.set()
+        self.start()
+
+    def send( self, verb, noun, value=None, tgt_list=None ):
+        """
+        Queue a command for the Arbiter.
+
+        :param verb: (str) GET, TRY, or SET a property
+        :param noun: (str) property to be acted on
+        :param value: (any) value to set, if applicable
+        :param tgt_list: (list) ids of the cameras to act on
+        :return: (Future) resolves to the ack number
+        """
+        req_id = next( self._req_ids )
+        # the empty frame stands in for the delimiter a REQ socket would add
+        msg = [ b"", bytes( verb, "utf-8" ), bytes( noun, "utf-8" ) ]
+        if( value is not None ):
+            msg.append( bytes( str( value ), "utf-8" ) )
+        for target in tgt_list or []:
+            msg.append( bytes( str( target ), "utf-8" ) )
+        msg.append( ABT_CNC_END + struct.pack( "I", req_id ) )
+
+        future = Future()
+        self._q_send.put( (req_id, msg, future) )
+        return future
+
+    def run( self ):
+        poller = zmq.Poller()
+        poller.register( self.comand, zmq.POLLIN )
+        poller.register( self._q_send.fileno(), zmq.POLLIN )
+
+        while( self.running.isSet() ):
+            timeout = self.POLL_TIMEOUT
+            if( self._pending ):
+                next_deadline = next( iter( self._pending.values() ) )[ 2 ]
+                timeout = min( timeout, max( 0, int( (next_deadline - time.monotonic()) * 1000 ) + 1 ) )
+            coms = dict( poller.poll( timeout ) )
+
+            # New commands
+            if( self._q_send.fileno() in coms ):
+                deadline = time.monotonic() + self.timeout
+                for req_id, msg, future in self._q_send.drain():
+                    if( not future.set_running_or_notify_cancel() ):
+                        continue
+                    self.comand.send_multipart( msg )
+                    self._pending[ req_id ] = [ future, msg, deadline, 0 ]
+
+            # Acks
+            if( coms.get( self.comand ) == zmq.POLLIN ):
+                while( True ):
+                    try:
+                        reply = self.comand.recv_multipart( zmq.NOBLOCK )
+                    except zmq.Again:
+                        break
+                    if( len( reply[ -1 ] ) < 8 ):
+                        continue
+                    ack, req_id = struct.unpack( "II", reply[ -1 ][ :8 ] )
+                    pending = self._pending.pop( req_id, None )
+                    if( pending is None ):
+                        continue # late ack of a command we resent
+                    self.last_ack = ack
+                    pending[ 0 ].set_result( ack )
+
+            # Resend, or give up on, anything overdue
+            now = time.monotonic()
+            while( self._pending ):
+                req_id, pending = next( iter( self._pending.items() ) )
+                future, msg, deadline, tries = pending
+                if( deadline > now ):
+                    break
+                if( tries < self.retries ):
+                    self.comand.send_multipart( msg )
+                    pending[ 2:4 ] = [ now + self.timeout, tries + 1 ]
+                    self._pending.move_to_end( req_id )
+                else:
+                    del self._pending[ req_id ]
+                    future.set_exception( TimeoutError( "No ack for '{}' after {} tries".format(
+                        b" ".join( msg[ 1:3 ] ).decode( "utf-8" ), tries + 1 ) ) )
+
+        # while
+        for future, _, _, _ in self._pending.values():
+            future.cancel()
+        self.comand.close()
+        self._zctx.term()
+        self._q_send.cleanClose()
+
+    def cleanClose( self ):
+        self.running.clear()
+        self.join()
+
+# class ArbiterControl
+
+
+class FrameSubscriber( object ):
+    """
+    The client side of the ROIDS topic, shared by the Arbiter listeners.  Blocks on the socket with a timeout rather
+    than spinning, and hands decoded Data Frames on through a bounded SelectableQueue so a slow consumer costs
+    constant memory:
+
+        latest : A mailbox holding only the freshest frame, a viewer always draws what's newest.
+        queued : Up to depth frames, oldest dropped first, for consumers that want every frame they can keep up with.
+
+    Either way frames that were never taken are counted in dropped.  ZMQ_CONFLATE isn't used as it can't handle the
+    multipart Data Frames.
+    """
+    DEFAULT_DEPTH = 8
+
+    def __init__( self, latest=True, depth=None, host=None, zctx=None ):
+        """
+        :param latest: (bool) Only keep the newest frame
+        :param depth: (int) Frames to keep when not latest
+        :param host: (str) Where the Arbiter is, default localhost
+        :param zctx: (zmq.Context) Context to use, otherwise we'll make our own
+        """
+        self.frames = SelectableQueue( maxlen=1 if latest else (depth or self.DEFAULT_DEPTH) )
+        self.received = 0 # frames
+        self.rejected = 0 # messages that weren't Data Frames we understand
+
+        self._own_ctx = zctx is None
+        self._zctx = zctx or zmq.Context()
+
+        self.dets_recv = self._zctx.socket( zmq.SUB )
+        self.dets_recv.subscribe( ABT_TOPIC_ROIDS )
+        self.dets_recv.connect( "tcp://{}:{}".format( host or "localhost", ABT_PORT_DATA ) )
+
+    @property
+    def dropped( self ):
+        return self.frames.dropped
+
+    def poll( self, timeout ):
+        """
+        Wait for Data Frames, and queue everything that has arrived.
+
+        :param timeout: (int) Longest to wait (ms)
+        :return: (int) number of frames received
+        """
+        if( not self.dets_recv.poll( timeout ) ):
+            return 0
+
+        got = 0
+        while( True ):
+            try:
+                parts = self.dets_recv.recv_multipart( zmq.NOBLOCK, copy=False )
+            except zmq.Again:
+                break
+
+            try:
+                frame = decodeFrame( parts[ 2: ] )
+            except ValueError as e:
+                self.rejected += 1
+                log.warning( e )
+                continue
+
+            self.frames.put( frame )
+            got += 1
+
+        self.received += got
+        return got
+
+    def cleanClose( self ):
+        self.dets_recv.close()
+        if( self._own_ctx ):
+            self._zctx.term()
+        self.frames.cleanClose()
+
+# class FrameSubscriber
+
+
+class ArbiterListen( threading.Thread ):
+    """
+    A Threaded FrameSubscriber.  Received DataFrames are on frames, func (if given) is called with no arguments each
+    time some arrive.
+    """
+    POLL_TIMEOUT = 250 # ms, only so a cleared running flag gets noticed
+
+    def __init__( self, func=None, latest=True, depth=None, host=None ):
+        # Thread setup
+        super( ArbiterListen, self ).__init__()
+        self.daemon = True
+
+        self.sub = FrameSubscriber( latest=latest, depth=depth, host=host )
+        self.frames = self.sub.frames
+        self._func = func
+
+        # Thread Control
+        self.running = threading.Event()
+        self.running.set()
+
+    def run( self ):
+        # Core Thread
+        while( self.running.isSet() ):
+            if( self.sub.poll( self.POLL_TIMEOUT ) and self._func is not None ):
+                self._func()
+
+        # while
+        self.cleanClose()
+
+    def cleanClose( self ):
+        self.sub.cleanClose()
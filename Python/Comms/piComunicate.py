@@ -1,400 +1,1056 @@
-# 
-# Copyright (C) 2016~2022 The Gimli Project
-# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
-#
-# Gimli is free software: you can redistribute it and/or modify
-# it under the terms of the GNU General Public License as published by
-# the Free Software Foundation, either version 3 of the License, or
-# (at your option) any later version.
-#
-# Gimli is distributed in the hope that it will be useful,
-# but WITHOUT ANY WARRANTY; without even the implied warranty of
-# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
-# GNU General Public License for more details.
-#
-# You should have received a copy of the GNU General Public License
-# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
-#
-
-""" Communication routines to send & receive to a piCCam
-"""
-import json
-from queue import Empty
-
-try: # Weird issue on my linux VM not finding SimpleQueue, yes it's 3
-    from queue import SimpleQueue
-except ImportError:
-    from queue import Queue as SimpleQueue
-
-import select
-import socket
-import threading
-import time
-
-import numpy as np
-
-from Comms import piCam
-from utils import SelectableQueue
-
-
-SOCKET_TIMEOUT = 10
-RECV_BUFF_SZ   = 10240 # bigger than a Jumbo Frame
-
-def listIPs():
-    """
-    Conveniance to list available IP addresses on the system, ignoring Local Link and 127.0.0.1
-    seems only to work on windows ATM
-    :return: (list) List of detected real ip addresses
-    """
-    candidates = []
-    for ip in socket.getaddrinfo( socket.gethostname(), None ):
-        if( ip[ 0 ] == socket.AF_INET ):
-            addr = ip[4][0]
-            if( (not addr.startswith( "169.254.")) and (not addr.startswith( "127.0.")) ):
-                candidates.append( addr )
-    return sorted( candidates )
-
-
-class SimpleComms( threading.Thread ):
-
-    def __init__( self, manager, host_ip=None ):
-        # Thread setup
-        super( SimpleComms, self ).__init__()
-        self.daemon = True
-
-        # System Manager
-        self.manager = manager
-
-        # Queues to communicate in and out of the thread
-        # Magic Queue that can be Polled by Select
-        self.q_cmds = SelectableQueue() # commands into the communicator
-        
-        # Normal Queues
-        self.q_dets = SimpleQueue() # Centroid fragments, Light Hi priority, need to be packetized
-        self.q_imgs = SimpleQueue() # Image Fragments, Heavy low priority, need to be assembled
-        self.q_misc = SimpleQueue() # Other Camera Reports
-
-        # Activity Flag
-        self.running = threading.Event()
-        self.running.set()
-
-        # Socket Setup
-        self.host_ip = "127.0.0.1" if host_ip is None else host_ip
-        self.command_socket = socket.socket( socket.AF_INET, socket.SOCK_DGRAM )
-        self.command_socket.setsockopt( socket.SOL_SOCKET, socket.SO_REUSEADDR, 1 )
-        try:
-            self.command_socket.setsockopt( socket.SOL_SOCKET, socket.SO_REUSEPORT, 1 )
-        except AttributeError:# not on Windows :(
-            pass
-        self.command_socket.bind( (self.host_ip, piCam.UDP_PORT_TX) )
-        self.command_socket.settimeout( SOCKET_TIMEOUT )
-        self._inputs = [ self.command_socket, self.q_cmds ]
-
-        # Command Selector
-        self._HANDLER = {
-            "exe"   : self.doExe,
-            "get"   : self.doGet,
-            "set"   : self.doSet,
-            "bulk"  : self.doBulk,
-            "close" : self.close, # Maye not wise having a Kamakazi command...
-        }
-
-    def run( self ):
-        # be nice to do this with ASIO...
-        while( self.running.isSet() ):
-            # Read Data from socket
-            readable, _, _ = select.select( self._inputs, [], [], 0 ) # 0 timeout = poll
-            for sock in readable:
-                # TODO: Can this be better?
-
-                if( sock == self.command_socket ):
-                    data, (src_ip, src_port) = self.command_socket.recvfrom( RECV_BUFF_SZ )
-                    self.handlePacket( src_ip, data )
-
-                if( sock == self.q_cmds ):
-                    try:
-                        cmd_string = self.q_cmds.get( False )
-                        target, commands = cmd_string.split( ":", 1 )
-                        imperative, data = commands.split( " ", 1 )
-                        self._HANDLER[ imperative ]( target, data )
-
-                    except Empty as e:
-                        # no commands in Queue
-                        pass
-
-                    except KeyError:
-                        # unrecognised command, ignore
-                        pass
-
-
-        # running flag has been cleared, close networking
-        self.command_socket.close()
-        self.q_cmds.cleanClose()
-
-    def handlePacket( self, src_ip, data ):
-        dtype, time_stamp, num_dts, dgm_no, dgm_cnt, msg = piCam.decodePacket( data )
-
-        # get cam_id. any device broadcasting to the Server ip should get placed in the sys_man
-        # but this stops packet assembler doing the right thing :(
-        #cam_id, is_new = self.manager.getCamId( src_ip, time_stamp )
-
-        if( dtype > piCam.PACKET_TYPES["imagedata"] ):
-            # "misc" Data: Regs, Text, Version Info
-            self.q_misc.put( (src_ip, (dtype, time_stamp, msg,)) )
-        elif( dtype == piCam.PACKET_TYPES["centroids"] ):
-            # Centroid Fragment
-            self.q_dets.put( (src_ip, (time_stamp, num_dts, dgm_no, dgm_cnt, msg)) )
-        elif( dtype == piCam.PACKET_TYPES["imagedata"] ):
-            self.q_imgs.put( (src_ip, (time_stamp, num_dts, dgm_no, dgm_cnt, msg)) )
-
-        #print( time.time(), piCam.PACKET_TYPES_REV[ dtype ], num_dts, dgm_no, dgm_cnt, msg[:8] )
-
-    def doExe( self, target, command ):
-        """
-        Execute a Start or Stop
-        :param target: (string) IP Address of camera being controlled
-        :param command: (string) The request
-        :return: None
-        """
-        msg, _ = piCam.composeCommand( command, None )
-        self.command_socket.sendto( msg, ( target, piCam.UDP_PORT_RX ) )
-        return False
-
-    def doGet( self, target, request ):
-        """
-        Request something, this might need to make a "ticket" to register that a given camera is expecting a response
-
-        :param target: (string) IP Address of camera being controlled
-        :param request: (string) The request
-        :return: None
-        """
-        msg, _ = piCam.composeCommand( request, None )
-        self.command_socket.sendto( msg, ( target, piCam.UDP_PORT_RX ) )
-        return False
-
-    def doSet( self, target, args ):
-        """
-        Set a Setting - assumes the value has been pre-validated.  The Camea state will be invalid, and we might need
-        to get a refresh of the regs, in_regshi says which req to send
-
-        :param target: (string) IP Address of camera being controlled
-        :param args: (string) The Paramiter and value, space separated.
-        :return: None
-        """
-        param, val = args.lower().split( " ", 1 )
-        trait = piCam.CAMERA_CAPABILITIES[ param ]
-        cast = trait.dtype( val )
-        msg, in_regshi = piCam.composeCommand( param, cast )
-
-        self.command_socket.sendto( msg, ( target, piCam.UDP_PORT_RX ) )
-        return in_regshi
-
-
-    def doBulk( self, target, tasks ):
-        """ Do a bulk operation, assume the commands are pre-validated
-
-        :param target: (string) IP Address of camera being controlled
-        :param tasks: (string) A Bulk execution string
-        :return: None
-        """
-        hiregs = False
-        commands = tasks.split(";")
-
-        for cmd_string in commands:
-            if( not cmd_string ):
-                continue
-            imperative, data = cmd_string.split( " ", 1 )
-            in_regshi = self._HANDLER[ imperative ]( target, data )
-            hiregs |= in_regshi
-        self.q_misc.put( (target, ("Refresh {}".format( "regshi" if hiregs else "regslo" ))) )
-
-    def close( self, target, arg ):
-        """
-        The close command is '<anything>:close close'
-        Set the Flag to end this process and do a graceful shutdown on the socket
-
-        :return: None
-        """
-        if( arg == "close" ):
-            self.command_socket.sendto( b"bye", (target, piCam.UDP_PORT_RX) )
-            self.running.clear()
-
-# class SimpleComms
-
-
-class AssembleDetFrame( threading.Thread ):
-    """
-        This will assemble fragmented Centroid packets (Centroids from a Camera) and compose a "big Frame" of data and indexs
-        this is a bit like an OpenGL VBO and it's Index buffer, eg data[idx1:idx2] is the the first cameras centroids
-        data[0:idx1] is a reserved area for Metadata, such as Timecode values.
-
-    """
-    UNKNOWN_REMAINS = 100
-    DEFAULT_CHECK_FREQ = 10 # 720 # 60fps * 12
-    FAILURE_TO_COMMUNICATE = UNKNOWN_REMAINS * (DEFAULT_CHECK_FREQ-1)
-    FRAC_8BIT = 1./256
-    FRAC_4BIT = 1./16
-
-    def __init__( self, q_dets, manager ):
-        # Thread setup
-        super( AssembleDetFrame, self ).__init__()
-        self.daemon = True
-
-        # Thread Control
-        self.running = threading.Event()
-        self.running.set()
-
-        # IO queues
-        self.q_dets = q_dets
-        self.q_orph = SimpleQueue()
-        self.q_out  = SimpleQueue()
-
-        # sysManager
-        self.manager = manager
-        self.last_hash = -1 #?
-
-        # assembly
-        self.frame_assemble = [] # assemble fragmented packets here
-        self.packets_remain = np.array( [], dtype=np.int8  ) # count of num of packets remaining
-        self.assembled_idxs = np.array( [], dtype=np.int32 ) # index for assemble that has been filled up to
-
-        # camera health
-        self.ship_sucess = np.array( [], dtype=np.int32 )
-        self.bad_cameras = np.array( [], dtype=np.int32 )
-        self.frames_sent = 0
-        self.check_freqs = self.DEFAULT_CHECK_FREQ
-
-    def run( self ):
-        # Core Thread
-        while( self.running.isSet() ):
-            # look for packets
-            if( not self.q_dets.empty()):
-                try:
-                    src_ip, packet = self.q_dets.get()
-                    self.processPacket( src_ip, packet )
-
-                except Empty as e:
-                    # no commands
-                    pass
-
-    def processPacket( self, src_ip, packet ):
-        time_stamp, num_dts, dgm_no, dgm_cnt, dets = packet
-        #print( "dts", num_dts )
-
-        data_len = len( dets )
-
-        cam_id, is_new = self.manager.getCamId( src_ip, time_stamp )
-
-        #print( "cam", cam_id )
-
-        if( is_new ):
-            #print( self.manager )
-            # Make space for the new camera in the Assembly, and initialize
-            self.frame_assemble.append( np.array([], dtype=np.uint8) )
-            self.packets_remain = np.append( self.packets_remain, self.UNKNOWN_REMAINS )
-            self.assembled_idxs = np.append( self.assembled_idxs, 0 )
-            self.ship_sucess = np.append( self.ship_sucess, 0 )
-
-        # Are we forced to Ship?
-        if( time_stamp > self.manager.current_time ):
-            # todo: guard against shipping an empty frame!
-            #print( "Compelled Ship" )
-            self.ship()
-            # After shipping, as we include the tc with the frame
-            self.manager.current_time = time_stamp
-        elif( time_stamp < self.manager.current_time ):
-            # this is an orphan!
-            print( "Orphen" )
-            self.q_orph.put( (src_ip, packet) )
-            return
-        
-        # First Packet from this camera in this frame?
-        if( self.packets_remain[ cam_id ] == self.UNKNOWN_REMAINS ):
-            self.packets_remain[ cam_id ] = dgm_cnt
-            self.frame_assemble[ cam_id ] = np.zeros( (num_dts*8), dtype=np.uint8 )
-
-        # add this packet's detections to the assembly buffer
-        start_idx = self.assembled_idxs[ cam_id ]
-        end_idx = start_idx + data_len
-        #print( start_idx, end_idx, len( self.frame_assemble[ cam_id ] ), data_len )
-        if( end_idx > len( self.frame_assemble[ cam_id ] ) ):
-            print( "tried to Overflow", self.manager.current_time )
-            return # Discard this packet, but I wonder how this happens
-        self.frame_assemble[ cam_id ][ start_idx:end_idx ] = np.frombuffer( dets, dtype=np.uint8 )
-        self.assembled_idxs[ cam_id ] = end_idx
-        self.packets_remain[ cam_id ] -= 1
-
-        # Test for opportunistic ship (all packets assembled)
-        if( np.all( self.packets_remain < 1 ) ):
-            #print( "Opportunistic Ship" )
-            self.ship()
-
-    def ship( self ):
-        # Pack
-        out = np.array([], dtype=np.uint8) # fill with meta data??? timestamp, sysHash
-        idxs = []
-        num_cams = len( self.frame_assemble )
-        for i in range( num_cams ):
-            idxs.append( len( out ) )
-            out = np.append( out, self.frame_assemble[i][0:self.assembled_idxs[i]] ) # as many as we got
-        idxs.append( len( out ) )
-
-        # empty frame
-        if( len( out ) == 0):
-            self.clearBuffers()
-            return
-
-        idxs = np.array( idxs, dtype=np.int )
-        idxs = np.right_shift( idxs, 3 ) # div 8
-
-        raw = out.reshape( (idxs[ -1 ], 8) )
-
-        # Decode
-        out = np.zeros( (raw.shape[0],3), dtype=np.float32 )
-
-        # ToDo: Can this be done better? Manual decode of int16 :(
-
-        out[:,0]  = raw[:,1].astype( np.float32 ) * 256
-        out[:,0] += raw[:,0].astype( np.float32 )
-
-        out[:,1]  = raw[:,4].astype( np.float32 ) * 256
-        out[:,1] += raw[:,3].astype( np.float32 )
-
-        out[:,2]  = raw[:,6].astype( np.float32 )
-
-        # Fractions
-        out[:,0] += raw[:,2].astype( np.float32 ) * self.FRAC_8BIT
-        out[:,1] += raw[:,5].astype( np.float32 ) * self.FRAC_8BIT
-
-        # tricky offset Radius fractions
-        tmp = np.right_shift( raw[:,7], 4 )
-        out[:,2] += tmp.astype( np.float32 ) * self.FRAC_4BIT
-
-        # Ship
-        self.q_out.put( (self.manager.current_time, idxs, out) )
-        self.frames_sent += 1
-
-        # do Health Check
-        if( (self.frames_sent % self.check_freqs) == 0):
-            # have any cameras stopped communicating?
-            bad_cam_ids = np.argwhere( self.ship_sucess > self.FAILURE_TO_COMMUNICATE ).flatten()
-            for cam in bad_cam_ids:
-                self.manager.flagBadId( cam )
-            self.bad_cameras = bad_cam_ids
-
-            # ToDo: Can I rehabilitate cameras that are no-longer bad?
-
-            # reset counter
-            self.ship_sucess = np.full( (self.manager.num_cams,), 0 )
-
-        self.ship_sucess += self.packets_remain
-        # Done
-        self.clearBuffers()
-
-    def clearBuffers( self ):
-        self.frame_assemble = [ np.array([], dtype=np.uint8) for _ in range( self.manager.num_cams ) ]
-        self.packets_remain = np.full( (self.manager.num_cams,), self.UNKNOWN_REMAINS, dtype=np.int8 )
-        self.packets_remain[ self.bad_cameras ] = 0 # don't let bad cameras stop you from shipping
-        self.assembled_idxs = np.full( (self.manager.num_cams,), 0, dtype=np.int32 )
-
-# class AssembleDetFrame
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" Communication routines to send & receive to a piCCam
+"""
+from collections import deque
+import json
+import logging
+from queue import Empty
+
+try: # Weird issue on my linux VM not finding SimpleQueue, yes it's 3
+    from queue import SimpleQueue
+except ImportError:
+    from queue import Queue as SimpleQueue
+
+import select
+import socket
+import threading
+import time
+
+import numpy as np
+
+from Comms import CameraHealth, piCam
+from Utils import SelectableQueue
+
+log = logging.getLogger( __name__ )
+
+SOCKET_TIMEOUT = 10
+SELECT_TIMEOUT = 0.25  # Longest the comms & assembler threads sleep before checking their running flag
+RECV_BUFF_SZ   = 10240 # bigger than a Jumbo Frame
+RING_SLOTS     = 512   # Datagrams held in the receive ring, copied out instead if the Assembler falls this far behind
+BATCH_MAX      = 128   # Most datagrams drained in one go, so commands don't starve
+SOCK_RECV_SZ   = 4 * 1024 * 1024 # Kernel receive buffer, absorbs bursts while we're busy
+ACK_TIMEOUT    = 0.5   # Seconds cameras have to answer a multicast command
+REPLY_HELLO    = "hello" # A hello's reply is a lone byte, with no header or packet type
+
+def listIPs():
+    """
+    Conveniance to list available IP addresses on the system, ignoring Local Link and 127.0.0.1
+    seems only to work on windows ATM
+    :return: (list) List of detected real ip addresses
+    """
+    candidates = []
+    for ip in socket.getaddrinfo( socket.gethostname(), None ):
+        if( ip[ 0 ] == socket.AF_INET ):
+            addr = ip[4][0]
+            if( (not addr.startswith( "169.254.")) and (not addr.startswith( "127.0.")) ):
+                candidates.append( addr )
+    return sorted( candidates )
+
+
+class CameraCommand( object ):
+    """
+    A command for SimpleComms, encoded to the camera wire format once when it's composed.  The same packets are then
+    sent to every target, or once to the multicast group if it's a broadcast, so fanning a request out to a large
+    system costs a sendto per camera, not a parse, compose, and pack.
+
+    verbs are those of the old command strings: "exe", "get", "set", "bulk", and "close".  A bulk is several
+    packets, sent in order.
+    """
+    __slots__ = ( "verb", "noun", "targets", "packets", "in_regshi", "broadcast" )
+
+    def __init__( self, verb, noun, targets=None, packets=None, in_regshi=False, broadcast=False ):
+        """
+        :param verb: (str) What to do
+        :param noun: (str) What to do it to
+        :param targets: (list) IP Addresses of the cameras
+        :param packets: (list) Wire format packets
+        :param in_regshi: (bool) Sets touch the hi registers
+        :param broadcast: (bool) Send once to the multicast group, rather than to the targets
+        """
+        self.verb = verb
+        self.noun = noun
+        self.targets = targets or []
+        self.packets = packets or []
+        self.in_regshi = in_regshi
+        self.broadcast = broadcast
+
+    def __repr__( self ):
+        return "{}:{} {} {}".format( "mcast" if self.broadcast else ",".join( self.targets ), self.verb, self.noun,
+                                     len( self.packets ) )
+
+    @staticmethod
+    def _encode( verb, args ):
+        # (packet, in_regshi) of an exe, get or set
+        if( verb == "set" ):
+            param, val = args.lower().split( " ", 1 )
+            trait = piCam.CAMERA_CAPABILITIES[ param ]
+            return piCam.composeCommand( param, trait.dtype( val ) )
+
+        return piCam.composeCommand( args, None )
+
+    @classmethod
+    def compose( cls, verb, noun, value=None, targets=None, broadcast=False ):
+        """
+        Encode a command, ready for SimpleComms to send.
+
+        :param verb: (str) "exe", "get", "set", "bulk", or "close"
+        :param noun: (str) Parameter, Command or Request.  For a bulk the ';' separated statements
+        :param value: (str) Value to set, assumed pre-validated
+        :param targets: (list) IP Addresses of the cameras
+        :param broadcast: (bool) Send once to the multicast group
+        :return: (CameraCommand) the command
+        :raises: KeyError for unrecognised verbs or parameters
+        """
+        packets, in_regshi = [], False
+
+        if( verb == "bulk" ):
+            for statement in noun.split( ";" ):
+                statement = statement.strip()
+                if( not statement ):
+                    continue
+                imperative, args = statement.split( " ", 1 )
+                packet, hi = cls._encode( imperative, args )
+                packets.append( packet )
+                in_regshi |= hi
+
+        elif( verb == "set" ):
+            packet, in_regshi = cls._encode( verb, "{} {}".format( noun, value ) )
+            packets.append( packet )
+
+        elif( verb in ( "exe", "get" ) ):
+            packets.append( cls._encode( verb, noun )[ 0 ] )
+
+        elif( verb == "close" ):
+            if( noun == "close" ): # Maye not wise having a Kamakazi command...
+                packets.append( b"bye" )
+
+        else:
+            raise KeyError( verb )
+
+        return cls( verb, noun, targets, packets, in_regshi, broadcast )
+
+    def confirmation( self ):
+        """
+        How a camera shows it's had this command.  Requests are answered, so a get is confirmed by its own reply.
+        Sets and exes aren't, so they're followed by a probe a camera will answer, and as cameras handle commands in
+        order the reply comes after the command's been dealt with.  A set is probed by reading back the register
+        bank it wrote.  An exe can only be probed with a hello, which shows the camera was listening, not that it
+        acted.
+
+        :return: (tuple) probe packet to send after the command, or None, and the reply that confirms it, a
+                 PACKET_TYPES value or REPLY_HELLO.  ( None, None ) if it can't be confirmed
+        """
+        if( self.verb == "get" ):
+            if( self.noun == "hello" ):
+                return (None, REPLY_HELLO)
+            return (None, piCam.PACKET_TYPES.get( self.noun ))
+
+        if( self.verb in ( "set", "bulk" ) ):
+            bank = "regshi" if self.in_regshi else "regslo"
+            return (piCam.composeCommand( bank, None )[ 0 ], piCam.PACKET_TYPES[ bank ])
+
+        if( self.verb == "exe" ):
+            return (piCam.composeCommand( "hello", None )[ 0 ], REPLY_HELLO)
+
+        return (None, None)
+
+    @classmethod
+    def fromString( cls, cmd_string ):
+        """
+        Compatibility with the old command strings, "<target ip>:<verb> <args>".
+
+        :param cmd_string: (str) eg "192.168.0.32:set fps 60"
+        :return: (CameraCommand) the command
+        :raises: KeyError or ValueError for commands we can't understand
+        """
+        target, commands = cmd_string.split( ":", 1 )
+        verb, args = commands.split( " ", 1 )
+        if( verb == "set" ):
+            noun, value = args.split( " ", 1 )
+            return cls.compose( verb, noun, value, [ target ] )
+
+        return cls.compose( verb, args, None, [ target ] )
+
+# class CameraCommand
+
+
+class AckLedger( object ):
+    """
+    Cameras yet to confirm multicast commands.  A broadcast goes out as one datagram, so there's no per camera send
+    to hang a timeout on, instead a camera's ack is its reply to the command's confirmation (see
+    CameraCommand.confirmation), a report of the expected type.  Replies don't say what they answer, so a reply is
+    credited to the oldest command, in send order, that's waiting for that camera and that type of reply.
+    Cameras silent past the deadline get one unicast resend, then the command is settled with whoever's missing.
+    """
+
+    def __init__( self, timeout=None ):
+        self.timeout = timeout or ACK_TIMEOUT
+        self.pending = deque() # [ cmd, sent, deadline, waiting, acked, resent, reply ], in send order
+
+    def expect( self, cmd, reply, now ):
+        """
+        :param cmd: (CameraCommand) A broadcast that's just been sent
+        :param reply: (int) The PACKET_TYPES value, or REPLY_HELLO, that confirms it
+        :param now: (float) perf_counter of the send
+        """
+        self.pending.append( [ cmd, now, now + self.timeout, set( cmd.targets ), {}, False, reply ] )
+
+    def seen( self, src_ip, reply, now ):
+        """
+        A camera has reported, ack the oldest command it's yet to that this reply confirms.
+
+        :param src_ip: (str) The camera
+        :param reply: (int) The report's PACKET_TYPES value, or REPLY_HELLO
+        :param now: (float) perf_counter of the report
+        :return: (list) Commands that are now acked by everyone, removed from the ledger
+        """
+        for entry in self.pending:
+            waiting = entry[ 3 ]
+            if( entry[ 6 ] == reply and src_ip in waiting ):
+                waiting.discard( src_ip )
+                entry[ 4 ][ src_ip ] = now - entry[ 1 ]
+                if( not waiting ):
+                    self.pending.remove( entry )
+                    return [ entry ]
+                break
+
+        return []
+
+    def overdue( self, now ):
+        """
+        :param now: (float) perf_counter
+        :return: (list) Entries past their deadline, they stay in the ledger until they're retried or settled
+        """
+        return [ entry for entry in self.pending if entry[ 2 ] <= now ]
+
+    def retry( self, entry, now ):
+        """ Give an entry a new deadline after its unicast resend, it keeps its place """
+        entry[ 2 ] = now + self.timeout
+        entry[ 5 ] = True
+
+    def settle( self, entry ):
+        """ Done with an entry, whoever's still waiting is missing """
+        self.pending.remove( entry )
+
+# class AckLedger
+
+
+class RingBatch( list ):
+    """ Centroid fragments that are views of SimpleComms' receive ring.  release() once they've been copied out, so
+        their slots can be read into again.
+    """
+    __slots__ = ( "_comms", "_seq" )
+
+    def __init__( self, comms, seq, items ):
+        super( RingBatch, self ).__init__( items )
+        self._comms = comms
+        self._seq = seq # ring datagrams read, up to the end of this batch
+
+    def release( self ):
+        self._comms.ring_released = self._seq
+
+# class RingBatch
+
+
+class SimpleComms( threading.Thread ):
+
+    def __init__( self, manager, host_ip=None ):
+        # Thread setup
+        super( SimpleComms, self ).__init__()
+        self.daemon = True
+
+        # System Manager
+        self.manager = manager
+
+        # Queues to communicate in and out of the thread
+        # Magic Queue that can be Polled by Select
+        self.q_cmds = SelectableQueue() # commands into the communicator
+        
+        # Normal Queues
+        self.q_dets = SimpleQueue() # Batches of Centroid fragments, Light Hi priority, need to be packetized
+        self.q_imgs = SimpleQueue() # Image Fragments, Heavy low priority, need to be assembled
+        self.q_misc = SelectableQueue() # Other Camera Reports
+        self.q_acks = SelectableQueue() # Settled multicast commands: (cmd, {ip: ack time}, [missing ips])
+
+        # Activity Flag
+        self.running = threading.Event()
+        self.running.set()
+
+        # Socket Setup
+        self.host_ip = "127.0.0.1" if host_ip is None else host_ip
+        self.command_socket = socket.socket( socket.AF_INET, socket.SOCK_DGRAM )
+        self.command_socket.setsockopt( socket.SOL_SOCKET, socket.SO_REUSEADDR, 1 )
+        try:
+            self.command_socket.setsockopt( socket.SOL_SOCKET, socket.SO_REUSEPORT, 1 )
+        except AttributeError:# not on Windows :(
+            pass
+        self.command_socket.bind( (self.host_ip, piCam.UDP_PORT_TX) )
+        self.command_socket.setsockopt( socket.SOL_SOCKET, socket.SO_RCVBUF, SOCK_RECV_SZ )
+        self.command_socket.setblocking( False ) # select tells us when to read, draining stops on EWOULDBLOCK
+        # Multicast commands leave by the camera network's interface
+        self.command_socket.setsockopt( socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, piCam.MCAST_TTL )
+        self.command_socket.setsockopt( socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton( self.host_ip ) )
+        self._inputs = [ self.command_socket, self.q_cmds ]
+        self.acks = AckLedger()
+
+        # Receive Ring. Datagrams are read straight into these slots, and Centroid payloads are passed on as
+        # memoryviews of them in RingBatches.  A slot isn't read into again until the batch holding it is released,
+        # if the consumer's a whole ring behind datagrams are copied out instead, and counted in ring_overflows.
+        self._ring = memoryview( bytearray( RING_SLOTS * RECV_BUFF_SZ ) )
+        self._slots = [ self._ring[ i * RECV_BUFF_SZ : (i + 1) * RECV_BUFF_SZ ] for i in range( RING_SLOTS ) ]
+        self._ring_seq = 0 # datagrams read into the ring
+        self.ring_released = 0 # datagrams the consumer's done with, set by RingBatch.release()
+        self._ring_queued = 0 # datagrams read, up to the end of the last RingBatch queued
+        self.ring_overflows = 0
+
+    def run( self ):
+        # Sleep in select until a camera talks or a command is queued.  The timeout is only there so a cleared
+        # running flag gets noticed, it adds no latency to packet handling.
+        while( self.running.isSet() ):
+            readable, _, _ = select.select( self._inputs, [], [], SELECT_TIMEOUT )
+            for sock in readable:
+
+                if( sock == self.command_socket ):
+                    self.handleBatch( self.drainSocket() )
+
+                if( sock == self.q_cmds ):
+                    # One wakeup can mean many commands, take them all
+                    for cmd in self.q_cmds.drain():
+                        if( isinstance( cmd, str ) ):
+                            try:
+                                cmd = CameraCommand.fromString( cmd )
+                            except (KeyError, ValueError):
+                                # unrecognised command, ignore
+                                continue
+                        self.sendCommand( cmd )
+
+            if( self.acks.pending ):
+                self.checkAcks( time.perf_counter() )
+
+
+        # running flag has been cleared, close networking
+        self.command_socket.close()
+        self.q_cmds.cleanClose()
+
+    def drainSocket( self ):
+        """
+        Read every pending datagram (up to BATCH_MAX) into the receive ring.  Once the next slot is still held by the
+        consumer, the rest are copied out.  Only RingBatches hold slots, so once they're all released the whole ring is
+        free, however many other datagrams went through it.
+
+        :return: (tuple) lists of src_ips, ring slots, and datagram sizes, then ( src_ip, bytes ) of those copied
+        """
+        src_ips, slots, sizes, spilled = [], [], [], []
+        drain_seq = self._ring_seq
+        for _ in range( BATCH_MAX ):
+            released = self.ring_released
+            if( released >= self._ring_queued ):
+                released = drain_seq # Nothing queued is still held
+            try:
+                if( spilled or (self._ring_seq - released >= RING_SLOTS) ):
+                    data, (src_ip, src_port) = self.command_socket.recvfrom( RECV_BUFF_SZ )
+                    spilled.append( (src_ip, data) )
+                    continue
+
+                slot = self._ring_seq % RING_SLOTS
+                num_bytes, (src_ip, src_port) = self.command_socket.recvfrom_into( self._slots[ slot ], RECV_BUFF_SZ )
+            except (BlockingIOError, InterruptedError):
+                break # Drained
+
+            src_ips.append( src_ip )
+            slots.append( slot )
+            sizes.append( num_bytes )
+            self._ring_seq += 1
+
+        self.ring_overflows += len( spilled )
+        return (src_ips, slots, sizes, spilled)
+
+    def handleBatch( self, batch ):
+        """
+        Decode a batch of datagrams and route them.  Headers are decoded for the whole batch at once, and all the
+        Centroid fragments in the batch are handed to the Assembler in a single queue operation.  Centroid payloads stay
+        as views of the ring, everything else is copied out as it may sit in a queue for a while.
+
+        :param batch: (tuple) src_ips, slots, sizes, spilled from drainSocket
+        :return: None
+        """
+        src_ips, slots, sizes, spilled = batch
+        if( not (src_ips or spilled) ):
+            return
+
+        offsets = np.asarray( slots, dtype=np.intp ) * RECV_BUFF_SZ
+        ends = offsets + np.asarray( sizes, dtype=np.intp )
+        dtype, time_stamp, num_dts, dgm_no, dgm_cnt, compression, data_os = piCam.decodeHeaders( self._ring, offsets, sizes )
+
+        is_roid = (dtype == piCam.PACKET_TYPES[ "centroids" ])
+        if( np.any( is_roid ) ):
+            ring = self._ring
+            self._ring_queued = self._ring_seq
+            self.q_dets.put( RingBatch( self, self._ring_seq,
+                             [ (src_ips[ i ], (ts, nd, dn, dc, cp, ring[ start:end ]))
+                               for i, ts, nd, dn, dc, cp, start, end in zip( np.flatnonzero( is_roid ).tolist(),
+                                                                          time_stamp[ is_roid ].tolist(),
+                                                                          num_dts[ is_roid ].tolist(),
+                                                                          dgm_no[ is_roid ].tolist(),
+                                                                          dgm_cnt[ is_roid ].tolist(),
+                                                                          compression[ is_roid ].tolist(),
+                                                                          data_os[ is_roid ].tolist(),
+                                                                          ends[ is_roid ].tolist() ) ] ) )
+
+        # Everything else is rare enough to handle one at a time
+        for i in np.flatnonzero( ~is_roid ).tolist():
+            self.handlePacket( src_ips[ i ], bytes( self._ring[ offsets[ i ]:ends[ i ] ] ) )
+
+        # arrived after the ring filled
+        for src_ip, data in spilled:
+            self.handlePacket( src_ip, data )
+
+    def handlePacket( self, src_ip, data ):
+        dtype, time_stamp, num_dts, dgm_no, dgm_cnt, compression, msg = piCam.decodePacket( data )
+
+        if( dtype > piCam.PACKET_TYPES["imagedata"] ):
+            # "misc" Data: Regs, Text, Version Info
+            self.q_misc.put( (src_ip, (dtype, time_stamp, msg,)) )
+            if( self.acks.pending ):
+                reply = REPLY_HELLO if (len( data ) == 1) else dtype
+                for cmd, _, _, _, acked, _, _ in self.acks.seen( src_ip, reply, time.perf_counter() ):
+                    self.q_acks.put( (cmd, acked, []) )
+        elif( dtype == piCam.PACKET_TYPES["centroids"] ):
+            # Centroid Fragment
+            self.q_dets.put( [ (src_ip, (time_stamp, num_dts, dgm_no, dgm_cnt, compression, msg)) ] )
+        elif( dtype == piCam.PACKET_TYPES["imagedata"] ):
+            self.q_imgs.put( (src_ip, (time_stamp, num_dts, dgm_no, dgm_cnt, msg)) )
+
+    def sendCommand( self, cmd ):
+        """
+        Send a composed command's packets to each of its targets, or once to the multicast group.
+
+        :param cmd: (CameraCommand) the command
+        :return: None
+        """
+        if( cmd.broadcast ):
+            destinations = [ (piCam.MCAST_GRP, piCam.MCAST_PORT) ]
+        else:
+            destinations = [ (target, piCam.UDP_PORT_RX) for target in cmd.targets ]
+
+        sendto = self.command_socket.sendto
+        for packet in cmd.packets:
+            for dest in destinations:
+                sendto( packet, dest )
+
+        if( cmd.broadcast and cmd.targets ):
+            probe, reply = cmd.confirmation()
+            if( probe is not None ):
+                sendto( probe, destinations[ 0 ] )
+            if( reply is not None ):
+                self.acks.expect( cmd, reply, time.perf_counter() )
+
+        if( cmd.verb == "bulk" ):
+            # Shaped like a camera's text report, so it drains alongside them
+            note = "Refresh {}".format( "regshi" if cmd.in_regshi else "regslo" ).encode( "utf-8" )
+            for target in cmd.targets:
+                self.q_misc.put( (target, (piCam.PACKET_TYPES["textslug"], [-1,-1,-1,-1], note,)) )
+
+        elif( cmd.verb == "close" and cmd.noun == "close" ):
+            # Set the Flag to end this process and do a graceful shutdown on the socket
+            self.running.clear()
+
+    def checkAcks( self, now ):
+        """
+        Unicast a late multicast command to the cameras that haven't answered, or, if they've had that chance, settle
+        it with them marked missing.
+
+        :param now: (float) perf_counter
+        :return: None
+        """
+        for entry in self.acks.overdue( now ):
+            cmd, _, _, waiting, acked, resent, _ = entry
+            if( resent ):
+                self.acks.settle( entry )
+                self.q_acks.put( (cmd, acked, sorted( waiting )) )
+                continue
+
+            probe, _ = cmd.confirmation()
+            packets = cmd.packets if (probe is None) else cmd.packets + [ probe ]
+            for packet in packets:
+                for target in waiting:
+                    self.command_socket.sendto( packet, (target, piCam.UDP_PORT_RX) )
+            self.acks.retry( entry, now )
+
+# class SimpleComms
+
+
+class DetFrameBuffer( object ):
+    """
+        Fixed capacity buffer that a frame of Centroids is assembled in.  The "Arena" has a row per camera, each big
+        enough for that camera's worst case frame, and fragments are written in place at their offset.  Between frames
+        only the indexes are rewound, nothing is reallocated unless the system grows.
+
+        Rows are sized for the largest Centroid record, each camera's compression mode is noted as it arrives.
+    """
+    UNKNOWN_REMAINS = 100
+
+    def __init__( self, num_cams, cam_dets, roid_sz ):
+        self.roid_sz = roid_sz
+        self.num_cams = 0 # cameras in this frame
+        self.cam_dets = 0 # capacity of a camera's row, in centroids
+        self.time_stamp = -1
+        self.first_seen = 0. # perf_counter time the frame's first fragment arrived
+        self.modes = set() # compression modes seen in this frame
+
+        self.arena = np.zeros( (0, 0), dtype=np.uint8 )
+        self.packets_remain = np.zeros( (0,), dtype=np.int8  ) # count of num of packets remaining
+        self.assembled_idxs = np.zeros( (0,), dtype=np.int32 ) # index for assemble that has been filled up to
+        self.compression = np.zeros( (0,), dtype=np.uint8 ) # each camera's compression mode
+        self.rec_szs = np.zeros( (0,), dtype=np.int32 ) # and the size of its centroids
+
+        # for the health check
+        self.frag_cnts = np.zeros( (0,), dtype=np.int16 ) # fragments each camera sent, 0 until we hear from it
+        self.frags_got = np.zeros( (0,), dtype=np.int16 ) # fragments that arrived
+        self.last_seen = np.zeros( (0,), dtype=np.float64 ) # perf_counter time of each camera's last fragment
+
+        self.reserve( num_cams, cam_dets )
+
+    def reserve( self, num_cams, cam_dets ):
+        """
+        Make sure there is room for num_cams cameras sending up to cam_dets centroids.  Camera capacity grows by doubling
+        so discovering cameras one at a time is cheap.  Anything already assembled is kept.
+
+        :param num_cams: (int) Number of Cameras
+        :param cam_dets: (int) Most Centroids a camera can send in a frame
+        """
+        old_cams, old_bytes = self.arena.shape
+        new_cams = old_cams if (num_cams <= old_cams) else max( num_cams, old_cams * 2 )
+        new_bytes = max( cam_dets * self.roid_sz, old_bytes )
+        if( (new_cams, new_bytes) == (old_cams, old_bytes) ):
+            return
+
+        arena = np.zeros( (new_cams, new_bytes), dtype=np.uint8 )
+        arena[ :old_cams, :old_bytes ] = self.arena
+        self.arena = arena
+
+        self.packets_remain = np.concatenate( (self.packets_remain,
+                                               np.full( (new_cams - old_cams,), self.UNKNOWN_REMAINS, dtype=np.int8 )) )
+        self.assembled_idxs = np.concatenate( (self.assembled_idxs, np.zeros( (new_cams - old_cams,), dtype=np.int32 )) )
+        self.compression = np.concatenate( (self.compression, np.zeros( (new_cams - old_cams,), dtype=np.uint8 )) )
+        self.rec_szs = np.concatenate( (self.rec_szs, np.full( (new_cams - old_cams,), self.roid_sz, dtype=np.int32 )) )
+        self.frag_cnts = np.concatenate( (self.frag_cnts, np.zeros( (new_cams - old_cams,), dtype=np.int16 )) )
+        self.frags_got = np.concatenate( (self.frags_got, np.zeros( (new_cams - old_cams,), dtype=np.int16 )) )
+        self.last_seen = np.concatenate( (self.last_seen, np.zeros( (new_cams - old_cams,), dtype=np.float64 )) )
+        self.cam_dets = new_bytes // self.roid_sz
+
+    def reset( self, num_cams, time_stamp, skip_ids=None, first_seen=0. ):
+        """
+        Rewind ready for a new frame.
+
+        :param num_cams: (int) Number of Cameras expected in the frame
+        :param time_stamp: (int) The frame's timestamp
+        :param skip_ids: (array) Cameras that shouldn't hold up shipping (bad cameras)
+        :param first_seen: (float) When the frame's first fragment arrived
+        """
+        self.reserve( num_cams, self.cam_dets )
+        self.num_cams = num_cams
+        self.time_stamp = time_stamp
+        self.first_seen = first_seen
+        self.packets_remain.fill( self.UNKNOWN_REMAINS )
+        self.assembled_idxs.fill( 0 )
+        self.compression.fill( 0 )
+        self.rec_szs.fill( self.roid_sz )
+        self.frag_cnts.fill( 0 )
+        self.frags_got.fill( 0 )
+        self.last_seen.fill( first_seen )
+        self.modes.clear()
+        if( skip_ids is not None ):
+            self.packets_remain[ skip_ids ] = 0 # don't let bad cameras stop you from shipping
+
+    def add( self, cam_id, num_dts, dgm_cnt, compression, rec_sz, dets, now=0. ):
+        """
+        Write a fragment in place.
+
+        :param compression: (int) The camera's compression mode
+        :param rec_sz: (int) Size of a Centroid in this mode
+        :param now: (float) perf_counter time the fragment arrived
+
+        :return: (bool) False if the fragment would overflow the camera's centroids
+        """
+        # First Packet from this camera in this frame?
+        if( self.frag_cnts[ cam_id ] == 0 ):
+            if( self.packets_remain[ cam_id ] == self.UNKNOWN_REMAINS ):
+                self.packets_remain[ cam_id ] = dgm_cnt # bad cameras are already at 0
+            self.frag_cnts[ cam_id ] = dgm_cnt
+            self.compression[ cam_id ] = compression
+            self.rec_szs[ cam_id ] = rec_sz
+            self.modes.add( compression )
+
+        start_idx = self.assembled_idxs[ cam_id ]
+        end_idx = start_idx + len( dets )
+        if( end_idx > num_dts * rec_sz ):
+            return False
+
+        self.arena[ cam_id, start_idx:end_idx ] = np.frombuffer( dets, dtype=np.uint8 )
+        self.assembled_idxs[ cam_id ] = end_idx
+        self.packets_remain[ cam_id ] -= 1
+        self.frags_got[ cam_id ] += 1
+        self.last_seen[ cam_id ] = now
+        return True
+
+    def remap( self, lut, num_cams ):
+        """
+        Move the rows of cameras that have been renumbered, anyone without an old id starts afresh.
+
+        :param lut: (ndarray) new id of each old id
+        :param num_cams: (int) Number of cameras after the renumbering
+        """
+        self.reserve( num_cams, self.cam_dets )
+        old = len( lut )
+        self.arena[ lut ] = self.arena[ :old ].copy() # Nothing's read past a fresh camera's assembled_idx
+        for arr, fill in ( (self.packets_remain, self.UNKNOWN_REMAINS), (self.assembled_idxs, 0), (self.compression, 0),
+                           (self.rec_szs, self.roid_sz), (self.frag_cnts, 0), (self.frags_got, 0),
+                           (self.last_seen, self.first_seen) ):
+            rows = arr[ :old ].copy()
+            arr[ :num_cams ] = fill
+            arr[ lut ] = rows
+        self.num_cams = num_cams
+
+    def isComplete( self ):
+        return bool( (self.packets_remain[ :self.num_cams ] < 1).all() )
+
+    def missingFragments( self ):
+        """ Fragments we know a camera sent, but haven't arrived """
+        remain = self.packets_remain[ :self.num_cams ]
+        return int( remain[ (remain > 0) & (remain < self.UNKNOWN_REMAINS) ].sum() )
+
+# class DetFrameBuffer
+
+
+class AssembleDetFrame( threading.Thread ):
+    """
+        This will assemble fragmented Centroid packets (Centroids from a Camera) and compose a "big Frame" of data and indexs
+        this is a bit like an OpenGL VBO and it's Index buffer, eg data[idx1:idx2] is the the first cameras centroids
+        data[0:idx1] is a reserved area for Metadata, such as Timecode values.
+
+        Fragments are assembled in DetFrameBuffers sized from the 'numdets' limit and the number of cameras.  Up to
+        'window' frames are assembled at once, so a straggler from a slow camera can still make it into its frame.
+        Frames ship in timestamp order, when they're complete or when they've been waiting longer than 'deadline'
+        seconds.  A window of 1 with no deadline behaves like the original "ship when something newer turns up".
+
+        Shipped frames are views into a small pool of output buffers, the consumer must hand the buffer back with
+        release() when it's done with it.  They go on q_out as ( time_stamp, sys_hash, strides, dets, buf_id ), the
+        sys_hash being the topology their camera ids are from, which may be older than the SysManager's by then.
+
+        If 'ndc' is set, Centroids are shipped in NDC, normalized with each camera's sensor size and principal point
+        from the SysManager, otherwise they're in pixels.
+
+        Counters:
+            recovered_frags: arrived after a newer frame had started, but in time to join their own frame
+            late_frags     : arrived after their frame had shipped, these go on q_orph
+            orphan_frags   : known to be coming, but their frame was forced to ship without them
+            bad_mode_frags : in a compression mode we can't decode, dropped.  Warned about every 'WARN_PERIOD' seconds
+
+        Every frame out feeds the CameraHealth.  Bad cameras don't hold up shipping, and are flagged with the
+        SysManager until they recover.  A health snapshot is put on q_health every 'health_period' seconds.
+    """
+    UNKNOWN_REMAINS = DetFrameBuffer.UNKNOWN_REMAINS
+    DEFAULT_CHECK_FREQ = 10 # 720 # 60fps * 12
+    DEFAULT_HEALTH_PERIOD = 1.0 # seconds
+    ROID_SZ = max( kernel[ 0 ].itemsize for kernel in piCam.ROID_KERNELS.values() ) # biggest centroid, in bytes
+    ROID_MIN_SZ = min( kernel[ 0 ].itemsize for kernel in piCam.ROID_KERNELS.values() )
+    MAX_CAM_DETS = 0x3FF # most centroids a packet header can describe
+    DEFAULT_CAMS = 16
+    DEFAULT_WINDOW = 3 # frames
+    DEFAULT_DEADLINE = 0.005 # seconds
+    WARN_PERIOD = 5.0 # seconds between warnings of the same kind, a bad camera would otherwise flood the log
+
+    def __init__( self, q_dets, manager, num_cams=None, cam_dets=None, window=None, deadline=None, ndc=True,
+                  health_period=None ):
+        # Thread setup
+        super( AssembleDetFrame, self ).__init__()
+        self.daemon = True
+
+        # Thread Control
+        self.running = threading.Event()
+        self.running.set()
+
+        # IO queues
+        self.q_dets = q_dets
+        self.q_orph = SimpleQueue()
+        self.q_out  = SelectableQueue()
+        self.q_health = SelectableQueue()
+
+        # sysManager
+        self.manager = manager
+        self._topo = manager.topology # the camera ids in flight are from this
+        self.last_hash = -1 # sys_hash the NDC params were made for
+
+        # NDC conversion
+        self.ndc = ndc
+        self._ndc_pp = np.zeros( (2, 0), dtype=np.float32 ) # pp_x and pp_y rows, by cam id
+        self._ndc_scale = np.zeros( (0,), dtype=np.float32 )
+
+        # assembly
+        num_cams = num_cams or max( self.manager.num_cams, self.DEFAULT_CAMS )
+        cam_dets = cam_dets or (piCam.CAMERA_CAPABILITIES[ "numdets" ].value * 10) # 'numdets' is in 10s
+        self.window = window or self.DEFAULT_WINDOW
+        self.deadline = self.DEFAULT_DEADLINE if deadline is None else deadline
+        self._frames = [ DetFrameBuffer( num_cams, cam_dets, self.ROID_SZ ) for _ in range( self.window ) ]
+        self._free_frames = list( self._frames )
+        self._in_flight = [] # frames being assembled, oldest first
+        self.last_shipped = -1 # timestamp of the last frame out
+
+        self._counts = np.zeros( (0,), dtype=np.int32 )
+        self._valid = np.zeros( (0, 0), dtype=bool )
+        self._det_idxs = np.zeros( (0,), dtype=np.int32 )
+        self._sizeScratch()
+
+        # Output buffers. Shipped frames are views of these, recycled through _free_bufs
+        self._out_strides = []
+        self._out_dets = []
+        self._free_bufs = SimpleQueue()
+        for _ in range( self.window ):
+            self._free_bufs.put( self._newBuf() )
+
+        # reorder window stats
+        self.recovered_frags = 0
+        self.late_frags = 0
+        self.orphan_frags = 0
+        self.bad_mode_frags = 0
+        self._last_bad_mode = -self.WARN_PERIOD # when it was last warned about
+
+        # camera health
+        self.health = CameraHealth( self.manager.num_cams, check_freq=self.DEFAULT_CHECK_FREQ )
+        self.health_period = self.DEFAULT_HEALTH_PERIOD if health_period is None else health_period
+        self._last_health = 0. # when the last snapshot went out
+        self.bad_cameras = np.array( [], dtype=np.int32 )
+        self.frames_sent = 0
+
+    def _reserve( self, num_cams, cam_dets ):
+        # All the frame buffers, and Ship's working arrays, share a capacity
+        for frame in self._frames:
+            frame.reserve( num_cams, cam_dets )
+        self._sizeScratch()
+
+    def _sizeScratch( self ):
+        # rows can hold more of the smaller centroids
+        cap_cams, row_bytes = self._frames[ 0 ].arena.shape
+        cap_dets = row_bytes // self.ROID_MIN_SZ
+        if( self._valid.shape != (cap_cams, cap_dets) ):
+            self._counts = np.zeros( (cap_cams,), dtype=np.int32 )
+            self._counts3 = np.zeros( (cap_cams,), dtype=np.int32 )
+            self._valid = np.zeros( (cap_cams, cap_dets), dtype=bool )
+            self._det_idxs = np.arange( cap_dets, dtype=np.int32 )
+
+    def run( self ):
+        # Core Thread
+        while( self.running.isSet() ):
+            # wait for packets, or until the oldest frame's deadline
+            timeout = SELECT_TIMEOUT
+            if( self._in_flight and self.deadline ):
+                timeout = min( timeout, max( 0., self._in_flight[ 0 ].first_seen + self.deadline - time.perf_counter() ) )
+            try:
+                batch = self.q_dets.get( block=True, timeout=timeout )
+
+            except Empty as e:
+                # nothing arrived
+                batch = []
+
+            for src_ip, packet in batch:
+                self.processPacket( src_ip, packet )
+            if( isinstance( batch, RingBatch ) ):
+                batch.release() # copied into the frames, or out to q_orph
+
+            self.expire( time.perf_counter() )
+
+    def processPacket( self, src_ip, packet ):
+        time_stamp, num_dts, dgm_no, dgm_cnt, compression, dets = packet
+        now = time.perf_counter()
+        #print( "dts", num_dts )
+
+        topo = self.manager.topology
+        if( topo is not self._topo ):
+            self._syncTopology( topo )
+
+        cam_id = topo.ids.get( src_ip )
+        if( cam_id is None ):
+            # New Camera Discovered, make space for it in the Assembly
+            self.manager.manualAdd( src_ip )
+            topo = self.manager.topology
+            self._syncTopology( topo )
+            cam_id = topo.ids.get( src_ip )
+            if( cam_id is None ):
+                return # The system's been reset under us
+
+        topo.table.last_ts[ cam_id ] = time_stamp
+
+        frame = self._frameFor( time_stamp, now )
+        if( frame is None ):
+            # this is an orphan! Take a copy, the packet is a view of the receive ring
+            self.late_frags += 1
+            self.q_orph.put( (src_ip, (time_stamp, num_dts, dgm_no, dgm_cnt, compression, bytes( dets ))) )
+            return
+
+        if( compression not in piCam.ROID_KERNELS ):
+            self.bad_mode_frags += 1
+            if( (now - self._last_bad_mode) >= self.WARN_PERIOD ):
+                self._last_bad_mode = now
+                log.warning( "Unknown compression mode {} from '{}', {} fragments dropped so far".format(
+                    compression, src_ip, self.bad_mode_frags ) )
+            return # Nothing we can decode
+
+        if( num_dts > frame.cam_dets ):
+            # Camera's been set to send more than we planned for
+            self._reserve( frame.num_cams, min( num_dts, self.MAX_CAM_DETS ) )
+
+        # add this packet's detections, in place, to the camera's row of the arena
+        rec_sz = piCam.ROID_KERNELS[ compression ][ 0 ].itemsize
+        if( not frame.add( cam_id, num_dts, dgm_cnt, compression, rec_sz, dets, now ) ):
+            print( "tried to Overflow", time_stamp )
+            return # Discard this packet, but I wonder how this happens
+
+        # Test for opportunistic ship (all packets assembled)
+        if( frame.isComplete() ):
+            #print( "Opportunistic Ship" )
+            self.shipReady()
+
+    def _syncTopology( self, topo ):
+        """
+        Catch up with a change in the SysManager's topology.  Renumbered cameras have their rows in the frames being
+        assembled, and their health, moved to the new ids.  If the system has been reset, the frames in flight are
+        dropped as their ids don't mean anything any more.
+
+        :param topo: (Topology) The new topology
+        """
+        try:
+            lut = topo.renameFrom( self._topo )
+        except ValueError:
+            self._free_frames.extend( self._in_flight )
+            self._in_flight = []
+            self.health = CameraHealth( topo.num_cams, check_freq=self.DEFAULT_CHECK_FREQ )
+            self.bad_cameras = np.array( [], dtype=np.int32 )
+            lut = None
+
+        self._reserve( topo.num_cams, self._frames[ 0 ].cam_dets )
+        self.health.reserve( topo.num_cams )
+        if( lut is not None ):
+            for frame in self._in_flight:
+                frame.remap( lut, topo.num_cams )
+            self.health.remap( lut, topo.num_cams )
+            self.bad_cameras = self.health.badIds()
+        else:
+            for frame in self._in_flight:
+                frame.num_cams = topo.num_cams
+
+        self._topo = topo
+
+    def _frameFor( self, time_stamp, now ):
+        """
+        Find the frame being assembled for this timestamp, starting a new one if needed.  If the window is full, the
+        oldest frame is forced out.
+
+        :param now: (float) perf_counter time, when a new frame was first seen
+
+        :return: (DetFrameBuffer) or None if the frame has already shipped
+        """
+        if( time_stamp <= self.last_shipped ):
+            return None
+
+        for frame in self._in_flight:
+            if( frame.time_stamp == time_stamp ):
+                if( time_stamp < self.manager.current_time ):
+                    self.recovered_frags += 1
+                return frame
+
+        # A new frame
+        if( time_stamp > self.manager.current_time ):
+            self.manager.current_time = time_stamp
+
+        while( len( self._in_flight ) >= self.window ):
+            self._shipOldest()
+
+        if( time_stamp <= self.last_shipped ):
+            # An older frame's first fragment, but we just had to ship past it
+            return None
+
+        frame = self._free_frames.pop()
+        frame.reset( self._topo.num_cams, time_stamp, self.bad_cameras, now )
+        idx = 0
+        while( idx < len( self._in_flight ) and self._in_flight[ idx ].time_stamp < time_stamp ):
+            idx += 1
+        self._in_flight.insert( idx, frame )
+        return frame
+
+    def shipReady( self ):
+        """ Ship complete frames, in order.  A complete frame waits for any older frames still assembling """
+        while( self._in_flight and self._in_flight[ 0 ].isComplete() ):
+            self._shipOldest()
+
+    def expire( self, now ):
+        """
+        Force out any frames that have waited longer than the deadline.
+
+        :param now: (float) perf_counter time
+        """
+        if( not self.deadline ):
+            return
+
+        while( self._in_flight and (now - self._in_flight[ 0 ].first_seen) >= self.deadline ):
+            self._shipOldest()
+        self.shipReady()
+
+    def _shipOldest( self ):
+        frame = self._in_flight.pop( 0 )
+        self.orphan_frags += frame.missingFragments()
+        self.last_shipped = frame.time_stamp
+        self.ship( frame )
+        self.checkHealth( frame )
+        self._free_frames.append( frame )
+
+    def checkHealth( self, frame ):
+        """
+        Add a frame that's gone out to the camera health stats, and deal with any cameras going bad or recovering.
+
+        :param frame: (DetFrameBuffer) The frame
+        """
+        num_cams = frame.num_cams
+        changed = self.health.update( frame.frags_got[ :num_cams ], frame.frag_cnts[ :num_cams ],
+                                      frame.last_seen[ :num_cams ], frame.first_seen )
+        if( changed ):
+            self.bad_cameras = self.health.badIds()
+            for cam_id in list( self.manager.bad_cams ):
+                if( cam_id not in self.bad_cameras ):
+                    self.manager.clearBadId( cam_id )
+            for cam_id in self.bad_cameras.tolist():
+                self.manager.flagBadId( cam_id )
+
+        if( self.health_period and (frame.first_seen - self._last_health) >= self.health_period ):
+            self._last_health = frame.first_seen
+            self.q_health.put( self.health.snapshot() )
+
+    def _acquire( self, num_cams, num_dets ):
+        """
+        Get a free output buffer big enough for the frame, making one if they're all in flight.
+
+        :return: (tuple) buffer id, strides, dets
+        """
+        try:
+            buf_id = self._free_bufs.get_nowait()
+        except Empty:
+            buf_id = self._newBuf()
+
+        if( len( self._out_strides[ buf_id ] ) < num_cams + 1 ):
+            self._out_strides[ buf_id ] = np.zeros( (self._frames[ 0 ].arena.shape[ 0 ] + 1,), dtype=np.int32 )
+
+        if( len( self._out_dets[ buf_id ] ) < num_dets ):
+            self._out_dets[ buf_id ] = np.zeros( (self._valid.size, 3), dtype=np.float32 )
+
+        return (buf_id, self._out_strides[ buf_id ], self._out_dets[ buf_id ])
+
+    def _newBuf( self ):
+        # An output buffer for the biggest frame the arena can hold
+        buf_id = len( self._out_dets )
+        self._out_strides.append( np.zeros( (self._frames[ 0 ].arena.shape[ 0 ] + 1,), dtype=np.int32 ) )
+        self._out_dets.append( np.zeros( (self._valid.size, 3), dtype=np.float32 ) )
+        return buf_id
+
+    def release( self, buf_id ):
+        """
+        Return an output buffer to the pool once the frame that viewed it has been dealt with.
+
+        :param buf_id: (int) the buffer id that came with the shipped frame
+        """
+        self._free_bufs.put( buf_id )
+
+    def ship( self, frame ):
+        num_cams = frame.num_cams
+        counts = np.floor_divide( frame.assembled_idxs[ :num_cams ], frame.rec_szs[ :num_cams ],
+                                  out=self._counts[ :num_cams ] )
+        num_dets = int( counts.sum() )
+
+        # empty frame
+        if( num_dets == 0 ):
+            return
+
+        buf_id, strides, out = self._acquire( num_cams, num_dets )
+        strides = strides[ :num_cams + 1 ]
+        strides[ 0 ] = 0
+        np.cumsum( counts, out=strides[ 1: ] )
+        out = out[ :num_dets ]
+
+        # Decode
+        if( len( frame.modes ) == 1 ):
+            # Usual case, everyone's in the same mode.  Gather every camera's records out of the arena in one go
+            dtype, decoder, _ = piCam.ROID_KERNELS[ next( iter( frame.modes ) ) ]
+            recs = self._records( frame, dtype )
+            num_recs = recs.shape[ 1 ]
+            valid = np.less( self._det_idxs[ :num_recs ], counts[ :, None ], out=self._valid[ :num_cams, :num_recs ] )
+            decoder( recs[ valid ].view( dtype ), out )
+
+        else:
+            # Mixed modes, decode a camera at a time
+            modes = frame.compression[ :num_cams ]
+            for mode in frame.modes:
+                dtype, decoder, _ = piCam.ROID_KERNELS[ mode ]
+                recs = self._records( frame, dtype )
+                for cam_id in np.flatnonzero( (modes == mode) & (counts > 0) ):
+                    decoder( recs[ cam_id, :counts[ cam_id ] ].view( dtype ), out[ strides[ cam_id ]:strides[ cam_id + 1 ] ] )
+
+        if( self.ndc ):
+            self.toNDC( out, counts )
+
+        # Ship, with the topology its camera ids are from
+        self.q_out.put( (frame.time_stamp, self._topo.sys_hash, strides, out, buf_id) )
+        self.frames_sent += 1
+
+    def toNDC( self, dets, counts ):
+        """
+        Normalize a frame of Centroids, in place.  Each camera's parameters are repeated out to its Centroids a column
+        at a time, as NumPy's slow to broadcast along rows only 3 wide.  X and Y have the principal point taken off,
+        then the whole frame is scaled as one flat run.
+
+        :param dets: (ndarray) (n,3) X, Y, Radius in pixels
+        :param counts: (ndarray) number of Centroids from each camera
+        """
+        num_cams = len( counts )
+        topo = self._topo
+        if( (self.last_hash != topo.sys_hash) or (len( self._ndc_scale ) < num_cams) ):
+            params = topo.ndcParams()
+            self._ndc_pp = np.ascontiguousarray( params[ :, :2 ].T )
+            self._ndc_scale = np.ascontiguousarray( params[ :, 3 ] )
+            self.last_hash = topo.sys_hash
+
+        pp = np.repeat( self._ndc_pp[ :, :num_cams ], counts, axis=1 )
+        np.subtract( dets[ :, 0 ], pp[ 0 ], out=dets[ :, 0 ] )
+        np.subtract( dets[ :, 1 ], pp[ 1 ], out=dets[ :, 1 ] )
+
+        # X, Y & Radius all get their camera's scale
+        scale = np.repeat( self._ndc_scale[ :num_cams ], np.multiply( counts, 3, out=self._counts3[ :num_cams ] ) )
+        flat = dets.reshape( -1 )
+        np.multiply( flat, scale, out=flat )
+
+    @staticmethod
+    def _records( frame, dtype ):
+        """
+        View the frame's arena as rows of records the size of dtype.  They're opaque 'void' records, as NumPy gathers
+        those as a plain memory copy, but is slow with structured ones.  View the gathered records as dtype.
+        """
+        row_bytes = frame.arena.shape[ 1 ]
+        return np.ndarray( (frame.num_cams, row_bytes // dtype.itemsize), dtype=(np.void, dtype.itemsize),
+                           buffer=frame.arena, strides=(row_bytes, dtype.itemsize) )
+
+# class AssembleDetFrame
@@ -0,0 +1,154 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" benchArbiterLoop.py - CPU the Arbiter burns when idle, and the latency from (fake) cameras sending a frame to a
+    client receiving it at 120fps, with the Poller driven main loop against the poll( 0 ) spin it replaced.  Latency
+    moves a few hundred us from run to run, so each loop is measured over several rounds.
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+sys.path.append( CODE_PATH )
+sys.path.append( os.path.join( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ), "Apps" ) )
+
+import logging
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+import zmq
+
+import Comms
+from Comms import piCam
+from arbiter import Arbiter
+
+IDLE_SECS = 2.0
+RATE      = 120
+LOAD_SECS = 3.0
+NUM_CAMS  = 10
+NUM_DETS  = 50
+WARM_UP   = 10 # frames
+ROUNDS    = 3
+
+
+class LegacyArbiter( Arbiter ):
+    """ The spinning main loop, as it was """
+
+    def execute( self ):
+        self.det_mgr.start()
+        self.com_mgr.start()
+        while( self.running.isSet() ):
+            coms = dict( self.poller.poll( 0 ) )
+            if (coms.get( self.cnc_in ) == zmq.POLLIN):
+                dgm = self.cnc_in.recv_multipart()
+                self.acks += 1
+                ack = struct.pack( "I", self.acks )
+                self.cnc_in.send_multipart( [ dgm[ 0 ], b'', ack ] )
+                self.handleCNC( dgm )
+                self.data_pub.send_multipart( [ Comms.ABT_TOPIC_STATE_B, b"", b"DID", ack ] )
+            if( not self.det_mgr.q_out.empty() ):
+                data = self.det_mgr.q_out.get()
+                self.publishDets( data )
+            if( self._in_flight ):
+                self.releaseSent()
+            while( not self.com_mgr.q_misc.empty() ):
+                _, data = self.com_mgr.q_misc.get( block=False, timeout=0.001 )
+                dtype, timecode, msg = data
+                self.data_pub.send_multipart( [ Comms.ABT_TOPIC_STATE_B, b"", msg ] )
+
+
+def listen( sent, lags, num, ready ):
+    """ A client, noting how long after its last fragment was sent each frame reached it """
+    zctx = zmq.Context()
+    sub = zctx.socket( zmq.SUB )
+    sub.subscribe( Comms.ABT_TOPIC_ROIDS )
+    sub.connect( "tcp://localhost:{}".format( Comms.ABT_PORT_DATA ) )
+    sub.setsockopt( zmq.RCVTIMEO, 2000 )
+    ready.set()
+    try:
+        while( len( lags ) < num ):
+            parts = sub.recv_multipart()
+            lags.append( time.perf_counter() - sent[ Comms.decodeFrame( parts[ 2: ] ).time_stamp ] )
+    except zmq.Again:
+        pass
+    sub.close()
+    zctx.term()
+
+
+def measure( arbiter_class ):
+    app = arbiter_class( "127.0.0.1" )
+    runner = threading.Thread( target=app.execute )
+    runner.start()
+
+    # Idle
+    time.sleep( 0.5 )
+    wall_in, cpu_in = time.perf_counter(), time.process_time()
+    time.sleep( IDLE_SECS )
+    idle = 100. * (time.process_time() - cpu_in) / (time.perf_counter() - wall_in)
+
+    # Loaded, fake cameras send a fragment each per frame
+    num = int( RATE * LOAD_SECS )
+    sent, lags, ready = {}, [], threading.Event()
+    client = threading.Thread( target=listen, args=( sent, lags, num, ready ) )
+    client.start()
+    ready.wait()
+    time.sleep( 0.5 ) # slow joiner
+
+    cams = [ socket.socket( socket.AF_INET, socket.SOCK_DGRAM ) for _ in range( NUM_CAMS ) ]
+    for i, cam in enumerate( cams ):
+        cam.bind( ("127.0.0.{}".format( i + 2 ), 0) )
+    payload = piCam.encodeRoids( np.full( (NUM_DETS, 3), 100. ), piCam.ROID_COMPRESSION[ "compressed" ] )
+
+    period = 1.0 / RATE
+    start = time.perf_counter()
+    for frame in range( 1, num + 1 ):
+        while( time.perf_counter() < start + frame * period ):
+            time.sleep( 0.0005 )
+        time_stamp = ( 0, frame // (RATE * 60), (frame // RATE) % 60, frame % RATE )
+        packet = piCam.encodePacket( frame, NUM_DETS, 0, piCam.PACKET_TYPES[ "centroids" ], frame & 0xFF,
+                                     time_stamp, 0, 1, payload )
+        # noted before sending, a complete frame can reach the client before sendto returns
+        sent[ struct.unpack( ">I", bytes( time_stamp ) )[ 0 ] ] = time.perf_counter()
+        for cam in cams:
+            cam.sendto( packet, ("127.0.0.1", piCam.UDP_PORT_TX) )
+    client.join()
+
+    app.running.clear()
+    app.com_mgr.q_cmds.put( "127.0.0.1:close close" )
+    runner.join()
+    app.cleanClose()
+    app.com_mgr.join()
+    app.det_mgr.join()
+    for cam in cams:
+        cam.close()
+
+    return idle, np.asarray( lags[ WARM_UP: ] ) * 1e6 # skip camera discovery
+
+
+if( __name__ == "__main__" ):
+    logging.getLogger( "arbiter" ).setLevel( logging.WARNING )
+    print( "loop    | idle CPU | publish latency median   p99 (us) | received" )
+    for _ in range( ROUNDS ):
+        for name, arbiter_class in ( ("legacy", LegacyArbiter), ("poller", Arbiter) ):
+            idle, lags = measure( arbiter_class )
+            print( "{: <7} | {: >7.1f}% | {: >22.1f} {: >7.1f}      | {: >8}".format(
+                name, idle, np.median( lags ), np.percentile( lags, 99 ), len( lags ) ) )
@@ -0,0 +1,98 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" benchArchive.py - Compression ratio & single core MB/s of each codec that's installed, at a fast and a default
+    level, with and without the delta filter, on a synthetic 10 camera take of smoothly moving markers.  Every block
+    is checked to expand back exactly.
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+sys.path.append( CODE_PATH )
+
+import tempfile
+import time
+
+import numpy as np
+
+from Utils.takeFile import TakeReader, TakeWriter
+from Utils.takeArchive import blockRanges, getCodec, packBlock, unpackBlock, CODECS, FILTERS
+
+NUM_FRAMES = 8192
+NUM_MARKERS = 40
+NUM_CAMS = 10
+RATE = 120.
+
+
+def makeTake( take_fq, seed=0 ):
+    """ Markers bouncing around a box, seen 70% of the time, centroids to 1/16th of a pixel """
+    rng = np.random.default_rng( seed )
+    pos = rng.uniform( -1, 1, (NUM_MARKERS, 3) )
+    vel = rng.normal( 0, .005, (NUM_MARKERS, 3) )
+    proj = rng.normal( 0, 1, (NUM_CAMS, 3, 2) )
+    with TakeWriter( take_fq, num_cams=NUM_CAMS, rate=RATE ) as writer:
+        for n in range( NUM_FRAMES ):
+            vel += rng.normal( 0, .0005, vel.shape )
+            pos += vel
+            vel[ np.abs( pos ) > 1 ] *= -1
+            strides, dets = [ 0 ], []
+            for cam in range( NUM_CAMS ):
+                seen = rng.random( NUM_MARKERS ) > .3
+                xy = np.round( np.tanh( pos[ seen ] @ proj[ cam ] * .5 ) * 8192 ) / 8192
+                rad = np.round( (.01 + .005 * np.abs( pos[ seen, 2:3 ] )) * 4096 ) / 4096
+                dets.append( np.hstack( [ xy, rad ] ) )
+                strides.append( strides[ -1 ] + len( xy ) )
+            dets = np.vstack( dets ).astype( np.float32 )
+            writer.append( [ int( n * 1e9 / RATE ) ], [ strides ], dets, np.full( (len( dets ),), -1, dtype=np.int32 ) )
+
+
+def bench( take, codec, level, filter_ ):
+    compress, decompress = getCodec( codec, level )
+    raw = packed = 0
+    pack_t = unpack_t = 0.
+    for start, stop in blockRanges( take.num_frames ):
+        t0 = time.process_time()
+        block = packBlock( take, start, stop, compress, filter_ )
+        t1 = time.process_time()
+        _, times, strides, dets, ids = unpackBlock( block, take.num_cams, decompress, filter_ )
+        unpack_t += time.process_time() - t1
+        pack_t += t1 - t0
+
+        offs, o_strides, o_dets, o_ids = take.frames( start, stop )
+        assert np.array_equal( times, take.times[ start:stop ] ) and np.array_equal( strides, o_strides ) and \
+               np.array_equal( dets, o_dets ) and np.array_equal( ids, o_ids )
+        raw += times.nbytes + offs.nbytes + strides.nbytes + dets.nbytes + ids.nbytes
+        packed += len( block )
+    return (raw / packed, raw / 1e6 / pack_t, raw / 1e6 / unpack_t)
+
+
+if( __name__ == "__main__" ):
+    with tempfile.TemporaryDirectory() as tmp:
+        take_fq = os.path.join( tmp, "bench.take" )
+        makeTake( take_fq )
+        with TakeReader( take_fq ) as take:
+            print( "{} frames, {} dets, {} cameras".format( take.num_frames, take.num_dets, take.num_cams ) )
+            print( "codec | level | filter | ratio | pack MB/s | unpack MB/s" )
+            for codec in CODECS:
+                for level in sorted( { 1, CODECS[ codec ][ 0 ], 6 } ):
+                    for filter_ in FILTERS:
+                        ratio, pack, unpack = bench( take, codec, level, filter_ )
+                        print( "{: <5} | {: >5} | {: <6} | {: >5.2f} | {: >9.1f} | {: >11.1f}".format(
+                            codec, level, filter_, ratio, pack, unpack ) )
@@ -0,0 +1,203 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" benchAssembly.py - Copies and allocations per frame from datagram to shipped frame.
+
+    Before: payload sliced out of the datagram (copy 1), frombuffer'd into a fresh per-camera array (copy 2),
+            np.append'ed camera by camera into the output (copy 3, quadratic), decoded via astype temporaries.
+    After:  payload is a view of the receive ring, written in place into the arena (copy 1), gathered and decoded
+            into a pooled output buffer that ships as a view (copy 2).
+
+    Allocation is the peak tracemalloc growth while assembling and shipping a frame.
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+sys.path.append( CODE_PATH )
+
+import logging
+import time
+import tracemalloc
+
+import numpy as np
+
+from Comms import SysManager, piCam
+from Comms.piComunicate import AssembleDetFrame
+
+NUM_CAMS  = 20
+NUM_DETS  = 200
+NUM_FRAGS = 4
+NUM_FRMS  = 200
+
+
+class LegacyAssembler( AssembleDetFrame ):
+    """ The list-of-arrays & np.append assembler, as it was """
+    FRAC_8BIT = 1./256
+    FRAC_4BIT = 1./16
+
+    def __init__( self, q_dets, manager ):
+        super( LegacyAssembler, self ).__init__( q_dets, manager )
+        self.frame_assemble = []
+        self.packets_remain = np.array( [], dtype=np.int8  )
+        self.assembled_idxs = np.array( [], dtype=np.int32 )
+        self.ship_sucess = np.zeros( (manager.num_cams,), dtype=np.int32 )
+
+    def processPacket( self, src_ip, packet ):
+        time_stamp, num_dts, dgm_no, dgm_cnt, dets = packet
+        data_len = len( dets )
+        cam_id, is_new = self.manager.getCamId( src_ip, time_stamp )
+        if( is_new ):
+            self.frame_assemble.append( np.array([], dtype=np.uint8) )
+            self.packets_remain = np.append( self.packets_remain, self.UNKNOWN_REMAINS )
+            self.assembled_idxs = np.append( self.assembled_idxs, 0 )
+            self.ship_sucess = np.append( self.ship_sucess, 0 )
+        if( time_stamp > self.manager.current_time ):
+            self.ship()
+            self.manager.current_time = time_stamp
+        elif( time_stamp < self.manager.current_time ):
+            return
+        if( self.packets_remain[ cam_id ] == self.UNKNOWN_REMAINS ):
+            self.packets_remain[ cam_id ] = dgm_cnt
+            self.frame_assemble[ cam_id ] = np.zeros( (num_dts*8), dtype=np.uint8 )
+        start_idx = self.assembled_idxs[ cam_id ]
+        end_idx = start_idx + data_len
+        self.frame_assemble[ cam_id ][ start_idx:end_idx ] = np.frombuffer( dets, dtype=np.uint8 )
+        self.assembled_idxs[ cam_id ] = end_idx
+        self.packets_remain[ cam_id ] -= 1
+        if( np.all( self.packets_remain < 1 ) ):
+            self.ship()
+
+    def ship( self ):
+        out = np.array([], dtype=np.uint8)
+        idxs = []
+        for i in range( len( self.frame_assemble ) ):
+            idxs.append( len( out ) )
+            out = np.append( out, self.frame_assemble[i][0:self.assembled_idxs[i]] )
+        idxs.append( len( out ) )
+        if( len( out ) == 0):
+            self.clearBuffers()
+            return
+        idxs = np.right_shift( np.array( idxs, dtype=np.int64 ), 3 )
+        raw = out.reshape( (idxs[ -1 ], 8) )
+        out = np.zeros( (raw.shape[0],3), dtype=np.float32 )
+        out[:,0]  = raw[:,1].astype( np.float32 ) * 256
+        out[:,0] += raw[:,0].astype( np.float32 )
+        out[:,1]  = raw[:,4].astype( np.float32 ) * 256
+        out[:,1] += raw[:,3].astype( np.float32 )
+        out[:,2]  = raw[:,6].astype( np.float32 )
+        out[:,0] += raw[:,2].astype( np.float32 ) * self.FRAC_8BIT
+        out[:,1] += raw[:,5].astype( np.float32 ) * self.FRAC_8BIT
+        tmp = np.right_shift( raw[:,7], 4 )
+        out[:,2] += tmp.astype( np.float32 ) * self.FRAC_4BIT
+        self.q_out.put( (self.manager.current_time, self.manager.sys_hash, idxs, out, -1) )
+        self.ship_sucess += self.packets_remain
+        self.clearBuffers()
+
+    def clearBuffers( self ):
+        self.frame_assemble = [ np.array([], dtype=np.uint8) for _ in range( self.manager.num_cams ) ]
+        self.packets_remain = np.full( (self.manager.num_cams,), self.UNKNOWN_REMAINS, dtype=np.int8 )
+        self.packets_remain[ self.bad_cameras ] = 0
+        self.assembled_idxs = np.full( (self.manager.num_cams,), 0, dtype=np.int32 )
+
+
+def makeFrames( num_frames, rng ):
+    """ Encoded datagrams, per frame, per camera, per fragment """
+    frag_dets = NUM_DETS // NUM_FRAGS
+    frames = []
+    for frame in range( num_frames ):
+        time_stamp = ( 0, 0, frame // 100, frame % 100 )
+        packets = []
+        for cam in range( NUM_CAMS ):
+            for frag in range( NUM_FRAGS ):
+                payload = rng.integers( 0, 256, frag_dets * 8, dtype=np.uint8 ).tobytes()
+                packets.append( ("10.0.0.{}".format( cam + 1 ), piCam.encodePacket( frame, NUM_DETS, 0,
+                                 piCam.PACKET_TYPES[ "centroids" ], frame & 0xFF, time_stamp, frag, NUM_FRAGS, payload )) )
+        frames.append( packets )
+    return frames
+
+
+def legacyFeed( assem, packets ):
+    for src_ip, data in packets:
+        dtype, time_stamp, num_dts, dgm_no, dgm_cnt, compression, msg = piCam.decodePacket( data )
+        assem.processPacket( src_ip, (time_stamp, num_dts, dgm_no, dgm_cnt, msg) )
+
+
+def toRing( frames ):
+    """ Lay each frame's datagrams out in a receive ring, as SimpleComms would have """
+    slot_sz = 1024 # plenty for these datagrams
+    ring = memoryview( bytearray( len( frames ) * NUM_CAMS * NUM_FRAGS * slot_sz ) )
+    rung = []
+    for f, packets in enumerate( frames ):
+        base = f * NUM_CAMS * NUM_FRAGS
+        offsets = (np.arange( len( packets ) ) + base) * slot_sz
+        for os_, (_, data) in zip( offsets, packets ):
+            ring[ os_ : os_ + len( data ) ] = data
+        rung.append( ([ ip for ip, _ in packets ], offsets, [ len( data ) for _, data in packets ]) )
+    return ring, rung
+
+
+def arenaFeed( assem, batch, ring ):
+    # as SimpleComms.handleBatch would hand them over
+    src_ips, offsets, sizes = batch
+    ends = offsets + np.asarray( sizes )
+    dtype, time_stamp, num_dts, dgm_no, dgm_cnt, compression, data_os = piCam.decodeHeaders( ring, offsets, sizes )
+    for packet in zip( src_ips, zip( time_stamp.tolist(), num_dts.tolist(), dgm_no.tolist(), dgm_cnt.tolist(),
+                                     compression.tolist(), [ ring[ s:e ] for s, e in zip( data_os.tolist(), ends.tolist() ) ] ) ):
+        assem.processPacket( *packet )
+
+
+def measure( make_assem, feed, frames ):
+    """ Time with tracemalloc off, as it slows every allocation down, then do a second pass for the allocations """
+    times, peaks = [], []
+    for trace in ( False, True ):
+        assem = make_assem()
+        if( trace ):
+            tracemalloc.start()
+        for packets in frames:
+            if( trace ):
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[ 0 ]
+            start = time.perf_counter()
+            feed( assem, packets )
+            if( trace ):
+                peaks.append( tracemalloc.get_traced_memory()[ 1 ] - base )
+            else:
+                times.append( time.perf_counter() - start )
+            while( not assem.q_out.empty() ):
+                _, _, _, _, buf_id = assem.q_out.get()
+                if( buf_id >= 0 ):
+                    assem.release( buf_id )
+        if( trace ):
+            tracemalloc.stop()
+    # skip the warm up frames
+    return np.median( times[ 10: ] ) * 1e3, np.median( peaks[ 10: ] )
+
+
+if( __name__ == "__main__" ):
+    logging.getLogger( "Comms" ).setLevel( logging.WARNING )
+    frames = makeFrames( NUM_FRMS, np.random.default_rng( 5 ) )
+    ring, rung = toRing( frames )
+    frame_bytes = NUM_CAMS * NUM_DETS * 8
+    print( "{} cams x {} dets in {} fragments: {} payload bytes per frame".format( NUM_CAMS, NUM_DETS, NUM_FRAGS, frame_bytes ) )
+
+    ms, peak = measure( lambda: LegacyAssembler( None, SysManager() ), legacyFeed, frames )
+    print( "before: 3 payload copies + append growth, {:.2f}ms, {: >8.0f} bytes allocated / frame".format( ms, peak ) )
+    ms, peak = measure( lambda: AssembleDetFrame( None, SysManager() ), lambda a, b: arenaFeed( a, b, ring ), rung )
+    print( " after: 1 payload copy + 1 gather,        {:.2f}ms, {: >8.0f} bytes allocated / frame".format( ms, peak ) )
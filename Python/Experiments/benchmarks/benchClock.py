@@ -0,0 +1,116 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" benchClock.py - The simArbiter's playback clock.  How close to the asked for rate, how far it drifts from where it
+    should be, and how late each tick is, for the sleep-a-period Metronome it had against the deadline one in Utils.
+    Also what happens to a consumer that stalls, the old clock only ever got one frame out of a backlog.
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+sys.path.append( CODE_PATH )
+
+import select
+import threading
+import time
+
+import numpy as np
+
+from Utils import Metronome, SelectableQueue
+
+RATE = 120 # Hz
+DURATION = 5.0 # seconds
+STALL_EVERY = 1.0 # seconds between consumer stalls
+STALL_FOR = 0.05 # seconds
+
+
+class LegacyMetronome( threading.Thread ):
+    """ The sleep-a-period version, as it was """
+
+    def __init__( self, q_tick, delay ):
+        super( LegacyMetronome, self ).__init__()
+        self.daemon = True
+        self._q_tick = q_tick
+        self._delay = delay
+        self.running = threading.Event()
+        self.running.set()
+
+    def run( self ):
+        while self.running.isSet():
+            time.sleep( self._delay )
+            self._q_tick.put( True )
+
+    def stop( self ):
+        self.running.clear()
+
+
+def run( make_clock, stall=False, legacy=False, maxlen=None ):
+    """ select on the ticks for DURATION, a frame a tick, or one frame a wake for the legacy loop """
+    q = SelectableQueue( maxlen=maxlen )
+    clock = make_clock( q )
+    period = 1.0 / RATE
+    arrived, frames = [], 0
+    clock.start()
+    start = time.perf_counter()
+    next_stall = start + STALL_EVERY
+    while( True ):
+        now = time.perf_counter()
+        if( now - start > DURATION ):
+            break
+        readable, _, _ = select.select( [ q ], [], [], 0.1 )
+        if( not readable ):
+            continue
+        ticks = q.drain()
+        now = time.perf_counter()
+        arrived.append( now )
+        frames += 1 if legacy else len( ticks )
+        if( stall and now > next_stall ):
+            time.sleep( STALL_FOR )
+            next_stall += STALL_EVERY
+
+    clock.stop()
+    elapsed = arrived[ -1 ] - start
+    arrived = np.asarray( arrived )
+    intervals = np.diff( arrived ) * 1e3
+    expected = int( elapsed / period )
+    return {
+        "rate"   : frames / elapsed,
+        "drift"  : (expected - frames) * period * 1e3, # ms of replay behind the wall clock
+        "jitter" : np.std( intervals - period * 1e3 ),
+        "worst"  : np.max( np.abs( intervals - period * 1e3 ) ),
+        "late"   : clock.stats()[ "jitter_p99" ] if hasattr( clock, "stats" ) else float( "nan" ), # us
+    }
+
+
+if( __name__ == "__main__" ):
+    clocks = (
+        ( "legacy", lambda q: LegacyMetronome( q, 1.0 / RATE ), True, None ),
+        ( "catchup", lambda q: Metronome( q, 1.0 / RATE, policy=Metronome.CATCH_UP ), False, None ),
+        ( "drop", lambda q: Metronome( q, 1.0 / RATE, policy=Metronome.DROP ), False, 1 ),
+        ( "no spin", lambda q: Metronome( q, 1.0 / RATE, spin=0 ), False, None ),
+    )
+    print( "{} Hz for {}s".format( RATE, DURATION ) )
+    print( "clock    | stalls | rate (Hz) | drift (ms) | interval jitter  worst (ms) | tick late p99 (us)" )
+    for stall in ( False, True ):
+        for name, make_clock, legacy, maxlen in clocks:
+            res = run( make_clock, stall=stall, legacy=legacy, maxlen=maxlen )
+            print( "{: <8} | {: <6} | {: >9.2f} | {: >10.1f} | {: >15.3f} {: >6.2f} | {: >18.1f}".format(
+                name, "yes" if stall else "no", res[ "rate" ], res[ "drift" ], res[ "jitter" ], res[ "worst" ],
+                res[ "late" ] ) )
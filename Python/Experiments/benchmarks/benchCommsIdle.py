@@ -0,0 +1,99 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" benchCommsIdle.py - Measure the CPU SimpleComms & AssembleDetFrame burn when no camera is talking, and the
+    latency from a datagram leaving a (fake) camera to its fragment arriving on q_dets under a 10 camera, 120fps load.
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+sys.path.append( CODE_PATH )
+
+import socket
+import time
+
+import numpy as np
+
+from Comms import SysManager, piCam
+from Comms.piComunicate import SimpleComms, AssembleDetFrame
+
+IDLE_SECS = 3.0
+NUM_CAMS  = 10
+RATE      = 120
+NUM_FRMS  = 240
+NUM_DETS  = 20
+
+
+def idleCpu( secs ):
+    manager = SysManager()
+    comms = SimpleComms( manager, "127.0.0.1" )
+    assem = AssembleDetFrame( comms.q_dets, manager )
+    comms.start()
+    assem.start()
+
+    wall_in, cpu_in = time.perf_counter(), time.process_time()
+    time.sleep( secs )
+    wall, cpu = time.perf_counter() - wall_in, time.process_time() - cpu_in
+
+    assem.running.clear()
+    comms.q_cmds.put( "127.0.0.1:close close" )
+    comms.join()
+    assem.join()
+
+    return 100. * cpu / wall
+
+
+def packetLatency( num_cams, rate, num_frames ):
+    manager = SysManager()
+    comms = SimpleComms( manager, "127.0.0.1" )
+    comms.start()
+
+    tx = socket.socket( socket.AF_INET, socket.SOCK_DGRAM )
+    payload = bytes( NUM_DETS * 8 )
+    period = 1.0 / rate
+    lags = []
+
+    for frame in range( num_frames ):
+        time_stamp = ( 0, 0, frame // rate, frame % rate )
+        packet = piCam.encodePacket( frame, NUM_DETS, 0, piCam.PACKET_TYPES[ "centroids" ], frame & 0xFF,
+                                     time_stamp, 0, 1, payload )
+        tick = time.perf_counter()
+        for cam in range( num_cams ):
+            sent = time.perf_counter()
+            tx.sendto( packet, ("127.0.0.1", piCam.UDP_PORT_TX) )
+            comms.q_dets.get( timeout=1.0 ).release()
+            lags.append( time.perf_counter() - sent )
+
+        sleep = period - (time.perf_counter() - tick)
+        if( sleep > 0. ):
+            time.sleep( sleep )
+
+    comms.q_cmds.put( "127.0.0.1:close close" )
+    comms.join()
+    tx.close()
+
+    return np.asarray( lags ) * 1e6
+
+
+if( __name__ == "__main__" ):
+    print( "Idle CPU over {}s: {:.2f}%".format( IDLE_SECS, idleCpu( IDLE_SECS ) ) )
+    lags = packetLatency( NUM_CAMS, RATE, NUM_FRMS )
+    print( "Packet to q_dets latency ({} cams @ {}fps): median {:.1f}us, p99 {:.1f}us, max {:.1f}us".format(
+        NUM_CAMS, RATE, np.median( lags ), np.percentile( lags, 99 ), lags.max() ) )
@@ -0,0 +1,111 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" benchControl.py - Commands/second a client gets acked by a local Arbiter, setting a parameter on 40 cameras one
+    command at a time, with the pipelined DEALER ArbiterControl against the blocking REQ one it replaced.
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+sys.path.append( CODE_PATH )
+sys.path.append( os.path.join( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ), "Apps" ) )
+
+import logging
+import struct
+import threading
+import time
+
+import zmq
+
+import Comms
+from arbiter import Arbiter
+
+NUM_CAMS = 40
+NUM_CMDS = 2000
+
+
+class LegacyControl( object ):
+    """ ArbiterControl, as it was (less the print) """
+
+    def __init__( self ):
+        self._zctx = zmq.Context()
+        self.comand = self._zctx.socket( zmq.REQ )
+        self.comand.connect( "tcp://localhost:{}".format( Comms.ABT_PORT_SYSCNC ) )
+        self.last_ack = -1
+
+    def send( self, verb, noun, value=None, tgt_list=None ):
+        self.comand.send( bytes( verb, "utf-8" ), zmq.SNDMORE )
+        self.comand.send( bytes( noun, "utf-8" ), zmq.SNDMORE )
+        if( value is not None ):
+            self.comand.send( bytes( str( value ), "utf-8" ), zmq.SNDMORE )
+        for target in tgt_list:
+            self.comand.send( bytes( str( target ), "utf-8" ), zmq.SNDMORE )
+        self.comand.send( b"K?" )
+        resp = self.comand.recv()
+        self.last_ack = struct.unpack( "I", resp )
+
+    def cleanClose( self ):
+        self.comand.close()
+        self._zctx.term()
+
+
+def perCamera( control, pipelined ):
+    """ Set a value on each camera in turn, as QMain.sendCNC would with one camera selected at a time """
+    start = time.perf_counter()
+    acks = []
+    for i in range( NUM_CMDS ):
+        ack = control.send( "set", "fps", 60, [ i % NUM_CAMS ] )
+        if( pipelined ):
+            acks.append( ack )
+    sent = time.perf_counter()
+    for ack in acks:
+        ack.result( timeout=10 )
+    end = time.perf_counter()
+    # acked cmds/s, and how long the caller (the UI thread) was held up per command
+    return NUM_CMDS / (end - start), 1e6 * (sent - start) / NUM_CMDS
+
+
+if( __name__ == "__main__" ):
+    logging.getLogger( "arbiter" ).setLevel( logging.WARNING )
+    app = Arbiter( "127.0.0.1" )
+    for i in range( NUM_CAMS ):
+        app.system.manualAdd( "127.0.1.{}".format( i + 1 ) )
+    runner = threading.Thread( target=app.execute )
+    runner.start()
+    time.sleep( 0.5 )
+
+    legacy = LegacyControl()
+    before = perCamera( legacy, False )
+    legacy.cleanClose()
+
+    control = Comms.ArbiterControl()
+    after = perCamera( control, True )
+    control.cleanClose()
+
+    app.running.clear()
+    runner.join()
+    app.com_mgr.q_cmds.put( "127.0.0.1:close close" )
+    app.cleanClose()
+    app.com_mgr.join()
+    app.det_mgr.join()
+
+    print( "client        |  acked cmds/s | caller us/cmd" )
+    print( "blocking REQ  | {: >13.0f} | {: >13.1f}".format( *before ) )
+    print( "pipelined     | {: >13.0f} | {: >13.1f}".format( *after ) )
@@ -0,0 +1,80 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" benchFanout.py - Python time to fan one "set" out to every camera, from handleCNC to the last sendto.  Command
+    strings parsed & composed per camera, against a CameraCommand encoded once, and once to the multicast group.
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+sys.path.append( CODE_PATH )
+
+import socket
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from Comms import piCam
+from Comms.piComunicate import AckLedger, CameraCommand, SimpleComms
+
+CAM_COUNTS = ( 10, 40, 200 )
+REPEATS = 200
+
+
+def legacyFanout( sock, ips, noun, value ):
+    """ handleCNC's per target strings, then SimpleComms' split, doSet, composeCommand as they were """
+    msgs = [ "{}:set {} {}".format( ip, noun, value ) for ip in ips ]
+    for cmd_string in msgs:
+        target, commands = cmd_string.split( ":", 1 )
+        imperative, data = commands.split( " ", 1 )
+        param, val = data.lower().split( " ", 1 )
+        trait = piCam.CAMERA_CAPABILITIES[ param ]
+        cast = trait.dtype( val )
+        msg, in_regshi = piCam.composeCommand( param, cast )
+        sock.sendto( msg, ( target, piCam.UDP_PORT_RX ) )
+
+
+def fanout( sock, ips, noun, value, broadcast=False ):
+    cmd = CameraCommand.compose( "set", noun, value, ips, broadcast=broadcast )
+    SimpleComms.sendCommand( SimpleNamespace( command_socket=sock, acks=AckLedger() ), cmd )
+
+
+def timeIt( func, *args, **kwargs ):
+    times = []
+    for _ in range( REPEATS ):
+        start = time.perf_counter()
+        func( *args, **kwargs )
+        times.append( time.perf_counter() - start )
+    return np.median( times ) * 1e6
+
+
+if( __name__ == "__main__" ):
+    sock = socket.socket( socket.AF_INET, socket.SOCK_DGRAM )
+    sock.setsockopt( socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 0 ) # don't let the benchmark off this host
+    print( " cams | strings us  ns/cam | command us  ns/cam | multicast us" )
+    for num_cams in CAM_COUNTS:
+        ips = [ "127.0.{}.{}".format( 10 + cam // 200, cam % 200 + 1 ) for cam in range( num_cams ) ]
+        before = timeIt( legacyFanout, sock, ips, "fps", "60" )
+        after = timeIt( fanout, sock, ips, "fps", "60" )
+        mcast = timeIt( fanout, sock, ips, "fps", "60", broadcast=True )
+        print( "{: >5} | {: >10.1f} {: >7.0f} | {: >10.1f} {: >7.0f} | {: >12.1f}".format(
+            num_cams, before, 1e3 * before / num_cams, after, 1e3 * after / num_cams, mcast ) )
+    sock.close()
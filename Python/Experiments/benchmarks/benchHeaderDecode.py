@@ -0,0 +1,100 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" benchHeaderDecode.py - Round-trip random encodePacket traffic through decodePacket and the batch decodeHeaders,
+    check they agree, then time both.
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+sys.path.append( CODE_PATH )
+
+import time
+
+import numpy as np
+
+from Comms import piCam
+from Comms.piComunicate import RECV_BUFF_SZ
+
+NUM_PACKETS = 512
+REPEATS = 100
+
+
+def randomPackets( num, rng ):
+    types = [ piCam.PACKET_TYPES[ "centroids" ], piCam.PACKET_TYPES[ "imagedata" ], piCam.PACKET_TYPES[ "regslo" ] ]
+    packets = []
+    for i in range( num ):
+        dtype = types[ rng.integers( len( types ) ) ]
+        num_dts = int( rng.integers( 0, 1024 ) )
+        dgm_cnt = int( rng.integers( 1, 16 ) )
+        packet = piCam.encodePacket( int( rng.integers( 0, 8192 ) ), num_dts, int( rng.integers( 0, 8 ) ), dtype,
+                                     i & 0xFF, rng.integers( 0, 256, 4 ).tolist(), int( rng.integers( 0, dgm_cnt ) ),
+                                     dgm_cnt, bytes( int( rng.integers( 0, 64 ) ) * 8 ),
+                                     img_os=int( rng.integers( 0, 65535 ) ), img_sz=int( rng.integers( 0, 65535 ) ) )
+        packets.append( packet )
+    packets.append( b"h" ) # a 'Hello' reply
+    return packets
+
+
+def toRing( packets ):
+    ring = bytearray( len( packets ) * RECV_BUFF_SZ )
+    for i, packet in enumerate( packets ):
+        ring[ i * RECV_BUFF_SZ : i * RECV_BUFF_SZ + len( packet ) ] = packet
+    offsets = np.arange( len( packets ) ) * RECV_BUFF_SZ
+    sizes = np.asarray( [ len( p ) for p in packets ] )
+    return ring, offsets, sizes
+
+
+def roundTrip( packets ):
+    ring, offsets, sizes = toRing( packets )
+    dtype, time_stamp, num_dts, dgm_no, dgm_cnt, compression, data_os = piCam.decodeHeaders( ring, offsets, sizes )
+    for i, packet in enumerate( packets ):
+        p_dtype, p_time, p_num, p_no, p_cnt, p_comp, p_data = piCam.decodePacket( packet )
+        assert( p_dtype == dtype[ i ] ), (i, "dtype")
+        assert( p_num == num_dts[ i ] ), (i, "num_dts")
+        assert( p_no == dgm_no[ i ] ), (i, "dgm_no")
+        assert( p_cnt == dgm_cnt[ i ] ), (i, "dgm_cnt")
+        assert( p_comp == compression[ i ] ), (i, "compression")
+        if( sizes[ i ] > 1 ):
+            assert( p_time == time_stamp[ i ] ), (i, "time_stamp")
+            assert( p_data == bytes( ring[ data_os[ i ] : offsets[ i ] + sizes[ i ] ] ) ), (i, "data")
+            assert( ((packet[ 2 ] >> 3) & 0x7) == compression[ i ] ), (i, "compression")
+    return len( packets )
+
+
+if( __name__ == "__main__" ):
+    rng = np.random.default_rng( 1234 )
+    packets = randomPackets( NUM_PACKETS, rng )
+    print( "Round trip OK for {} packets".format( roundTrip( packets ) ) )
+
+    ring, offsets, sizes = toRing( packets )
+    start = time.perf_counter()
+    for _ in range( REPEATS ):
+        for packet in packets:
+            piCam.decodePacket( packet )
+    per_pkt = (time.perf_counter() - start) / (REPEATS * len( packets ))
+
+    start = time.perf_counter()
+    for _ in range( REPEATS ):
+        piCam.decodeHeaders( ring, offsets, sizes )
+    batch = (time.perf_counter() - start) / (REPEATS * len( packets ))
+
+    print( "decodePacket : {:.3f}us / packet".format( per_pkt * 1e6 ) )
+    print( "decodeHeaders: {:.3f}us / packet (batches of {})".format( batch * 1e6, len( packets ) ) )
@@ -0,0 +1,213 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" benchIngest.py - Replay synthetic piCam centroid traffic over loopback and compare the batched SimpleComms
+    ingest against the old one-recvfrom-one-put-per-datagram path.  Then stall the consumer for longer than the
+    receive ring lasts, and check every payload it gets is the one its header says, against a ring with no guard.
+    Last, send a burst of image fragments several rings long, and check the Centroids after it still come from the ring.
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+sys.path.append( CODE_PATH )
+
+from queue import Empty
+import select
+import socket
+import struct
+import threading
+import time
+
+from Comms import SysManager, piCam
+from Comms.piComunicate import RingBatch, SimpleComms, RECV_BUFF_SZ, RING_SLOTS, SELECT_TIMEOUT
+
+NUM_CAMS  = 20
+RATE      = 240
+NUM_FRAGS = 4
+NUM_DETS  = 40 # per fragment
+SECONDS   = 5
+STALL_EVERY = 0.5 # seconds
+STALL_FOR   = 0.05 # seconds, ~1000 datagrams, twice the ring
+BURST_SZ    = RING_SLOTS * 3 # image fragments
+
+
+class LegacyComms( SimpleComms ):
+    """ The per-datagram receive loop, as it was """
+
+    def run( self ):
+        while( self.running.isSet() ):
+            readable, _, _ = select.select( self._inputs, [], [], SELECT_TIMEOUT )
+            for sock in readable:
+                if( sock == self.command_socket ):
+                    data, (src_ip, src_port) = self.command_socket.recvfrom( RECV_BUFF_SZ )
+                    dtype, time_stamp, num_dts, dgm_no, dgm_cnt, compression, msg = piCam.decodePacket( data )
+                    self.q_dets.put( [ (src_ip, (time_stamp, num_dts, dgm_no, dgm_cnt, compression, msg)) ] )
+
+                if( sock == self.q_cmds ):
+                    self.q_cmds.get()
+                    self.running.clear()
+
+        self.command_socket.close()
+        self.q_cmds.cleanClose()
+
+
+class UnguardedComms( SimpleComms ):
+    """ The receive ring as it was, slots are read into again whether or not the consumer's done with them """
+
+    @property
+    def ring_released( self ):
+        return self._ring_seq
+
+    @ring_released.setter
+    def ring_released( self, seq ):
+        pass
+
+
+def makeTraffic( num_frames ):
+    """ Each fragment's payload starts with its frame & fragment number.  Returns the frames, and frame by time stamp """
+    frames, stamps = [], {}
+    for frame in range( num_frames ):
+        time_stamp = ( 0, 0, frame // RATE, frame % RATE )
+        frames.append( [ piCam.encodePacket( frame, NUM_DETS * NUM_FRAGS, 0, piCam.PACKET_TYPES[ "centroids" ],
+                                             frame & 0xFF, time_stamp, frag, NUM_FRAGS,
+                                             struct.pack( "<II", frame, frag ) + bytes( NUM_DETS * 8 - 8 ) )
+                         for frag in range( NUM_FRAGS ) ] )
+        stamps[ piCam.decodePacket( frames[ -1 ][ 0 ] )[ 1 ] ] = frame
+    return frames, stamps
+
+
+def replay( comms_class, frames, stamps=None, stall=0. ):
+    comms = comms_class( SysManager(), "127.0.0.1" )
+    comms.start()
+
+    received = [ 0 ]
+    puts = [ 0 ]
+    corrupt = [ 0 ]
+    def consume():
+        next_stall = time.perf_counter() + STALL_EVERY
+        while( True ):
+            try:
+                batch = comms.q_dets.get( timeout=1.0 )
+            except Empty:
+                return
+            if( stall and time.perf_counter() > next_stall ):
+                time.sleep( stall ) # a GC pause, or the GIL
+                next_stall += STALL_EVERY
+            if( stamps is not None ):
+                for _, (time_stamp, _, dgm_no, _, _, msg) in batch:
+                    if( struct.unpack_from( "<II", msg ) != ( stamps[ time_stamp ], dgm_no ) ):
+                        corrupt[ 0 ] += 1
+            if( isinstance( batch, RingBatch ) ):
+                batch.release()
+            received[ 0 ] += len( batch )
+            puts[ 0 ] += 1
+
+    consumer = threading.Thread( target=consume )
+    consumer.start()
+
+    # Each camera gets its own socket, as on the wire
+    cams = [ socket.socket( socket.AF_INET, socket.SOCK_DGRAM ) for _ in range( NUM_CAMS ) ]
+    period = 1.0 / RATE
+    start = time.perf_counter()
+    for frame, packets in enumerate( frames ):
+        for cam in cams:
+            for packet in packets:
+                cam.sendto( packet, ("127.0.0.1", piCam.UDP_PORT_TX) )
+        sleep = (start + (frame + 1) * period) - time.perf_counter()
+        if( sleep > 0. ):
+            time.sleep( sleep )
+
+    consumer.join()
+    elapsed = time.perf_counter() - start - 1.0 # consumer times out after 1s of quiet
+
+    comms.q_cmds.put( "127.0.0.1:close close" )
+    comms.join()
+    for cam in cams:
+        cam.close()
+
+    return received[ 0 ], puts[ 0 ], elapsed, corrupt[ 0 ], comms.ring_overflows
+
+
+def burst( frames ):
+    """ Image fragments never reach the Assembler, so nothing releases their ring slots.  Send more of them than the
+        ring holds, then Centroids, and count the batches that came from the ring, and those copied out of it.
+    """
+    comms = SimpleComms( SysManager(), "127.0.0.1" )
+    comms.start()
+
+    cam = socket.socket( socket.AF_INET, socket.SOCK_DGRAM )
+    image = piCam.encodePacket( 0, 0, 0, piCam.PACKET_TYPES[ "imagedata" ], 0, ( 0, 0, 0, 0 ), 0, BURST_SZ,
+                                bytes( 1024 ), img_os=0, img_sz=1024 )
+    for _ in range( BURST_SZ ):
+        cam.sendto( image, ("127.0.0.1", piCam.UDP_PORT_TX) )
+    images = 0
+    while( images < BURST_SZ ):
+        try:
+            comms.q_imgs.get( timeout=1.0 )
+        except Empty:
+            break
+        images += 1
+
+    in_ring, copied = [ 0 ], [ 0 ]
+    def consume():
+        while( True ):
+            try:
+                batch = comms.q_dets.get( timeout=1.0 )
+            except Empty:
+                return
+            if( isinstance( batch, RingBatch ) ):
+                batch.release()
+                in_ring[ 0 ] += 1
+            else:
+                copied[ 0 ] += 1
+
+    consumer = threading.Thread( target=consume )
+    consumer.start()
+    for packets in frames:
+        for packet in packets:
+            cam.sendto( packet, ("127.0.0.1", piCam.UDP_PORT_TX) )
+        time.sleep( 1.0 / RATE )
+    consumer.join()
+
+    comms.q_cmds.put( "127.0.0.1:close close" )
+    comms.join()
+    cam.close()
+
+    return images, in_ring[ 0 ], copied[ 0 ], comms.ring_overflows
+
+
+if( __name__ == "__main__" ):
+    frames, stamps = makeTraffic( RATE * SECONDS )
+    sent = len( frames ) * NUM_CAMS * NUM_FRAGS
+    print( "Replaying {} cams @ {}fps, {} fragments per frame: {} datagrams".format( NUM_CAMS, RATE, NUM_FRAGS, sent ) )
+    for name, comms_class in ( ("per-datagram", LegacyComms), ("batched", SimpleComms) ):
+        got, puts, elapsed, _, _ = replay( comms_class, frames )
+        print( "{: >12}: {: >7} received ({:.2f}% lost), {: >7} queue puts, {:.0f} datagrams/s".format(
+            name, got, 100. * (sent - got) / sent, puts, got / elapsed ) )
+
+    print( "Consumer stalled for {}ms every {}s".format( int( STALL_FOR * 1000 ), STALL_EVERY ) )
+    for name, comms_class in ( ("unguarded", UnguardedComms), ("batched", SimpleComms) ):
+        got, _, _, corrupt, overflows = replay( comms_class, frames, stamps=stamps, stall=STALL_FOR )
+        print( "{: >12}: {: >7} received, {: >6} overwritten before they were used, {: >6} copied out of a full "
+               "ring".format( name, got, corrupt, overflows ) )
+
+    images, in_ring, copied, overflows = burst( frames[ :RATE ] )
+    print( "After {} image fragments: {} Centroid batches from the ring, {} copied out, {} datagrams copied out of "
+           "a full ring".format( images, in_ring, copied, overflows ) )
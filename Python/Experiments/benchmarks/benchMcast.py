@@ -0,0 +1,184 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" benchMcast.py - Loopback check of multicast commands.  40 fake cameras on 127.0.0.x join piCam.MCAST_GRP on the
+    loopback and answer requests as the firmware does, commands go unanswered.  "exe start" goes to them all as
+    unicast then as multicast, noting how staggered its arrival is by the kernel's receive timestamps.  The ack
+    tracking is checked with a camera that only hears unicast (acked after the resend), one that's dead, and one that
+    chatters log text but never answers a register read (both reported missing).
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+sys.path.append( CODE_PATH )
+
+import select
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+from Comms import SysManager, piCam
+from Comms.piComunicate import CameraCommand, SimpleComms
+
+HOST_IP  = "127.0.0.1"
+SO_TIMESTAMPNS = getattr( socket, "SO_TIMESTAMPNS", 35 ) # Linux
+NUM_CAMS = 40
+REPEATS  = 20
+
+
+def _report( dtype, size ):
+    return piCam.encodePacket( 0, 0, 0, piCam.PACKET_TYPES[ dtype ], 0, ( 0, 0, 0, 0 ), 0, 1, bytes( size ) )
+
+
+class FakeCam( threading.Thread ):
+    """ Notes when datagrams arrive, and answers requests like the firmware, exes & sets get no reply """
+    REPLIES = {
+        piCam.CAMERA_REQUESTS[ "hello" ]   : b"h",
+        piCam.CAMERA_REQUESTS[ "regslo" ]  : _report( "regslo", 56 ),
+        piCam.CAMERA_REQUESTS[ "regshi" ]  : _report( "regshi", 823 ),
+        piCam.CAMERA_REQUESTS[ "version" ] : _report( "version", 16 ),
+    }
+    TEXT = _report( "textslug", 32 )
+
+    def __init__( self, ip, mcast=True, alive=True, chatty=False ):
+        """
+        :param ip: (str) The camera
+        :param mcast: (bool) Hears multicast
+        :param alive: (bool) Answers requests
+        :param chatty: (bool) Sends a line of log text for everything it hears, instead of answering
+        """
+        super( FakeCam, self ).__init__()
+        self.daemon = True
+        self.ip = ip
+        self.alive = alive
+        self.chatty = chatty
+        self.arrivals = [] # ( when, datagram )
+
+        self.ucast = socket.socket( socket.AF_INET, socket.SOCK_DGRAM )
+        self.ucast.setsockopt( socket.SOL_SOCKET, SO_TIMESTAMPNS, 1 )
+        self.ucast.bind( (ip, piCam.UDP_PORT_RX) )
+        self._inputs = [ self.ucast ]
+
+        if( mcast ):
+            self.mcast = socket.socket( socket.AF_INET, socket.SOCK_DGRAM )
+            self.mcast.setsockopt( socket.SOL_SOCKET, socket.SO_REUSEADDR, 1 )
+            self.mcast.setsockopt( socket.SOL_SOCKET, SO_TIMESTAMPNS, 1 )
+            self.mcast.bind( ("", piCam.MCAST_PORT) )
+            self.mcast.setsockopt( socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP,
+                                   socket.inet_aton( piCam.MCAST_GRP ) + socket.inet_aton( HOST_IP ) )
+            self._inputs.append( self.mcast )
+
+        self.running = threading.Event()
+        self.running.set()
+
+    def run( self ):
+        while( self.running.isSet() ):
+            readable, _, _ = select.select( self._inputs, [], [], 0.1 )
+            for sock in readable:
+                data, anc, _, _ = sock.recvmsg( 1024, socket.CMSG_SPACE( 16 ) )
+                secs, nsecs = struct.unpack( "qq", anc[ 0 ][ 2 ][ :16 ] )
+                self.arrivals.append( ( secs + nsecs * 1e-9, data ) ) # when it reached the host, not our thread
+                if( self.chatty ):
+                    self.ucast.sendto( self.TEXT, (HOST_IP, piCam.UDP_PORT_TX) )
+                elif( self.alive and data in self.REPLIES ):
+                    self.ucast.sendto( self.REPLIES[ data ], (HOST_IP, piCam.UDP_PORT_TX) )
+        for sock in self._inputs:
+            sock.close()
+
+
+def received( cam, packet ):
+    return [ when for when, data in cam.arrivals if data == packet ]
+
+
+def spread( cams, packet ):
+    """ us between the first and last camera receiving the command """
+    arrivals = [ received( cam, packet )[ -1 ] for cam in cams ]
+    return 1e6 * (max( arrivals ) - min( arrivals ))
+
+
+def settle( comms, timeout=3.0 ):
+    return comms.q_acks.get( timeout=timeout )
+
+
+if( __name__ == "__main__" ):
+    comms = SimpleComms( SysManager(), HOST_IP )
+    comms.start()
+
+    cams = [ FakeCam( "127.0.0.{}".format( i + 2 ) ) for i in range( NUM_CAMS ) ]
+    for cam in cams:
+        cam.start()
+    ips = [ cam.ip for cam in cams ]
+
+    # Arrival stagger
+    results = { False: [], True: [] }
+    for _ in range( REPEATS ):
+        for broadcast in ( False, True ):
+            for cam in cams:
+                cam.arrivals.clear()
+            cmd = CameraCommand.compose( "exe", "start", targets=ips, broadcast=broadcast )
+            comms.q_cmds.put( cmd )
+            if( broadcast ):
+                _, acked, missing = settle( comms )
+                assert not missing and len( acked ) == NUM_CAMS, missing
+            else:
+                time.sleep( 0.05 )
+            assert all( len( received( cam, cmd.packets[ 0 ] ) ) == 1 for cam in cams ), "lost or doubled a command"
+            results[ broadcast ].append( spread( cams, cmd.packets[ 0 ] ) )
+
+    print( "transport | arrival spread us, median   max | datagrams" )
+    for broadcast, name, dgms in ( (False, "unicast", NUM_CAMS), (True, "multicast", 1) ):
+        print( "{: <9} | {: >24.1f} {: >5.1f} | {: >9}".format( name, np.median( results[ broadcast ] ),
+                                                               np.max( results[ broadcast ] ), dgms ) )
+
+    # Ack tracking: one camera misses the multicast but hears the resend, one never answers, one only chatters
+    deaf = FakeCam( "127.0.0.200", mcast=False )
+    dead = FakeCam( "127.0.0.201", alive=False )
+    chatty = FakeCam( "127.0.0.202", chatty=True )
+    deaf.start(); dead.start(); chatty.start()
+    cmd = CameraCommand.compose( "set", "fps", "60", targets=ips + [ deaf.ip, dead.ip, chatty.ip ], broadcast=True )
+    start = time.perf_counter()
+    comms.q_cmds.put( cmd )
+    _, acked, missing = settle( comms )
+    took = time.perf_counter() - start
+    assert missing == [ dead.ip, chatty.ip ], missing
+    assert deaf.ip in acked and len( acked ) == NUM_CAMS + 1
+    assert len( received( deaf, cmd.packets[ 0 ] ) ) == 1 and len( received( dead, cmd.packets[ 0 ] ) ) == 2 # resent
+    print( "acks: {} acked, missing {}, deaf camera acked after {:.0f}ms, settled in {:.0f}ms".format(
+        len( acked ), missing, 1e3 * acked[ deaf.ip ], 1e3 * took ) )
+
+    # Replies are credited in send order.  The first set's resend is answered while the second is still waiting on
+    # the multicast it didn't hear, the reply must ack the first
+    first = CameraCommand.compose( "set", "fps", "60", targets=[ deaf.ip ], broadcast=True )
+    second = CameraCommand.compose( "set", "strobe", "20", targets=[ deaf.ip ], broadcast=True )
+    comms.q_cmds.put( first )
+    time.sleep( 0.3 )
+    comms.q_cmds.put( second )
+    order = [ settle( comms )[ 0 ], settle( comms )[ 0 ] ]
+    assert order == [ first, second ], order
+    print( "resent commands acked in the order they were sent" )
+
+    comms.q_cmds.put( "{}:close close".format( HOST_IP ) )
+    comms.join()
+    for cam in cams + [ deaf, dead, chatty ]:
+        cam.running.clear()
+    print( "OK" )
@@ -0,0 +1,140 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" benchPublish.py - Throughput of Arbiter.publishDets, in MB/s and frames/s, from the det man's buffers to a
+    subscriber that views the frame in place, with zero copy tracked sends against the tobytes() copies it replaced.
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+sys.path.append( CODE_PATH )
+sys.path.append( os.path.join( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ), "Apps" ) )
+
+import logging
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import zmq
+
+import Comms
+from arbiter import Arbiter
+
+ENDPOINT  = "tcp://127.0.0.1:{}".format( Comms.ABT_PORT_DATA + 100 )
+NUM_CAMS  = 40
+DET_COUNTS = ( 100, 1000, 5000 ) # per camera
+NUM_FRMS  = 500
+POOL_SZ   = 8
+
+
+class BufferPool( object ):
+    """ Stands in for the det man's buffer pool """
+
+    def __init__( self, num_dets ):
+        self.bufs = [ np.random.random( (num_dets, 3) ).astype( np.float32 ) for _ in range( POOL_SZ ) ]
+        self.free = list( range( POOL_SZ ) )
+        self.starved = 0
+
+    def acquire( self ):
+        if( not self.free ):
+            self.starved += 1
+            self.bufs.append( np.random.random( self.bufs[ 0 ].shape ).astype( np.float32 ) )
+            return len( self.bufs ) - 1
+        return self.free.pop()
+
+    def release( self, buf_id ):
+        self.free.append( buf_id )
+
+
+def legacyPublishDets( self, data ):
+    """ publishDets, as it was, before frames carried their sys_hash """
+    time, _, strides, dets, buf_id = data
+    self.data_pub.send_multipart( [ Comms.ABT_TOPIC_ROIDS_B, b"",
+                                    bytes( str( time ), "utf-8" ),
+                                    strides.tobytes(),
+                                    dets.tobytes() ] )
+    self.det_mgr.release( buf_id )
+
+
+def subscriber( ctx, ready, done, legacy ):
+    sub = ctx.socket( zmq.SUB )
+    sub.setsockopt( zmq.RCVHWM, 0 )
+    sub.subscribe( Comms.ABT_TOPIC_ROIDS )
+    sub.connect( ENDPOINT )
+    ready.set()
+    got = 0
+    while( got < NUM_FRMS ):
+        if( not sub.poll( 2000 ) ):
+            break
+        if( legacy ):
+            _, _, stamp, strides, data = sub.recv_multipart()
+            nd_strides = np.frombuffer( strides, dtype=np.int32 )
+            nd_data = np.frombuffer( data, dtype=np.float32 ).reshape( -1, 3 )
+        else:
+            frame = Comms.decodeFrame( sub.recv_multipart( copy=False )[ 2: ] )
+        got += 1
+    done.append( (time.perf_counter(), got) )
+    sub.close()
+
+
+def throughput( num_dets, legacy=False ):
+    ctx = zmq.Context()
+    pub = ctx.socket( zmq.PUB )
+    pub.setsockopt( zmq.SNDHWM, 0 )
+    pub.bind( ENDPOINT )
+
+    pool = BufferPool( NUM_CAMS * num_dets )
+    fake = SimpleNamespace( data_pub=pub, det_mgr=pool, system=Comms.SysManager(), frames_pub=0, _in_flight=[],
+                            frame_version=Comms.ABT_FRAME_VERSION )
+    publish = legacyPublishDets if legacy else Arbiter.publishDets
+    strides = np.arange( 0, NUM_CAMS * num_dets + 1, num_dets, dtype=np.int32 )
+
+    ready, done = threading.Event(), []
+    sub = threading.Thread( target=subscriber, args=( ctx, ready, done, legacy ) )
+    sub.start()
+    ready.wait()
+    time.sleep( 0.3 ) # let the subscription land
+
+    start = time.perf_counter()
+    for frame in range( NUM_FRMS ):
+        buf_id = pool.acquire()
+        publish( fake, (frame, fake.system.sys_hash, strides, pool.bufs[ buf_id ], buf_id) )
+        if( fake._in_flight ):
+            Arbiter.releaseSent( fake )
+    sub.join()
+    end, got = done[ 0 ]
+
+    pub.close( linger=0 )
+    ctx.term()
+
+    secs = end - start
+    frame_mb = (strides.nbytes + pool.bufs[ 0 ].nbytes) / 1e6
+    return got / secs, got * frame_mb / secs, frame_mb, pool.starved
+
+
+if( __name__ == "__main__" ):
+    logging.getLogger( "arbiter" ).setLevel( logging.WARNING )
+    print( "  dets  frame MB | before fps    MB/s | after fps    MB/s  pool growth" )
+    for num_dets in DET_COUNTS:
+        b_fps, b_mbs, frame_mb, _ = throughput( num_dets, legacy=True )
+        a_fps, a_mbs, _, starved = throughput( num_dets )
+        print( "{: >6} {: >9.2f} | {: >10.0f} {: >7.0f} | {: >9.0f} {: >7.0f}  {: >11}".format(
+            NUM_CAMS * num_dets, frame_mb, b_fps, b_mbs, a_fps, a_mbs, starved ) )
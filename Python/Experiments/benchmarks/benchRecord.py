@@ -0,0 +1,132 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" benchRecord.py - A TakeRecorder on a 40 camera 240Hz ROIDS stream.  The stream is published at rate, then as
+    fast as it'll go, reporting the recorder's bandwidth & losses, and how long the publisher spent sending compared
+    to when a client that only listens is subscribed.  Then the take is checked against what was sent.
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+sys.path.append( CODE_PATH )
+sys.path.append( os.path.join( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ), "Apps" ) )
+
+import logging
+import tempfile
+import time
+
+import numpy as np
+import zmq
+
+import Comms
+from takeRecorder import TakeRecorder
+from Utils.takeFile import TakeReader
+
+NUM_CAMS  = 40
+CAM_DETS  = 60 # mean per camera
+RATE      = 240
+SECONDS   = 5
+POOL_SZ   = 64 # distinct frames, cycled
+
+
+def makeFrames( rng ):
+    frames = []
+    for _ in range( POOL_SZ ):
+        counts = rng.poisson( CAM_DETS, NUM_CAMS )
+        strides = np.zeros( (NUM_CAMS + 1,), dtype=np.int32 )
+        np.cumsum( counts, out=strides[ 1: ] )
+        dets = rng.uniform( -1, 1, (strides[ -1 ], 3) ).astype( np.float32 )
+        ids = rng.integers( -1, 50, strides[ -1 ] ).astype( np.int32 )
+        frames.append( (strides, dets, ids) )
+    return frames
+
+
+def publish( pub, frames, num, rate, start_no ):
+    """ :return: (float) mean ms the publisher spent in send per frame """
+    period = 1. / rate if rate else 0.
+    sending = 0.
+    due = time.perf_counter()
+    for n in range( num ):
+        strides, dets, ids = frames[ (start_no + n) % POOL_SZ ]
+        parts = Comms.encodeFrame( start_no + n, start_no + n, 1, strides, dets, ids=ids )
+        t0 = time.perf_counter()
+        pub.send_multipart( [ Comms.ABT_TOPIC_ROIDS_B, b"" ] + parts, copy=False )
+        sending += time.perf_counter() - t0
+        if( period ):
+            due += period
+            wait = due - time.perf_counter()
+            if( wait > 0 ):
+                time.sleep( wait )
+    return 1000. * sending / num
+
+
+if( __name__ == "__main__" ):
+    logging.getLogger( "Comms" ).setLevel( logging.WARNING )
+    frames = makeFrames( np.random.default_rng( 7 ) )
+    mean_dets = np.mean( [ len( f[ 1 ] ) for f in frames ] )
+    print( "{} cams x ~{} dets @ {}Hz: {:.1f} MB/s of dets & ids".format( NUM_CAMS, CAM_DETS, RATE,
+                                                                         mean_dets * 16 * RATE / 1e6 ) )
+
+    ctx = zmq.Context()
+    pub = ctx.socket( zmq.PUB )
+    pub.bind( "tcp://*:{}".format( Comms.ABT_PORT_DATA ) )
+
+    # a client that only listens, for comparison
+    listen = Comms.ArbiterListen( latest=False )
+    listen.start()
+    time.sleep( 0.5 ) # let the subscription settle
+    alone = publish( pub, frames, RATE, RATE, 0 )
+    listen.running.clear()
+    listen.join()
+
+    take_fq = os.path.join( tempfile.mkdtemp(), "bench.take" )
+    rec = TakeRecorder( take_fq, num_cams=NUM_CAMS, rate=RATE )
+    rec.start()
+    time.sleep( 0.5 ) # let the subscription settle
+
+    sent = 0
+    for label, rate, num in ( ("at rate", RATE, RATE * SECONDS), ("flat out", 0, RATE * SECONDS) ):
+        t0, before = time.perf_counter(), rec.writer.bytes_written
+        ms = publish( pub, frames, num, rate, sent )
+        took = time.perf_counter() - t0
+        sent += num
+        while( rec.written < sent and (time.perf_counter() - t0) < took + 5. ):
+            time.sleep( rec.flush_period ) # catch up
+        mbs = (rec.writer.bytes_written - before) / (time.perf_counter() - t0) / 1e6
+        stats = rec.stats()
+        print( "{:>8}: {:6.0f} fps sent, send {:.3f} ms/frame ({:.3f} listener only) | {:>5} written, {} dropped, "
+               "{} missed, {:.1f} MB/s".format( label, num / took, ms, alone, stats[ "written" ], stats[ "dropped" ],
+                                                stats[ "missed" ], mbs ) )
+
+    rec.cleanClose()
+    print( "take grown {} times, {:.1f} MB written".format( rec.writer.grown, rec.writer.bytes_written / 1e6 ) )
+
+    # what made it should be exactly what was sent
+    with TakeReader( take_fq ) as take:
+        bad = 0
+        for n in range( len( take ) ):
+            frame_no = int( take.times[ n ] )
+            strides, dets, ids = take[ n ]
+            s, d, i = frames[ frame_no % POOL_SZ ]
+            bad += not (np.array_equal( strides, s ) and np.array_equal( dets, d ) and np.array_equal( ids, i ))
+        print( "{} frames in the take, {} differ from what was sent".format( len( take ), bad ) )
+
+    pub.close()
+    ctx.term()
@@ -0,0 +1,84 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" benchReorder.py - Feed the Assembler fragments with one slow camera and some switch reordering, and compare the
+    reorder window against "ship when something newer turns up" (a window of 1).
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+sys.path.append( CODE_PATH )
+
+import logging
+
+import numpy as np
+
+from Comms import SysManager
+from Comms.piComunicate import AssembleDetFrame
+
+NUM_CAMS  = 20
+NUM_FRAGS = 3
+NUM_DETS  = 30
+NUM_FRMS  = 500
+SLOW_CAM  = 7    # this camera's fragments turn up a frame late
+JITTER    = 0.05 # chance a fragment swaps places with its neighbour
+
+
+def traffic( rng ):
+    payload = bytes( NUM_DETS * 8 )
+    stream = []
+    for frame in range( 1, NUM_FRMS + 1 ):
+        for cam in range( NUM_CAMS ):
+            delay = 1.5 if cam == SLOW_CAM else 0.
+            for frag in range( NUM_FRAGS ):
+                order = frame + delay + rng.uniform( 0, 0.5 )
+                stream.append( (order, "10.0.0.{}".format( cam + 1 ), (frame, NUM_DETS * NUM_FRAGS, frag, NUM_FRAGS, 0, payload)) )
+    stream.sort( key=lambda x: x[ 0 ] )
+
+    # the odd adjacent swap
+    for i in range( len( stream ) - 1 ):
+        if( rng.uniform() < JITTER ):
+            stream[ i ], stream[ i + 1 ] = stream[ i + 1 ], stream[ i ]
+    return [ (ip, packet) for _, ip, packet in stream ]
+
+
+def run( packets, window, deadline ):
+    manager = SysManager()
+    for cam in range( NUM_CAMS ): # known topology, so start-up discovery doesn't muddy things
+        manager.getCamId( "10.0.0.{}".format( cam + 1 ) )
+    assem = AssembleDetFrame( None, manager, window=window, deadline=deadline )
+    complete = 0
+    for src_ip, packet in packets:
+        assem.processPacket( src_ip, packet )
+        while( not assem.q_out.empty() ):
+            _, _, strides, _, buf_id = assem.q_out.get()
+            complete += int( strides[ -1 ] == NUM_CAMS * NUM_DETS * NUM_FRAGS )
+            assem.release( buf_id )
+    return complete, assem
+
+
+if( __name__ == "__main__" ):
+    logging.getLogger( "Comms" ).setLevel( logging.WARNING )
+    packets = traffic( np.random.default_rng( 3 ) )
+    print( "{} frames, {} cams, cam {} runs 1.5 frames late".format( NUM_FRMS, NUM_CAMS, SLOW_CAM ) )
+    for window in ( 1, 2, 3, 4 ):
+        complete, assem = run( packets, window, None )
+        print( "window {}: {: >4} complete frames, {: >5} recovered, {: >5} late, {: >5} orphaned fragments".format(
+            window, complete, assem.recovered_frags, assem.late_frags, assem.orphan_frags ) )
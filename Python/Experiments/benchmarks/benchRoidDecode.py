@@ -0,0 +1,132 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" benchRoidDecode.py - Round-trip random Centroids through each of the piCam decode kernels, then time them in
+    centroids per second, on their own and as part of AssembleDetFrame.ship.  The 'compressed' mode is also timed
+    with the astype decode it replaced.
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+sys.path.append( CODE_PATH )
+
+import logging
+import time
+
+import numpy as np
+
+from Comms import SysManager, piCam
+from Comms.piComunicate import AssembleDetFrame
+
+NUM_ROIDS = 100000
+NUM_CAMS  = 20
+NUM_DETS  = 200
+NUM_RUNS  = 50
+SENSOR    = 2048 # dense mode can only address 4096 pixels
+
+
+def legacyDecode( raw, out ):
+    # as AssembleDetFrame.ship did it
+    out[:,0]  = raw[:,1].astype( np.float32 ) * 256
+    out[:,0] += raw[:,0].astype( np.float32 )
+    out[:,1]  = raw[:,4].astype( np.float32 ) * 256
+    out[:,1] += raw[:,3].astype( np.float32 )
+    out[:,2]  = raw[:,6].astype( np.float32 )
+    out[:,0] += raw[:,2].astype( np.float32 ) * piCam.FRAC_8BIT
+    out[:,1] += raw[:,5].astype( np.float32 ) * piCam.FRAC_8BIT
+    tmp = np.right_shift( raw[:,7], 4 )
+    out[:,2] += tmp.astype( np.float32 ) * piCam.FRAC_4BIT
+
+
+def randomDets( num, rng ):
+    dets = np.empty( (num, 3), dtype=np.float64 )
+    dets[:,:2] = rng.uniform( 0, SENSOR, (num, 2) )
+    dets[:,2] = rng.uniform( 0, 32, num )
+    return dets
+
+
+def roundTrip( dets, compression ):
+    """ Worst error of each of X, Y, Radius """
+    data = piCam.encodeRoids( dets, compression )
+    assert( len( data ) == len( dets ) * piCam.ROID_KERNELS[ compression ][ 0 ].itemsize )
+    return np.abs( piCam.decodeRoids( data, compression ) - dets ).max( axis=0 )
+
+
+def rate( func, num ):
+    """ Best of NUM_RUNS, in centroids / second """
+    best = np.inf
+    for _ in range( NUM_RUNS ):
+        start = time.perf_counter()
+        func()
+        best = min( best, time.perf_counter() - start )
+    return num / best
+
+
+def shipRate( compressions, rng ):
+    """ Centroids / second through ship, with camera i in compressions[ i % len ] """
+    manager = SysManager()
+    ips = [ "10.0.0.{}".format( cam + 1 ) for cam in range( NUM_CAMS ) ]
+    for ip in ips:
+        manager.getCamId( ip )
+    assem = AssembleDetFrame( None, manager, deadline=0 )
+
+    times = []
+    real_ship = assem.ship
+    def timedShip( *args ):
+        start = time.perf_counter()
+        real_ship( *args )
+        times.append( time.perf_counter() - start )
+    assem.ship = timedShip
+
+    payloads = [ piCam.encodeRoids( randomDets( NUM_DETS, rng ), compressions[ cam % len( compressions ) ] )
+                 for cam in range( NUM_CAMS ) ]
+    for frame in range( 1, NUM_RUNS + 1 ):
+        for cam, (ip, payload) in enumerate( zip( ips, payloads ) ):
+            assem.processPacket( ip, (frame, NUM_DETS, 0, 1, compressions[ cam % len( compressions ) ], payload) )
+        while( not assem.q_out.empty() ):
+            assem.release( assem.q_out.get()[ 4 ] )
+
+    return (NUM_CAMS * NUM_DETS) / np.median( times )
+
+
+if( __name__ == "__main__" ):
+    logging.getLogger( "Comms" ).setLevel( logging.WARNING )
+    rng = np.random.default_rng( 11 )
+    dets = randomDets( NUM_ROIDS, rng )
+    out = np.empty( (NUM_ROIDS, 3), dtype=np.float32 )
+
+    print( "mode          bytes  max err x, y, r      | decode Mroids/s  ship Mroids/s" )
+    for name in ( "compressed", "dense" ):
+        compression = piCam.ROID_COMPRESSION[ name ]
+        err = roundTrip( dets, compression )
+        data = piCam.encodeRoids( dets, compression )
+        decode = rate( lambda: piCam.decodeRoids( data, compression, out ), NUM_ROIDS )
+        ship = shipRate( [ compression ], rng )
+        print( "{: <12} {: >6}  {:.4f} {:.4f} {:.4f} | {: >15.1f} {: >14.1f}".format(
+            name, piCam.ROID_KERNELS[ compression ][ 0 ].itemsize, err[ 0 ], err[ 1 ], err[ 2 ], decode / 1e6, ship / 1e6 ) )
+
+    data = piCam.encodeRoids( dets, piCam.ROID_COMPRESSION[ "compressed" ] )
+    raw = np.frombuffer( data, dtype=np.uint8 ).reshape( (-1, 8) )
+    legacy = rate( lambda: legacyDecode( raw, out ), NUM_ROIDS )
+    assert( np.array_equal( out, piCam.decodeRoids( data, piCam.ROID_COMPRESSION[ "compressed" ] ) ) )
+    print( "{: <12} {: >6}  {: <20} | {: >15.1f}".format( "legacy", 8, "", legacy / 1e6 ) )
+
+    mixed = shipRate( [ piCam.ROID_COMPRESSION[ "compressed" ], piCam.ROID_COMPRESSION[ "dense" ] ], rng )
+    print( "{: <12} {: >6}  {: <20} | {: >15} {: >14.1f}".format( "mixed", "", "", "", mixed / 1e6 ) )
@@ -0,0 +1,156 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" benchSelectQueue.py - Command latency & throughput of Utils.SelectableQueue, through a select loop like
+    SimpleComms', against the loopback TCP socket version it replaced.  Also checks neither leaks file descriptors.
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+sys.path.append( CODE_PATH )
+
+import gc
+import select
+import socket
+import threading
+import time
+
+try:
+    from queue import SimpleQueue
+except ImportError:
+    from queue import Queue as SimpleQueue
+
+import numpy as np
+
+from Utils import SelectableQueue
+
+NUM_ITEMS = 100000
+NUM_PINGS = 2000
+NUM_QUEUES = 500
+
+
+class LegacySelectableQueue( SimpleQueue ):
+    """ The loopback TCP version, as it was """
+
+    PORT = 0
+
+    def __init__( self ):
+        super( LegacySelectableQueue, self ).__init__()
+        temp_in = socket.socket( socket.AF_INET, socket.SOCK_STREAM )
+        temp_in.bind( ( "127.0.0.1", self.PORT ) )
+        temp_in.listen( 1 )
+        in_addr = temp_in.getsockname()
+        self._out = socket.socket( socket.AF_INET, socket.SOCK_STREAM )
+        self._out.connect( in_addr )
+        self._in, out_addr = temp_in.accept()
+        temp_in.close()
+
+    def fileno( self ):
+        return self._in.fileno()
+
+    def put( self, item ):
+        super( LegacySelectableQueue, self ).put( item )
+        self._out.send( b"!" )
+
+    def get( self ):
+        self._in.recv( 1 )
+        return super( LegacySelectableQueue, self ).get()
+
+    def cleanClose( self ):
+        self._out.close()
+        self._in.close()
+
+    def __del__( self ):
+        self.cleanClose()
+
+
+def takeAll( q ):
+    # What a select loop does when the queue's readable
+    if( hasattr( q, "drain" ) ):
+        return q.drain()
+    return [ q.get() ]
+
+
+def consumer( q, num, stamps=None ):
+    """ select on the queue until num items are taken, noting when each arrived """
+    got = 0
+    while( got < num ):
+        readable, _, _ = select.select( [ q ], [], [], 1.0 )
+        if( not readable ):
+            raise RuntimeError( "Stalled after {} items".format( got ) )
+        items = takeAll( q )
+        now = time.perf_counter()
+        if( stamps is not None ):
+            stamps.extend( now - item for item in items )
+        got += len( items )
+
+
+def throughput( make_q ):
+    q = make_q()
+    reader = threading.Thread( target=consumer, args=( q, NUM_ITEMS ) )
+    reader.start()
+    start = time.perf_counter()
+    for i in range( NUM_ITEMS ):
+        q.put( i )
+    reader.join()
+    rate = NUM_ITEMS / (time.perf_counter() - start)
+    q.cleanClose()
+    return rate
+
+
+def latency( make_q ):
+    """ One command at a time, like a user poking at camera settings """
+    q = make_q()
+    lags = []
+    reader = threading.Thread( target=consumer, args=( q, NUM_PINGS, lags ) )
+    reader.start()
+    for _ in range( NUM_PINGS ):
+        q.put( time.perf_counter() )
+        time.sleep( 0.0002 )
+    reader.join()
+    q.cleanClose()
+    return np.asarray( lags ) * 1e6
+
+
+def openFds():
+    return len( os.listdir( "/proc/self/fd" ) ) if os.path.isdir( "/proc/self/fd" ) else -1
+
+
+def leaks( make_q ):
+    """ fds left open after making and dropping lots of queues, half closed cleanly first """
+    gc.collect()
+    before = openFds()
+    for i in range( NUM_QUEUES ):
+        q = make_q()
+        q.put( i )
+        if( i % 2 ):
+            q.cleanClose()
+        del q
+    gc.collect()
+    return openFds() - before
+
+
+if( __name__ == "__main__" ):
+    print( "queue    | items/s     | latency median   p99 (us) | leaked fds" )
+    for name, make_q in ( ("legacy", LegacySelectableQueue), ("new", SelectableQueue) ):
+        rate = throughput( make_q )
+        lags = latency( make_q )
+        print( "{: <8} | {: >11.0f} | {: >14.1f} {: >7.1f}      | {: >10}".format(
+            name, rate, np.median( lags ), np.percentile( lags, 99 ), leaks( make_q ) ) )
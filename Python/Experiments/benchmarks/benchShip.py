@@ -0,0 +1,82 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" benchShip.py - Time AssembleDetFrame.ship (and the clearBuffers that follows it) as cameras and detections grow,
+    up to 40 cameras x 200 dets, against the np.append assembler it replaced.  That never moved Centroids to NDC, so
+    the new one's timed with and without.
+"""
+
+# Workaround not being in PATH
+import os, sys
+_git_root_ = os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.dirname( os.path.realpath(__file__) ) ) ) ) )
+CODE_PATH = os.path.join( _git_root_, "Gimli", "Python" )
+sys.path.append( CODE_PATH )
+sys.path.append( os.path.dirname( os.path.realpath(__file__) ) )
+
+import logging
+import time
+
+import numpy as np
+
+from Comms import SysManager, piCam
+from Comms.piComunicate import AssembleDetFrame
+from benchAssembly import LegacyAssembler
+
+CAM_COUNTS = ( 10, 20, 40 )
+DET_COUNTS = ( 50, 100, 200 )
+NUM_FRMS = 60
+
+
+def shipTimes( assem, num_cams, num_dets, rng, legacy=False ):
+    times = []
+    real_ship = assem.ship
+    def timedShip( *args ):
+        start = time.perf_counter()
+        real_ship( *args )
+        times.append( time.perf_counter() - start )
+    assem.ship = timedShip
+
+    payloads = [ rng.integers( 0, 256, num_dets * 8, dtype=np.uint8 ).tobytes() for _ in range( num_cams ) ]
+    ips = [ "10.0.{}.{}".format( cam // 200, cam % 200 + 1 ) for cam in range( num_cams ) ]
+    for frame in range( 1, NUM_FRMS + 1 ):
+        for ip, payload in zip( ips, payloads ):
+            if( legacy ): # no compression field
+                assem.processPacket( ip, (frame, num_dets, 0, 1, payload) )
+            else:
+                assem.processPacket( ip, (frame, num_dets, 0, 1, 0, payload) )
+        while( not assem.q_out.empty() ):
+            _, _, _, _, buf_id = assem.q_out.get()
+            if( buf_id >= 0 ):
+                assem.release( buf_id )
+
+    return np.median( times[ 5: ] ) * 1e6
+
+
+if( __name__ == "__main__" ):
+    logging.getLogger( "Comms" ).setLevel( logging.WARNING )
+    rng = np.random.default_rng( 7 )
+    print( " cams  dets | before us/frame  ns/det | after us/frame  ns/det | +NDC us/frame  ns/det" )
+    for num_cams in CAM_COUNTS:
+        for num_dets in DET_COUNTS:
+            total = num_cams * num_dets
+            before = shipTimes( LegacyAssembler( None, SysManager() ), num_cams, num_dets, rng, legacy=True )
+            after = shipTimes( AssembleDetFrame( None, SysManager(), ndc=False ), num_cams, num_dets, rng )
+            ndc = shipTimes( AssembleDetFrame( None, SysManager(), ndc=True ), num_cams, num_dets, rng )
+            print( "{: >5} {: >5} | {: >15.1f} {: >7.1f} | {: >14.1f} {: >7.1f} | {: >13.1f} {: >7.1f}".format(
+                num_cams, num_dets, before, 1e3 * before / total, after, 1e3 * after / total,
+                ndc, 1e3 * ndc / total ) )
@@ -1,11 +1,13 @@
 import numpy as np
 np.set_printoptions( precision=3, suppress=True )
 
+import struct
 import zmq
 
 ABT_PORT_DATA     = 5577
 ABT_TOPIC_ROIDS   = "ROIDS" # Centroid Data
 ABT_TOPIC_ROIDS_B = bytes( ABT_TOPIC_ROIDS, "utf-8" )
+ABT_FRAME_FMT     = "<2sBBIII4s4sII" # v1 prefix of the header, see Comms.encodeFrame
 
 
 zctx = zmq.Context()
@@ -20,8 +22,9 @@ poller.register( dets_recv, zmq.POLLIN )
 while True:
     coms = dict( poller.poll( 150 ) )
     if( coms.get( dets_recv ) == zmq.POLLIN ):
-        topic, _, time, strides, data = dets_recv.recv_multipart()
-        print( time,
-               np.frombuffer( strides, dtype=np.int32 ),
-               np.frombuffer( data, dtype=np.float32 ).reshape( -1, 3 ) )
+        topic, _, header, strides, data = dets_recv.recv_multipart()[ :5 ] # newer frames may add parts
+        _, _, cols, frame_no, time, sys_hash, s_dt, d_dt, _, _ = struct.unpack_from( ABT_FRAME_FMT, header )
+        print( frame_no, time,
+               np.frombuffer( strides, dtype=s_dt.rstrip( b"\x00" ).decode() ),
+               np.frombuffer( data, dtype=d_dt.rstrip( b"\x00" ).decode() ).reshape( -1, cols ) )
 
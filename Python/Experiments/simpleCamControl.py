@@ -216,9 +216,10 @@ class CamControl( cmd.Cmd ):
         self._attempt_to_read()
 
     def _attempt_to_read( self ):
-        if( not self.det_mgr.q_out.empty() ):
-            data = self.det_mgr.q_out.get()
-            print( data )
+        for time_stamp, sys_hash, strides, dets, buf_id in self.det_mgr.q_out.drain():
+            print( time_stamp, strides, dets )
+            # dets is a view of the det man's buffer, hand it back
+            self.det_mgr.release( buf_id )
 
         while( not self.com_mgr.q_misc.empty() ):
             data = self.com_mgr.q_misc.get( block=False, timeout=0.001 )
@@ -1,91 +1,295 @@
-# 
-# Copyright (C) 2016~2022 The Gimli Project
-# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
-#
-# Gimli is free software: you can redistribute it and/or modify
-# it under the terms of the GNU General Public License as published by
-# the Free Software Foundation, either version 3 of the License, or
-# (at your option) any later version.
-#
-# Gimli is distributed in the hope that it will be useful,
-# but WITHOUT ANY WARRANTY; without even the implied warranty of
-# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
-# GNU General Public License for more details.
-#
-# You should have received a copy of the GNU General Public License
-# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
-#
-
-""" Generic Utils undeserving of separate modules """
-
-try: # Weird issue on my linux VM not finding SimpleQueue, yes it's 3
-    from queue import SimpleQueue
-except ImportError:
-    from queue import Queue as SimpleQueue
-
-import socket
-
-
-class SelectableQueue( SimpleQueue ):
-    """ A (Threadsafe) Queue that can be polled in a "select" statement, such that queued items can be 'got' without
-        spinning.
-        Nastiest hack I've ever done.  (To Date)
-    """
-
-    PORT = 0 # Binding to port Zero will find a random, available, non-privaledged port
-
-    def __init__( self ):
-        super( SelectableQueue, self ).__init__()
-
-        temp_in = socket.socket( socket.AF_INET, socket.SOCK_STREAM )
-        temp_in.bind( ( "127.0.0.1", self.PORT ) )
-        temp_in.listen( 1 ) # Only one client
-        in_addr = temp_in.getsockname()
-
-        self._out = socket.socket( socket.AF_INET, socket.SOCK_STREAM )
-        self._out.connect( in_addr )
-
-        self._in, out_addr = temp_in.accept()
-
-        temp_in.close()
-
-    def fileno( self ):
-        """
-        Select asks for the filedevice to poll it
-        Returns:
-            fileno: (int) filehandle of the input socket
-        """
-        return self._in.fileno()
-
-    def put( self, item ):
-        """
-        Overload the Queue put function to emit a packet as well
-        Args:
-            item: (any) Queued Item
-        """
-        super( SelectableQueue, self ).put( item ) # Might block for a moment
-        self._out.send( b"!" )
-
-    def get( self ):
-        """
-        Overload the Queue get function to remove a byte from the socket
-        Returns:
-            item: (any) Queued Item
-        """
-        # only read one byte, so if 2 queue items exist, there will still be readables on the socket
-        self._in.recv( 1 )
-        return super( SelectableQueue, self ).get()
-
-    def cleanClose( self ):
-        """
-        This Queue has responsibilities to the sockets it created.  Need to close these cleanly.
-        Returns:
-
-        """
-        self._out.close()
-        self._in.close()
-
-    def __del__( self ):
-        self.cleanClose()
-
-
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" Generic Utils undeserving of separate modules """
+
+from collections import deque
+import numpy as np
+import os
+from queue import Empty
+import socket
+import threading
+import time
+
+
+class SelectableQueue( object ):
+    """ A (Threadsafe) Queue that can be polled in a "select" statement, such that queued items can be 'got' without
+        spinning.
+
+        The queue is readable while it holds items.  Wakeups are coalesced, only the put that finds the queue empty
+        signals, and the signal is only cleared when it's emptied again, so a burst of puts costs one syscall.  As the
+        signal is level, not one per item, a reader woken by select should take everything with drain().
+
+        Signals on an eventfd where there is one, a pipe on other POSIX systems, and a socketpair on Windows where
+        select only works with sockets.
+
+        Given a maxlen the Queue is bounded, a put to a full Queue drops the oldest item and counts it in dropped.
+        maxlen=1 makes a mailbox that only ever holds the latest item.
+    """
+
+    def __init__( self, maxlen=None ):
+        self._items = deque( maxlen=maxlen )
+        self.maxlen = maxlen
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition( self._lock )
+        self._signalled = False
+        self._closed = True # until there's something to close
+
+        self._sock_r = self._sock_w = None
+        if( hasattr( os, "eventfd" ) ):
+            self._rfd = self._wfd = os.eventfd( 0, os.EFD_NONBLOCK | os.EFD_CLOEXEC )
+        elif( os.name == "posix" ):
+            self._rfd, self._wfd = os.pipe()
+            os.set_blocking( self._rfd, False )
+            os.set_blocking( self._wfd, False )
+        else:
+            self._sock_r, self._sock_w = socket.socketpair()
+            self._sock_r.setblocking( False )
+            self._sock_w.setblocking( False )
+            self._rfd, self._wfd = self._sock_r.fileno(), self._sock_w.fileno()
+        self._closed = False
+
+    def fileno( self ):
+        """
+        Select asks for the filedevice to poll it
+        Returns:
+            fileno: (int) file descriptor that's readable while the queue has items
+        """
+        return self._rfd
+
+    def _signal( self ):
+        # call with the lock held
+        if( not self._signalled ):
+            self._signalled = True
+            if( self._sock_w is not None ):
+                self._sock_w.send( b"!" )
+            elif( self._rfd == self._wfd ):
+                os.eventfd_write( self._wfd, 1 )
+            else:
+                os.write( self._wfd, b"!" )
+
+    def _unsignal( self ):
+        # call with the lock held, once the queue is empty
+        if( self._signalled ):
+            self._signalled = False
+            try:
+                if( self._sock_r is not None ):
+                    self._sock_r.recv( 64 )
+                elif( self._rfd == self._wfd ):
+                    os.eventfd_read( self._rfd )
+                else:
+                    os.read( self._rfd, 64 )
+            except BlockingIOError:
+                pass
+
+    def put( self, item, block=True, timeout=None ):
+        """
+        Queue an item, signalling if the queue was empty.  Never blocks, block & timeout are for Queue compatibility.
+        If the Queue is full, the oldest item is dropped to make room.
+        Args:
+            item: (any) Queued Item
+        """
+        with self._lock:
+            if( self.maxlen is not None and len( self._items ) == self.maxlen ):
+                self.dropped += 1
+            self._items.append( item )
+            self._signal()
+            self._not_empty.notify()
+
+    def put_nowait( self, item ):
+        self.put( item )
+
+    def get( self, block=True, timeout=None ):
+        """
+        Take the oldest item, like Queue.get
+        Args:
+            block: (bool) wait for an item
+            timeout: (float) longest to wait, None waits forever
+        Returns:
+            item: (any) Queued Item
+        Raises:
+            Empty: if there's no item
+        """
+        with self._lock:
+            if( block and not self._items ):
+                self._not_empty.wait_for( lambda: self._items, timeout )
+
+            if( not self._items ):
+                raise Empty
+
+            item = self._items.popleft()
+            if( not self._items ):
+                self._unsignal()
+            return item
+
+    def get_nowait( self ):
+        return self.get( block=False )
+
+    def drain( self ):
+        """
+        Take everything that's queued, in one go
+        Returns:
+            items: (list) Queued Items, oldest first.  Empty if there were none
+        """
+        with self._lock:
+            items = list( self._items )
+            self._items.clear()
+            self._unsignal()
+        return items
+
+    def empty( self ):
+        return not self._items
+
+    def qsize( self ):
+        return len( self._items )
+
+    def cleanClose( self ):
+        """
+        This Queue has responsibilities to the file descriptors it created.  Need to close these cleanly, only once.
+        """
+        if( getattr( self, "_closed", True ) ):
+            return # Closed already, or never finished opening
+
+        self._closed = True
+        if( self._sock_r is not None ):
+            self._sock_r.close()
+            self._sock_w.close()
+        else:
+            os.close( self._rfd )
+            if( self._wfd != self._rfd ):
+                os.close( self._wfd )
+
+    def __del__( self ):
+        self.cleanClose()
+
+
+
+class Metronome( threading.Thread ):
+    """ A playback clock.  Ticks are put on a (Selectable) Queue so the consumer can sleep until one is due.
+
+        Deadlines are absolute, tick n is due at start + n * period on the perf_counter_ns clock, so time spent waking,
+        or a late tick, never pushes the following ticks back and the clock doesn't drift.  The thread sleeps to within
+        spin of the deadline, as sleep routinely oversleeps, then spins the rest of the way.
+
+        If the thread wakes more than a period late, the ticks it missed are handled by the policy:
+            CATCH_UP : emit them all at once, so the consumer sends every frame, late
+            DROP     : emit only the latest, the missed ticks are counted and skipped
+
+        Each tick is queued as ( tick number, deadline ns, emitted ns ).  Under DROP make the queue a mailbox
+        (maxlen=1), then a consumer that falls behind only sees the latest tick too.
+    """
+    CATCH_UP = "catchup"
+    DROP     = "drop"
+    POLICIES = ( CATCH_UP, DROP )
+
+    SPIN   = 1000000 # ns, spin this close to the deadline
+    WINDOW = 1024    # ticks measured for the stats
+
+    def __init__( self, q_tick, delay, policy=None, spin=None ):
+        """
+        :param q_tick: (SelectableQueue) Where the ticks go
+        :param delay: (float) Period in seconds
+        :param policy: (str) What to do with missed ticks, CATCH_UP or DROP. Default: CATCH_UP
+        :param spin: (int) ns before a deadline to stop sleeping and spin, 0 never spins. Default: SPIN
+        """
+        super( Metronome, self ).__init__()
+        self.daemon = True
+
+        policy = policy or self.CATCH_UP
+        if( policy not in self.POLICIES ):
+            raise ValueError( "Unknown policy '{}', expected one of {}".format( policy, self.POLICIES ) )
+
+        self._q_tick = q_tick
+        self._period = int( round( delay * 1e9 ) )
+        self.policy = policy
+        self.spin = self.SPIN if (spin is None) else int( spin )
+
+        # Counters
+        self.ticks = 0  # ticks emitted
+        self.missed = 0 # ticks that were late by more than a period, caught up or dropped per policy
+
+        # Ring of recent emissions, for the stats
+        self._emitted = np.zeros( (self.WINDOW,), dtype=np.int64 )
+        self._late = np.zeros( (self.WINDOW,), dtype=np.int64 )
+        self._count = 0
+
+        self.running = threading.Event()
+        self.running.set()
+
+    def run( self ):
+        start = time.perf_counter_ns()
+        tick = 1
+        deadline = start + self._period
+        while( self.running.isSet() ):
+            wait = deadline - time.perf_counter_ns()
+            if( wait > self.spin ):
+                time.sleep( (wait - self.spin) / 1e9 )
+                continue # check running, and the time, again
+
+            while( time.perf_counter_ns() < deadline ):
+                pass
+
+            now = time.perf_counter_ns()
+            behind = (now - deadline) // self._period # whole periods late
+            if( behind > 0 ):
+                self.missed += behind
+                if( self.policy == self.CATCH_UP ):
+                    for i in range( behind ):
+                        self._emit( tick + i, deadline + i * self._period, now )
+                tick += behind
+                deadline += behind * self._period
+
+            self._emit( tick, deadline, now )
+            tick += 1
+            deadline += self._period
+
+    def _emit( self, tick, deadline, now ):
+        idx = self._count % self.WINDOW
+        self._emitted[ idx ] = now
+        self._late[ idx ] = now - deadline
+        self._count += 1
+        self.ticks += 1
+        self._q_tick.put( ( tick, deadline, now ) )
+
+    def stats( self ):
+        """
+        How well the clock is keeping time, over the last WINDOW ticks.
+        Returns:
+            stats: (dict) target & measured rate (Hz), jitter (mean, p99, max lateness in us), ticks & missed
+        """
+        count = min( self._count, self.WINDOW )
+        emitted = self._emitted[ :count ] # a ring, so oldest isn't first
+        late = self._late[ :count ] / 1e3
+        span = int( emitted.max() - emitted.min() ) if (count > 1) else 0
+        return {
+            "policy"      : self.policy,
+            "target"      : 1e9 / self._period,
+            "rate"        : ((count - 1) * 1e9 / span) if (span > 0) else 0.,
+            "jitter_mean" : float( late.mean() ) if count else 0.,
+            "jitter_p99"  : float( np.percentile( late, 99 ) ) if count else 0.,
+            "jitter_max"  : float( late.max() ) if count else 0.,
+            "ticks"       : self.ticks,
+            "missed"      : self.missed,
+            "dropped"     : getattr( self._q_tick, "dropped", 0 ),
+        }
+
+    def stop( self ):
+        self.running.clear()
+
+# class Metronome
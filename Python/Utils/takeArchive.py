@@ -0,0 +1,276 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" takeArchive.py - Compressed takes, for archiving a shoot day
+
+    A take is cut into blocks of frames, and each of a block's columns is compressed on its own, so a block can be
+    packed, or unpacked, without touching the rest of the take, and blocks can be worked on in parallel.
+
+        Header   : ARCH_FMT, magic, version, the take's sizes & rate, codec, filter, where the index is
+        blocks   : BLOCK_FMT, then the compressed times, strides, dets & ids of block_frames frames
+        index    : int64 ( num_blocks + 1, )  byte offset of each block, and of the index itself
+
+    The offsets column isn't stored, it's the sum of the frames' det counts.  The dets are stored as columns of X, Y
+    & Radius.  Before compressing, the "delta" filter replaces each value with its difference from the one before,
+    frame to frame for times, camera to camera for strides (giving each camera's count) and det to det for ids.  Dets
+    aren't differenced, neighbours are different markers so it makes them worse.  Then the bytes are shuffled, all
+    the first bytes, then all the second, and so on, which gathers the bytes that hardly change into long runs.
+
+    zstd (zstandard) or lz4 are used if they're installed, zlib always is.
+"""
+import struct
+import zlib
+
+import numpy as np
+
+from Utils.takeFile import TakeWriter, DETS_T, IDS_T, STRD_T, TIMES_T, OFFS_T
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+
+ARCH_MAGIC   = b"GTKZ"
+ARCH_VERSION = 1
+ARCH_FMT     = "<4sHHqqiiid8s8sq" # magic, version, header size, frames, dets, cams, block frames, blocks, rate,
+                                  # codec, filter, index offset
+ARCH_HDR_SZ  = struct.calcsize( ARCH_FMT )
+BLOCK_FMT    = "<qiiqqqq" # first frame, frames, dets, compressed size of times, strides, dets, ids
+BLOCK_HDR_SZ = struct.calcsize( BLOCK_FMT )
+
+BLOCK_FRAMES = 1024
+FILTERS      = ( "none", "delta" )
+
+
+def _zstdCodec( level ):
+    return ( zstandard.ZstdCompressor( level=level ).compress, zstandard.ZstdDecompressor().decompress )
+
+
+def _lz4Codec( level ):
+    return ( lambda data: lz4.frame.compress( data, compression_level=level ), lz4.frame.decompress )
+
+
+def _zlibCodec( level ):
+    return ( lambda data: zlib.compress( data, level ), zlib.decompress )
+
+
+# name: ( default level, maker ), best first
+CODECS = {}
+if( zstandard is not None ):
+    CODECS[ "zstd" ] = ( 3, _zstdCodec )
+if( lz4 is not None ):
+    CODECS[ "lz4" ] = ( 0, _lz4Codec )
+CODECS[ "zlib" ] = ( 1, _zlibCodec )
+
+DEFAULT_CODEC = next( iter( CODECS ) )
+
+
+def getCodec( name, level=None ):
+    """
+    :param name: (str) "zstd", "lz4" or "zlib"
+    :param level: (int) compression level, default is the codec's
+    :return: (tuple) compress & decompress functions, bytes in bytes out
+    """
+    if( name not in CODECS ):
+        raise ValueError( "Codec '{}' isn't available, have {}".format( name, list( CODECS ) ) )
+    default, maker = CODECS[ name ]
+    return maker( default if (level is None) else level )
+
+
+def _shuffle( arr ):
+    # all the first bytes, then all the second...
+    return arr.view( np.uint8 ).reshape( -1, arr.dtype.itemsize ).T.tobytes()
+
+
+def _unshuffle( data, dtype ):
+    size = np.dtype( dtype ).itemsize
+    return np.frombuffer( data, dtype=np.uint8 ).reshape( size, -1 ).T.copy().view( dtype ).ravel()
+
+
+def _filter( arr, filter_, axis=0 ):
+    # axis to difference along, None only shuffles
+    if( filter_ == "none" ):
+        return np.ascontiguousarray( arr ).tobytes()
+
+    out = np.array( arr, order="C" )
+    if( axis is not None ):
+        # ints wrap, so it's exact
+        lead = [ slice( None ) ] * arr.ndim
+        prev = list( lead )
+        lead[ axis ], prev[ axis ] = slice( 1, None ), slice( None, -1 )
+        out[ tuple( lead ) ] -= arr[ tuple( prev ) ]
+    return _shuffle( out )
+
+
+def _unfilter( data, dtype, filter_, shape, axis=0 ):
+    if( filter_ == "none" ):
+        return np.frombuffer( data, dtype=dtype ).reshape( shape ).copy()
+
+    arr = _unshuffle( data, dtype ).reshape( shape )
+    if( axis is not None ):
+        arr = np.cumsum( arr, axis=axis, dtype=dtype ) # wraps back
+    return arr
+
+
+def packBlock( take, start, stop, compress, filter_="delta" ):
+    """
+    Compress a block of frames.
+
+    :param take: (TakeReader) the take
+    :param start: (int) first frame
+    :param stop: (int) frame after the last
+    :param compress: (function) bytes in, compressed bytes out
+    :param filter_: (str) "delta" or "none"
+    :return: (bytes) the block, header and all
+    """
+    offs, strides, dets, ids = take.frames( start, stop )
+    num_frames, num_dets = len( strides ), int( offs[ -1 ] - offs[ 0 ] )
+
+    columns = ( compress( _filter( take.times[ start:stop ], filter_ ) ),
+                compress( _filter( strides, filter_, axis=1 ) ),
+                compress( _filter( dets.T, filter_, axis=None ) ), # X, Y & Radius
+                compress( _filter( ids, filter_ ) ) )
+    hdr = struct.pack( BLOCK_FMT, start, num_frames, num_dets, *( len( col ) for col in columns ) )
+    return hdr + b"".join( columns )
+
+
+def unpackBlock( data, num_cams, decompress, filter_="delta" ):
+    """
+    Expand a block of frames.
+
+    :param data: (bytes) the block, as packBlock made it
+    :param num_cams: (int) cameras in the take
+    :param decompress: (function) compressed bytes in, bytes out
+    :param filter_: (str) the filter it was packed with
+    :return: (tuple) first frame, times, strides ( frames, num_cams+1 ), dets ( dets, 3 ), ids
+    """
+    start, num_frames, num_dets, *sizes = struct.unpack_from( BLOCK_FMT, data, 0 )
+    pos, cols = BLOCK_HDR_SZ, []
+    for size in sizes:
+        cols.append( decompress( data[ pos:pos + size ] ) )
+        pos += size
+
+    times = _unfilter( cols[ 0 ], TIMES_T, filter_, (num_frames,) )
+    strides = _unfilter( cols[ 1 ], STRD_T, filter_, (num_frames, num_cams + 1), axis=1 )
+    dets = np.ascontiguousarray( _unfilter( cols[ 2 ], DETS_T, filter_, (3, num_dets), axis=None ).T )
+    ids = _unfilter( cols[ 3 ], IDS_T, filter_, (num_dets,) )
+
+    return (start, times, strides, dets, ids)
+
+
+def packHeader( take, block_frames, num_blocks, codec, filter_, index_pos ):
+    return struct.pack( ARCH_FMT, ARCH_MAGIC, ARCH_VERSION, ARCH_HDR_SZ, take.num_frames, take.num_dets,
+                        take.num_cams, block_frames, num_blocks, take.rate, codec.encode( "ascii" ),
+                        filter_.encode( "ascii" ), index_pos )
+
+
+def blockRanges( num_frames, block_frames=None ):
+    """ ( start, stop ) of each block """
+    block_frames = block_frames or BLOCK_FRAMES
+    return [ ( start, min( start + block_frames, num_frames ) ) for start in range( 0, num_frames, block_frames ) ]
+
+
+def writeArchive( arch_fq, take, blocks, block_frames, codec, filter_ ):
+    """
+    Write an archive, from blocks packed already.
+
+    :param arch_fq: (str) path to the archive
+    :param take: (TakeReader) the take the blocks are from
+    :param blocks: (iterable) packed blocks, in order
+    :param block_frames: (int) frames in a block
+    :param codec: (str) the codec they were compressed with
+    :param filter_: (str) the filter they were packed with
+    :return: (int) size of the archive
+    """
+    with open( arch_fq, "wb" ) as fh:
+        fh.write( b"\0" * ARCH_HDR_SZ ) # till we know where the index is
+        index = []
+        for block in blocks:
+            index.append( fh.tell() )
+            fh.write( block )
+        index_pos = fh.tell()
+        index.append( index_pos )
+        fh.write( np.asarray( index, dtype=OFFS_T ).tobytes() )
+        size = fh.tell()
+        fh.seek( 0 )
+        fh.write( packHeader( take, block_frames, len( index ) - 1, codec, filter_, index_pos ) )
+    return size
+
+
+class ArchiveReader( object ):
+    """
+    An archived take.  Blocks are read & expanded as they're asked for.
+
+        arch = ArchiveReader( "calibration.takez" )
+        start, times, strides, dets, ids = arch.block( 0 )
+        arch.expand( "calibration.take" )
+    """
+
+    def __init__( self, file_fq ):
+        self.file_fq = file_fq
+        with open( file_fq, "rb" ) as fh:
+            hdr = struct.unpack( ARCH_FMT, fh.read( ARCH_HDR_SZ ) )
+            magic, version, _, self.num_frames, self.num_dets, self.num_cams, self.block_frames, self.num_blocks, \
+                self.rate, codec, filter_, index_pos = hdr
+            if( magic != ARCH_MAGIC ):
+                raise ValueError( "'{}' isn't an archived take".format( file_fq ) )
+            if( version > ARCH_VERSION ):
+                raise ValueError( "'{}' is archive version {}, only know up to {}".format( file_fq, version,
+                                                                                          ARCH_VERSION ) )
+            fh.seek( index_pos )
+            self.index = np.frombuffer( fh.read( (self.num_blocks + 1) * 8 ), dtype=OFFS_T )
+
+        self.version = version
+        self.codec = codec.rstrip( b"\0" ).decode( "ascii" )
+        self.filter = filter_.rstrip( b"\0" ).decode( "ascii" )
+        self._decompress = getCodec( self.codec )[ 1 ]
+
+    def __len__( self ):
+        return self.num_frames
+
+    def block( self, idx ):
+        """
+        :param idx: (int) block number
+        :return: (tuple) first frame, times, strides, dets, ids
+        """
+        with open( self.file_fq, "rb" ) as fh:
+            fh.seek( self.index[ idx ] )
+            data = fh.read( self.index[ idx + 1 ] - self.index[ idx ] )
+        return unpackBlock( data, self.num_cams, self._decompress, self.filter )
+
+    def expand( self, take_fq ):
+        """
+        Back to a take.
+
+        :param take_fq: (str) where to write the take
+        :return: (int) frames written
+        """
+        with TakeWriter( take_fq, num_cams=self.num_cams, rate=self.rate, frames_cap=self.num_frames,
+                         dets_cap=self.num_dets ) as writer:
+            for idx in range( self.num_blocks ):
+                _, times, strides, dets, ids = self.block( idx )
+                writer.append( times, strides, dets, ids )
+        return self.num_frames
+
+# class ArchiveReader
@@ -0,0 +1,480 @@
+# 
+# Copyright (C) 2016~2022 The Gimli Project
+# This file is part of Gimli <https://github.com/bit-meddler/Gimli>.
+#
+# Gimli is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Gimli is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Gimli.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+""" takeFile.py - A Take of Centroid data in one memory-mappable file
+
+    Rather than a pickle of per frame Python lists, a take is held in columns:
+
+        Header   : TAKE_FMT, magic, version, and where everything is
+        times    : int64 ( num_frames, )            each frame's time stamp
+        offsets  : int64 ( num_frames + 1, )        index of each frame's first det, and the total at the end
+        strides  : int32 ( num_frames, num_cams+1 ) each frame's strides, relative to its first det
+        dets     : float32 ( num_dets, 3 )          X, Y, Radius of every frame, end to end
+        ids      : int32 ( num_dets, )              label of each det, -1 if unlabelled
+
+    Sections start on TAKE_ALIGN byte boundaries.  Opening a take only reads the header, the sections are views of
+    the mapped file, so a frame or a range of frames is a slice and nothing else is touched.
+
+    Frames with fewer cameras than the take's widest are padded with empty cameras.
+"""
+import mmap
+import os
+import pickle
+import struct
+
+import numpy as np
+
+
+TAKE_MAGIC   = b"GTAK"
+TAKE_VERSION = 1
+TAKE_FMT     = "<4sHHqqiiddqqqqq" # magic, version, header size, frames, dets, cams, spare, rate, spare,
+                                  # times, offsets, strides, dets, ids section offsets
+TAKE_HDR_SZ  = struct.calcsize( TAKE_FMT )
+TAKE_ALIGN   = 64
+
+DETS_T  = np.float32
+IDS_T   = np.int32
+STRD_T  = np.int32
+TIMES_T = np.int64
+OFFS_T  = np.int64
+
+
+def _align( pos ):
+    return (pos + TAKE_ALIGN - 1) & ~(TAKE_ALIGN - 1)
+
+
+def _layout( num_frames, num_dets, num_cams ):
+    # byte offset of each section, and the file size
+    sizes = ( num_frames * np.dtype( TIMES_T ).itemsize,
+              (num_frames + 1) * np.dtype( OFFS_T ).itemsize,
+              num_frames * (num_cams + 1) * np.dtype( STRD_T ).itemsize,
+              num_dets * 3 * np.dtype( DETS_T ).itemsize,
+              num_dets * np.dtype( IDS_T ).itemsize )
+    offsets = []
+    pos = _align( TAKE_HDR_SZ )
+    for sz in sizes:
+        offsets.append( pos )
+        pos = _align( pos + sz )
+    return (offsets, pos)
+
+
+def packHeader( num_frames, num_dets, num_cams, rate, offsets ):
+    return struct.pack( TAKE_FMT, TAKE_MAGIC, TAKE_VERSION, TAKE_HDR_SZ, num_frames, num_dets, num_cams, 0,
+                        rate, 0., *offsets )
+
+
+def writeTake( file_fq, frames, rate=0., times=None ):
+    """
+    Write a whole take.
+
+    :param file_fq: (str) path to the take
+    :param frames: (list) ( strides, dets, ids ) of each frame, as in the .pik files
+    :param rate: (float) frame rate, 0 if unknown
+    :param times: (list) time stamp of each frame, default is the frame's index
+    :return: (int) number of frames written
+    """
+    num_frames = len( frames )
+    counts = np.zeros( (num_frames,), dtype=OFFS_T )
+    num_cams = 0
+    for n, (strides, _, _) in enumerate( frames ):
+        num_cams = max( num_cams, len( strides ) - 1 )
+        counts[ n ] = strides[ -1 ] if len( strides ) else 0
+
+    offs = np.zeros( (num_frames + 1,), dtype=OFFS_T )
+    np.cumsum( counts, out=offs[ 1: ] )
+    num_dets = int( offs[ -1 ] )
+
+    strides_tab = np.zeros( (num_frames, num_cams + 1), dtype=STRD_T )
+    for n, (strides, _, _) in enumerate( frames ):
+        strides_tab[ n, :len( strides ) ] = strides
+        strides_tab[ n, len( strides ): ] = counts[ n ] # empty cameras
+    if( times is None ):
+        times = np.arange( num_frames, dtype=TIMES_T )
+
+    sections, file_sz = _layout( num_frames, num_dets, num_cams )
+    with open( file_fq, "wb" ) as fh:
+        fh.truncate( file_sz )
+        fh.write( packHeader( num_frames, num_dets, num_cams, rate, sections ) )
+        for pos, arr in zip( sections[ :3 ], ( np.asarray( times, dtype=TIMES_T ), offs, strides_tab ) ):
+            fh.seek( pos )
+            fh.write( arr.tobytes() )
+
+        # dets & ids a frame at a time, so the take is never in memory twice
+        fh.seek( sections[ 3 ] )
+        for _, dets, _ in frames:
+            fh.write( np.asarray( dets, dtype=DETS_T ).tobytes() )
+        fh.seek( sections[ 4 ] )
+        for n, (_, _, ids) in enumerate( frames ):
+            ids = np.asarray( ids, dtype=IDS_T )
+            if( len( ids ) != counts[ n ] ):
+                ids = np.full( (counts[ n ],), -1, dtype=IDS_T ) # unlabelled
+            fh.write( ids.tobytes() )
+
+    return num_frames
+
+
+class TakeReader( object ):
+    """
+    A take file, mapped.  Frames come back as views of the file, so copy anything that has to outlive close().
+
+        take = TakeReader( "calibration.take" )
+        strides, dets, ids = take[ 100 ]
+        offs, strides, dets, ids = take.frames( 100, 200 ) # dets of frame n are from offs[ n-100 ] - offs[ 0 ]
+    """
+
+    def __init__( self, file_fq ):
+        self.file_fq = file_fq
+        self._fh = open( file_fq, "rb" )
+        self._map = mmap.mmap( self._fh.fileno(), 0, access=mmap.ACCESS_READ )
+
+        hdr = struct.unpack_from( TAKE_FMT, self._map, 0 )
+        magic, version, _, self.num_frames, self.num_dets, self.num_cams, _, self.rate, _ = hdr[ :9 ]
+        if( magic != TAKE_MAGIC ):
+            self.close()
+            raise ValueError( "'{}' isn't a take".format( file_fq ) )
+        if( version > TAKE_VERSION ):
+            self.close()
+            raise ValueError( "'{}' is take version {}, only know up to {}".format( file_fq, version, TAKE_VERSION ) )
+        self.version = version
+
+        t_off, o_off, s_off, d_off, i_off = hdr[ 9: ]
+        self.times = np.frombuffer( self._map, dtype=TIMES_T, count=self.num_frames, offset=t_off )
+        self.offsets = np.frombuffer( self._map, dtype=OFFS_T, count=self.num_frames + 1, offset=o_off )
+        self.strides = np.frombuffer( self._map, dtype=STRD_T, count=self.num_frames * (self.num_cams + 1),
+                                      offset=s_off ).reshape( self.num_frames, self.num_cams + 1 )
+        self.dets = np.frombuffer( self._map, dtype=DETS_T, count=self.num_dets * 3, offset=d_off ).reshape( -1, 3 )
+        self.ids = np.frombuffer( self._map, dtype=IDS_T, count=self.num_dets, offset=i_off )
+
+    def __len__( self ):
+        return self.num_frames
+
+    def __getitem__( self, idx ):
+        """
+        :param idx: (int) frame number
+        :return: (tuple) strides, dets, ids
+        """
+        if( idx < 0 ):
+            idx += self.num_frames
+        if( not (0 <= idx < self.num_frames) ):
+            raise IndexError( "frame {} not in a take of {}".format( idx, self.num_frames ) )
+        d_in, d_out = self.offsets[ idx ], self.offsets[ idx + 1 ]
+        return (self.strides[ idx ], self.dets[ d_in:d_out ], self.ids[ d_in:d_out ])
+
+    def frames( self, start, stop ):
+        """
+        A range of frames, in one go.
+
+        :param start: (int) first frame
+        :param stop: (int) frame after the last
+        :return: (tuple) offsets ( stop-start+1 ), strides ( stop-start, num_cams+1 ), dets, ids
+        """
+        start, stop, _ = slice( start, stop ).indices( self.num_frames )
+        stop = max( start, stop )
+        d_in, d_out = self.offsets[ start ], self.offsets[ stop ]
+        return (self.offsets[ start:stop + 1 ], self.strides[ start:stop ], self.dets[ d_in:d_out ],
+                self.ids[ d_in:d_out ])
+
+    def close( self ):
+        # views of the map have to go first
+        self.times = self.offsets = self.strides = self.dets = self.ids = None
+        if( getattr( self, "_map", None ) is not None ):
+            try:
+                self._map.close()
+            except BufferError:
+                pass # Someone's still holding a frame, the map goes when they let go
+            self._map = None
+        if( self._fh is not None ):
+            self._fh.close()
+            self._fh = None
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *args ):
+        self.close()
+
+# class TakeReader
+
+
+class TakePlayer( object ):
+    """
+    Transport over a TakeReader.  The play head is a position in frames, each tick() gives the frame under it and then
+    moves it on by speed frames.  A negative speed plays in reverse, and fractions play slower than the tick.  The
+    head stays in a range of frames, [start, stop), looping or stopping when it runs off either end.
+
+    Nothing's loaded, the frames are views of the mapped take, so playing costs the same memory whatever its length.
+    """
+
+    def __init__( self, take, speed=1., loop=True ):
+        """
+        :param take: (TakeReader) The take to play
+        :param speed: (float) frames to move on per tick
+        :param loop: (bool) loop in the range, or stop at its ends
+        """
+        self.take = take
+        self.speed = float( speed )
+        self.loop = loop
+        self.playing = True
+        self.start, self.stop = 0, len( take )
+        self.pos = 0.
+
+    @property
+    def frame( self ):
+        return int( self.pos )
+
+    def seek( self, frame ):
+        """ Move the head to a frame, kept in the range """
+        self.pos = float( min( max( int( frame ), self.start ), self.stop - 1 ) )
+
+    def seekTime( self, time_stamp ):
+        """
+        Move the head to the first frame in the range stamped at or after time_stamp.  Time stamps are taken to be
+        increasing through the take.
+
+        :param time_stamp: (int) a frame's time stamp
+        """
+        times = self.take.times[ self.start:self.stop ]
+        self.seek( self.start + int( np.searchsorted( times, time_stamp ) ) )
+
+    def setRange( self, start=None, stop=None ):
+        """
+        Play between start and the frame before stop, like a slice.  The head is moved into the range if it's out.
+
+        :param start: (int) first frame, default the take's first
+        :param stop: (int) frame after the last, default the take's end
+        """
+        start, stop, _ = slice( start, stop ).indices( len( self.take ) )
+        if( stop <= start ):
+            raise ValueError( "Empty range {}:{}".format( start, stop ) )
+        self.start, self.stop = start, stop
+        self.seek( self.pos )
+
+    def tick( self ):
+        """
+        :return: (tuple) frame index, strides, dets, ids of the frame under the head.  The head then moves on
+        """
+        idx = self.frame
+        strides, dets, ids = self.take[ idx ]
+        if( self.playing ):
+            self._advance()
+        return (idx, strides, dets, ids)
+
+    def _advance( self ):
+        pos = self.pos + self.speed
+        if( self.start <= pos < self.stop ):
+            self.pos = pos
+
+        elif( self.loop ):
+            self.pos = self.start + ((pos - self.start) % (self.stop - self.start))
+
+        else:
+            # run off the end, stop on the last frame played that way
+            self.pos = float( self.stop - 1 if (pos >= self.stop) else self.start )
+            self.playing = False
+
+    def status( self ):
+        """ :return: (dict) Where the transport is, and what it's doing """
+        idx = self.frame
+        return {
+            "frame"     : idx,
+            "time"      : int( self.take.times[ idx ] ),
+            "frames"    : len( self.take ),
+            "range"     : [ self.start, self.stop ],
+            "speed"     : self.speed,
+            "playing"   : self.playing,
+            "loop"      : self.loop,
+        }
+
+# class TakePlayer
+
+
+class TakeWriter( object ):
+    """
+    Appends frames to a take as they're recorded.  The sections are laid out with room to spare, and when one fills
+    the take is laid out again with double the room, moving the sections up the file, so the cost of growing is
+    spread over everything written.  Frames are written in batches, a bulk write per section.
+
+    The header is rewritten on flush(), so a take can be read up to the last flush even if the recording dies.  Spare
+    room is left as holes in the file (sparse where the filesystem allows it), except after the last section, which
+    is cut off by close().
+    """
+    DEFAULT_FRAMES = 240 * 60 # a minute at 240Hz
+    DEFAULT_FRAME_DETS = 1024 # per frame, when guessing room for the dets
+    MOVE_CHUNK = 16 * 1024 * 1024 # bytes, when moving sections
+
+    def __init__( self, file_fq, num_cams=0, rate=0., frames_cap=None, dets_cap=None ):
+        """
+        :param file_fq: (str) path to the take, it's replaced
+        :param num_cams: (int) Cameras expected, more can turn up
+        :param rate: (float) frame rate, 0 if unknown
+        :param frames_cap: (int) Frames to make room for
+        :param dets_cap: (int) Dets to make room for
+        """
+        self.file_fq = file_fq
+        self.num_cams = num_cams
+        self.rate = rate
+        self.num_frames = 0
+        self.num_dets = 0
+        self.bytes_written = 0
+        self.grown = 0 # times the take's been laid out again
+
+        self._frames_cap = frames_cap or self.DEFAULT_FRAMES
+        self._dets_cap = dets_cap or (self._frames_cap * self.DEFAULT_FRAME_DETS)
+        self._sections, file_sz = _layout( self._frames_cap, self._dets_cap, self.num_cams )
+
+        self._fh = open( file_fq, "w+b" )
+        self._fh.truncate( file_sz )
+        self._write( self._sections[ 1 ], np.zeros( (1,), dtype=OFFS_T ) ) # first frame starts at det 0
+        self.flush()
+
+    def _write( self, pos, arr ):
+        self._fh.seek( pos )
+        self._fh.write( arr )
+        self.bytes_written += arr.nbytes
+
+    def append( self, times, strides, dets, ids ):
+        """
+        Add a batch of frames.
+
+        :param times: (ndarray) time stamp of each frame
+        :param strides: (list) each frame's strides
+        :param dets: (ndarray) ( n, 3 ) the frames' dets, end to end
+        :param ids: (ndarray) ( n, ) their ids, -1 where unlabelled
+        """
+        num = len( strides )
+        if( num == 0 ):
+            return
+        width = max( len( s ) for s in strides )
+
+        num_dets = len( dets )
+        if( (self.num_frames + num > self._frames_cap) or (self.num_dets + num_dets > self._dets_cap) or
+            (width > self.num_cams + 1) ):
+            self._grow( self.num_frames + num, self.num_dets + num_dets, width - 1 )
+
+        table = np.empty( (num, self.num_cams + 1), dtype=STRD_T )
+        for n, s in enumerate( strides ):
+            table[ n, :len( s ) ] = s
+            table[ n, len( s ): ] = s[ -1 ] # empty cameras
+        offs = np.cumsum( table[ :, -1 ], dtype=OFFS_T )
+        offs += self.num_dets
+
+        t_off, o_off, s_off, d_off, i_off = self._sections
+        self._write( t_off + self.num_frames * np.dtype( TIMES_T ).itemsize, np.asarray( times, dtype=TIMES_T ) )
+        self._write( o_off + (self.num_frames + 1) * np.dtype( OFFS_T ).itemsize, offs )
+        self._write( s_off + self.num_frames * table.itemsize * table.shape[ 1 ], table )
+        self._write( d_off + self.num_dets * 3 * np.dtype( DETS_T ).itemsize, np.ascontiguousarray( dets, dtype=DETS_T ) )
+        self._write( i_off + self.num_dets * np.dtype( IDS_T ).itemsize, np.ascontiguousarray( ids, dtype=IDS_T ) )
+        self.num_frames += num
+        self.num_dets += num_dets
+
+    def _grow( self, frames_needed, dets_needed, num_cams ):
+        # Lay the take out again with double the room that's run out
+        if( frames_needed > self._frames_cap ):
+            self._frames_cap = max( frames_needed, self._frames_cap * 2 )
+        if( dets_needed > self._dets_cap ):
+            self._dets_cap = max( dets_needed, self._dets_cap * 2 )
+        num_cams = max( num_cams, self.num_cams )
+
+        old = self._sections
+        new, file_sz = _layout( self._frames_cap, self._dets_cap, num_cams )
+        self._fh.truncate( max( file_sz, self._fh.seek( 0, os.SEEK_END ) ) )
+
+        # Sections only move up the file, so move the last first, then nothing's overwritten before it's moved
+        old_w = self.num_cams + 1
+        self._fh.seek( old[ 2 ] )
+        strides = np.frombuffer( self._fh.read( self.num_frames * old_w * np.dtype( STRD_T ).itemsize ), dtype=STRD_T )
+        self._move( old[ 4 ], new[ 4 ], self.num_dets * np.dtype( IDS_T ).itemsize )
+        self._move( old[ 3 ], new[ 3 ], self.num_dets * 3 * np.dtype( DETS_T ).itemsize )
+        if( num_cams != self.num_cams ):
+            # wider rows, the new cameras were empty
+            strides = strides.reshape( self.num_frames, old_w )
+            strides = np.concatenate( (strides, np.repeat( strides[ :, -1: ], num_cams - self.num_cams, axis=1 )),
+                                      axis=1 )
+        self._write( new[ 2 ], strides )
+        self._move( old[ 1 ], new[ 1 ], (self.num_frames + 1) * np.dtype( OFFS_T ).itemsize )
+        self._move( old[ 0 ], new[ 0 ], self.num_frames * np.dtype( TIMES_T ).itemsize )
+
+        self.num_cams = num_cams
+        self._sections = new
+        self._fh.truncate( file_sz )
+        self.grown += 1
+
+    def _move( self, src, dst, size ):
+        # copy from the end back, the regions can overlap
+        end = size
+        while( end > 0 ):
+            start = max( 0, end - self.MOVE_CHUNK )
+            self._fh.seek( src + start )
+            chunk = self._fh.read( end - start )
+            self._fh.seek( dst + start )
+            self._fh.write( chunk )
+            end = start
+
+    def flush( self ):
+        """ Make what's been appended readable """
+        self._fh.seek( 0 )
+        self._fh.write( packHeader( self.num_frames, self.num_dets, self.num_cams, self.rate, self._sections ) )
+        self._fh.flush()
+
+    def close( self ):
+        if( self._fh is None ):
+            return
+        self.flush()
+        self._fh.truncate( _align( self._sections[ 4 ] + self.num_dets * np.dtype( IDS_T ).itemsize ) )
+        self._fh.close()
+        self._fh = None
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *args ):
+        self.close()
+
+# class TakeWriter
+
+
+def convertPik( pik_fq, take_fq=None, rate=0. ):
+    """
+    Convert one of the pickled example takes.
+
+    :param pik_fq: (str) the .pik
+    :param take_fq: (str) where to write the take, default is next to the .pik
+    :param rate: (float) frame rate, if known
+    :return: (str) path of the take
+    """
+    take_fq = take_fq or os.path.splitext( pik_fq )[ 0 ] + ".take"
+    with open( pik_fq, "rb" ) as fh:
+        frames = pickle.load( fh )
+    writeTake( take_fq, frames, rate )
+    return take_fq
+
+
+if( __name__ == "__main__" ):
+    import argparse
+
+    parser = argparse.ArgumentParser( description="Convert pickled example data to takes" )
+    parser.add_argument( "piks", nargs="+", help=".pik files to convert" )
+    parser.add_argument( "-r", "--rate", action="store", dest="rate", default=0., type=float,
+                         help="Frame rate of the data. Default: unknown" )
+    args = parser.parse_args()
+
+    for pik_fq in args.piks:
+        take_fq = convertPik( pik_fq, rate=args.rate )
+        with TakeReader( take_fq ) as take:
+            print( "{} -> {}: {} frames, {} cameras, {} dets".format( pik_fq, take_fq, take.num_frames,
+                                                                      take.num_cams, take.num_dets ) )